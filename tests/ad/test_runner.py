@@ -0,0 +1,27 @@
+import time
+import unittest
+
+from toyotama.ad.runner import ExploitRunner
+
+
+def exploit(target: str) -> str:
+    if target == "slow":
+        time.sleep(1)
+    if target == "broken":
+        raise ConnectionError(target)
+    return f"junk FLAG{{{target}}} FLAG{{shared}} junk"
+
+
+class ExploitRunnerTestCase(unittest.TestCase):
+    def test_run(self):
+        submitted = []
+        runner = ExploitRunner(exploit, submit=submitted.extend, workers=4, timeout=0.3, head="FLAG{", tail="}")
+
+        results = runner.run(["a", "b", "slow", "broken"])
+
+        self.assertEqual(set(results), {"a", "b"})
+        self.assertEqual(results["a"], {"FLAG{a}", "FLAG{shared}"})
+        self.assertEqual(sorted(submitted), ["FLAG{a}", "FLAG{b}", "FLAG{shared}"])
+
+        runner.run(["a", "c"])
+        self.assertEqual(sorted(submitted), ["FLAG{a}", "FLAG{b}", "FLAG{c}", "FLAG{shared}"])
@@ -0,0 +1,52 @@
+import json
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+from toyotama.ad.submitter import FlagSubmitter
+
+
+class GameServer(BaseHTTPRequestHandler):
+    received: list[list[str]] = []
+    fail_once = True
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if GameServer.fail_once:
+            GameServer.fail_once = False
+            self.send_response(503)
+            self.end_headers()
+            return
+        GameServer.received.append(json.loads(body))
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+class FlagSubmitterTestCase(unittest.TestCase):
+    def test_batch_retry_and_store(self):
+        server = HTTPServer(("127.0.0.1", 0), GameServer)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/flags"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            store = Path(tmp) / "accepted.txt"
+            with FlagSubmitter(url, "token", batch_size=10, backoff=0.01, store=store) as submitter:
+                submitter([f"FLAG{{{i}}}" for i in range(25)] + ["FLAG{0}"])
+                submitter.flush()
+
+            self.assertEqual(sorted(sum(GameServer.received, [])), sorted(f"FLAG{{{i}}}" for i in range(25)))
+            self.assertEqual(len(store.read_text().split()), 25)
+
+            GameServer.received.clear()
+            with FlagSubmitter(url, "token", batch_size=10, store=store) as submitter:
+                submitter(["FLAG{3}", "FLAG{new}"])
+                submitter.flush()
+            self.assertEqual(GameServer.received, [["FLAG{new}"]])
+
+        server.shutdown()
@@ -0,0 +1,53 @@
+import asyncio
+import sys
+import unittest
+
+from toyotama.connect import AsyncProcess, AsyncSocket
+
+
+class AsyncTubeTestCase(unittest.TestCase):
+    def test_process(self):
+        async def run():
+            script = "print('x = 0x10'); print('name:', input())"
+            async with AsyncProcess([sys.executable, "-c", script]) as p:
+                x = await p.recvint()
+                await p.sendline(b"alice")
+                line = await p.recvline()
+                with self.assertRaises(EOFError):
+                    await p.recvline()
+            return x, line
+
+        x, line = asyncio.run(run())
+        self.assertEqual(x, 16)
+        self.assertEqual(line, b"name: alice\n")
+
+    def test_process_timeout(self):
+        async def run():
+            script = "import time; time.sleep(10)"
+            async with AsyncProcess([sys.executable, "-c", script], timeout=0.2) as p:
+                with self.assertRaises(asyncio.TimeoutError):
+                    await p.recvline()
+                transport = p.transport
+            return transport
+
+        self.assertTrue(asyncio.run(run()).is_closing())
+
+    def test_concurrent_sockets(self):
+        async def handle(reader, writer):
+            writer.write(b"> ")
+            writer.write(b"echo " + await reader.readline())
+            await writer.drain()
+            writer.close()
+
+        async def session(port: int, i: int) -> bytes:
+            async with AsyncSocket(f"nc 127.0.0.1 {port}") as r:
+                await r.sendlineafter(b"> ", i)
+                return await r.recvline()
+
+        async def run():
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                return await asyncio.gather(*(session(port, i) for i in range(20)))
+
+        self.assertEqual(asyncio.run(run()), [f"echo {i}\n".encode() for i in range(20)])
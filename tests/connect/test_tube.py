@@ -0,0 +1,95 @@
+import hashlib
+import socket
+import sys
+import unittest
+
+from toyotama.connect.process import Process
+from toyotama.connect.socket import Socket
+from toyotama.connect.tube import Tube
+
+
+class MemoryTube(Tube):
+    def __init__(self, chunks: list[bytes]):
+        super().__init__()
+        self.chunks = chunks
+        self.reads = 0
+
+    def _recv(self, n: int = 4096) -> bytes:
+        self.reads += 1
+        if not self.chunks:
+            return b""
+        chunk = self.chunks.pop(0)
+        self.chunks[:0] = [chunk[n:]] if chunk[n:] else []
+        return chunk[:n]
+
+    def send(self, message: bytes | str | int, term: bytes | str = b""):
+        pass
+
+    def close(self):
+        pass
+
+
+class TubeTestCase(unittest.TestCase):
+    def test_recvuntil_keeps_leftover(self):
+        tube = MemoryTube([b"name: alice\nage: 3", b"3\nrest"])
+        self.assertEqual(tube.recvuntil(b": "), b"name: ")
+        self.assertEqual(tube.recvline(), b"alice\n")
+        self.assertEqual(tube.recvint(), 33)
+        self.assertEqual(tube.recv(), b"rest")
+        self.assertEqual(tube.reads, 2)
+
+    def test_recvuntil_split_delimiter(self):
+        tube = MemoryTube([b"abc--", b"--", b"-->def"])
+        self.assertEqual(tube.recvuntil("---->"), b"abc------>")
+        self.assertEqual(tube.recv(), b"def")
+
+    def test_recvuntil_eof(self):
+        tube = MemoryTube([b"no newline"])
+        with self.assertRaises(EOFError):
+            tube.recvline()
+        self.assertEqual(tube.recv(), b"no newline")
+
+    def test_recvlines_large(self):
+        lines = [f"{i:08x}\n".encode() for i in range(10000)]
+        tube = MemoryTube([b"".join(lines)])
+        self.assertEqual(tube.recvlines(len(lines)), lines)
+
+    def test_solve_pow(self):
+        sent = []
+        tube = MemoryTube([b"sha256(abcd + ??)[:2] == 00\n"])
+        tube.send = lambda message, term=b"": sent.append(message + term)
+        answer = tube.solve_pow(workers=1)
+        self.assertTrue(hashlib.sha256(b"abcd" + answer).hexdigest().startswith("00"))
+        self.assertEqual(sent, [answer + b"\n"])
+
+
+class ProcessTestCase(unittest.TestCase):
+    def test_delayed_output(self):
+        p = Process([sys.executable, "-c", "import time; time.sleep(0.5); print('hello'); print('name:', input())"])
+        self.assertEqual(p.recvline(), b"hello\n")
+        p.sendline(b"alice")
+        self.assertEqual(p.recvline(), b"name: alice\n")
+        with self.assertRaises(EOFError):
+            p.recvline()
+        p.close()
+
+    def test_timeout(self):
+        p = Process([sys.executable, "-c", "import time; time.sleep(10)"], timeout=0.2)
+        with self.assertRaises(TimeoutError):
+            p.recvline()
+        p.close()
+
+
+class SocketTestCase(unittest.TestCase):
+    def test_timeout(self):
+        with socket.create_server(("127.0.0.1", 0)) as server:
+            s = Socket(f"nc 127.0.0.1 {server.getsockname()[1]}", timeout=0.2)
+            with self.assertRaises(TimeoutError):
+                s.recvline()
+            conn, _ = server.accept()
+            conn.sendall(b"hello\n")
+            conn.close()
+            self.assertEqual(s.recvline(), b"hello\n")
+            with self.assertRaises(EOFError):
+                s.recvline()
+            s.close()
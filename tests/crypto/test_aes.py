@@ -0,0 +1,68 @@
+import hashlib
+import random
+import unittest
+
+from toyotama.crypto.aes import PKCS7PaddingOracleAttack, ecb_chosen_plaintext_attack
+from toyotama.crypto.util import xor
+from toyotama.util.convert import to_block
+
+KEY = random.randbytes(16)
+
+
+def block_decrypt(block: bytes) -> bytes:
+    return hashlib.sha256(KEY + block).digest()[:16]
+
+
+def cbc_decrypt(ciphertext: bytes, iv: bytes) -> bytes:
+    blocks = [iv] + to_block(ciphertext)
+    return b"".join(xor(prev, block_decrypt(block)) for prev, block in zip(blocks, blocks[1:]))
+
+
+def padding_oracle(ciphertext: bytes, iv: bytes) -> bool:
+    plaintext = cbc_decrypt(ciphertext, iv)
+    n = plaintext[-1]
+    return 1 <= n <= 16 and plaintext.endswith(bytes([n]) * n)
+
+
+def batch_padding_oracle(ciphertexts: list[bytes], iv: bytes) -> list[bool]:
+    return [padding_oracle(ciphertext, iv) for ciphertext in ciphertexts]
+
+
+class PaddingOracleTestCase(unittest.TestCase):
+    def setUp(self):
+        self.iv = random.randbytes(16)
+        self.ciphertext = random.randbytes(64)
+        self.plaintext = cbc_decrypt(self.ciphertext, self.iv)
+
+    def test_decryption_attack(self):
+        po = PKCS7PaddingOracleAttack(padding_oracle)
+        self.assertEqual(po.decryption_attack(self.ciphertext, self.iv), self.plaintext)
+
+    def test_parallel_batch_decryption_attack(self):
+        po = PKCS7PaddingOracleAttack(padding_oracles=[batch_padding_oracle] * 4, batch_size=64)
+        self.assertEqual(po.decryption_attack(self.ciphertext, self.iv), self.plaintext)
+
+    def test_encryption_attack_with_oracle_pool(self):
+        plaintext = random.randbytes(32)
+        po = PKCS7PaddingOracleAttack(padding_oracles=[padding_oracle])
+        ciphertext, iv = po.encryption_attack(plaintext, self.ciphertext, self.iv)
+        self.assertEqual(cbc_decrypt(ciphertext, iv), plaintext)
+
+
+class ECBChosenPlaintextAttackTestCase(unittest.TestCase):
+    def setUp(self):
+        self.secret = b"FLAG{3cb_byt3_at_a_t1m3}"
+        self.queries = 0
+
+    def encrypt_oracle(self, plaintext: bytes) -> bytes:
+        self.queries += 1
+        data = plaintext + self.secret
+        data += bytes([16 - len(data) % 16]) * (16 - len(data) % 16)
+        return b"".join(block_decrypt(block) for block in to_block(data))
+
+    def test_ecb_chosen_plaintext_attack(self):
+        self.assertEqual(ecb_chosen_plaintext_attack(self.encrypt_oracle), self.secret)
+
+    def test_ecb_chosen_plaintext_attack_batch(self):
+        self.assertEqual(ecb_chosen_plaintext_attack(self.encrypt_oracle, batch=True), self.secret)
+        self.assertLessEqual(self.queries, len(self.secret) + 17)
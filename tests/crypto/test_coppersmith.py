@@ -0,0 +1,74 @@
+import random
+import unittest
+
+import gmpy2
+
+from toyotama.crypto.coppersmith import (
+    boneh_durfee_attack,
+    factor_with_known_msb,
+    integer_roots,
+    poly_mul,
+    roots_mod_prime,
+    small_roots,
+    stereotyped_message_attack,
+)
+from toyotama.crypto.rsa import RSASolver
+
+
+def generate_prime(bits):
+    return int(gmpy2.next_prime(random.getrandbits(bits) | 1 << (bits - 1)))
+
+
+class CoppersmithTestCase(unittest.TestCase):
+    def setUp(self):
+        self.p, self.q = generate_prime(256), generate_prime(256)
+        self.n = self.p * self.q
+
+    def test_roots(self):
+        roots = [random.randrange(-(10**30), 10**30) for _ in range(5)]
+        f = [1]
+        for r in roots:
+            f = poly_mul(f, [-r, 1])
+        self.assertEqual(integer_roots(f), sorted(roots))
+        self.assertEqual(integer_roots(poly_mul(f, [1, 0, 1])), sorted(roots))
+        self.assertEqual(integer_roots([0, 0, -4, 0, 1]), [-2, 0, 2])
+        self.assertEqual(roots_mod_prime([-6, 11, -6, 1], 101), [1, 2, 3])
+        self.assertEqual(roots_mod_prime([1, 0, 1], 103), [])
+
+    def test_small_roots(self):
+        x0 = random.getrandbits(100)
+        f = [random.randrange(self.n), random.randrange(self.n), 1]
+        f[0] = -(x0 * x0 + f[1] * x0) % self.n
+        self.assertIn(x0, small_roots(f, self.n, X=1 << 100, epsilon=0.1))
+        with self.assertRaisesRegex(ValueError, str(self.p)):
+            small_roots([1, 2, self.p], self.n)
+
+    def test_factor_with_known_msb(self):
+        unknown_bits = 80
+        p_msb = self.p >> unknown_bits << unknown_bits
+        self.assertEqual(factor_with_known_msb(self.n, p_msb, unknown_bits), (self.p, self.q))
+
+    def test_stereotyped_message_attack(self):
+        e, unknown_bits = 3, 100
+        m = random.getrandbits(500)
+        c = pow(m, e, self.n)
+        self.assertEqual(stereotyped_message_attack(self.n, e, c, m >> unknown_bits << unknown_bits, unknown_bits), m)
+
+    def test_boneh_durfee_attack(self):
+        phi = (self.p - 1) * (self.q - 1)
+        while gmpy2.gcd(d := random.getrandbits(130) | 1, phi) != 1:
+            pass
+        e = pow(d, -1, phi)
+        self.assertEqual(boneh_durfee_attack(self.n, e), d)
+
+    def test_solver(self):
+        e, m = 0x10001, random.getrandbits(500)
+        solver = RSASolver()
+        solver.n, solver.e, solver.c = self.n, e, pow(m, e, self.n)
+        solver.p_msb, solver.p_unknown_bits = self.p >> 80 << 80, 80
+        self.assertEqual(solver.solve(plaintext=False), m)
+
+        solver = RSASolver()
+        solver.n, solver.e, solver.c = self.n, 3, pow(m, 3, self.n)
+        solver.m_msb, solver.m_unknown_bits = m >> 100 << 100, 100
+        self.assertEqual(solver.solve(plaintext=False), m)
@@ -0,0 +1,82 @@
+import random
+import unittest
+
+import gmpy2
+
+from toyotama.crypto.dlog import babystep_giantstep, discrete_log, pohlig_hellman, pollard_kangaroo, pollard_rho
+
+
+def generate_subgroup(qbits: int, pbits: int = 128) -> tuple[int, int, int]:
+    q = int(gmpy2.next_prime(random.getrandbits(qbits)))
+    while not gmpy2.is_prime(p := 2 * random.getrandbits(pbits - qbits) * q + 1):
+        pass
+    while (g := pow(random.randrange(2, p), (p - 1) // q, p)) == 1:
+        pass
+    return p, q, g
+
+
+class DiscreteLogTestCase(unittest.TestCase):
+    def setUp(self):
+        self.p, self.q, self.g = generate_subgroup(32)
+        self.x = random.randrange(self.q)
+        self.y = pow(self.g, self.x, self.p)
+
+    def test_babystep_giantstep(self):
+        self.assertEqual(babystep_giantstep(self.g, self.y, self.p, self.q), self.x)
+        self.assertEqual(babystep_giantstep(self.g, self.y, self.p, self.q, memory=1 << 16), self.x)
+        self.assertEqual(babystep_giantstep(self.g, self.y, self.p, self.q, workers=2), self.x)
+
+    def test_pollard_rho(self):
+        self.assertEqual(pollard_rho(self.g, self.y, self.p, self.q), self.x)
+        self.assertEqual(discrete_log(self.g, self.y, self.p, self.q, memory=0, workers=2), self.x)
+
+    def test_pollard_rho_not_found(self):
+        # y is outside <g>, whose order is not the one given
+        p, q, g = generate_subgroup(20, 30)
+        y = next(y for y in range(2, p) if pow(y, q, p) != 1)
+        self.assertIsNone(pollard_rho(g, y, p, p - 1))
+
+    def test_pollard_kangaroo(self):
+        lower = max(0, self.x - random.randrange(1 << 24))
+        x = pollard_kangaroo(self.g, self.y, self.p, lower, lower + (1 << 24))
+        self.assertEqual(pow(self.g, x, self.p), self.y)
+
+        # a small range searched by BSGS
+        x = random.randrange(1000, 1101)
+        self.assertEqual(pollard_kangaroo(self.g, pow(self.g, x, self.p), self.p, 1000, 1100), x)
+        self.assertIsNone(pollard_kangaroo(self.g, pow(self.g, 1101, self.p), self.p, 1000, 1100))
+
+    def test_pohlig_hellman(self):
+        while True:
+            factor = [2, 2, 2, 3, 3, 5] + [int(gmpy2.next_prime(random.getrandbits(20))) for _ in range(3)]
+            p = gmpy2.mpz(2 * 2 * 2 * 3 * 3 * 5) * factor[6] * factor[7] * factor[8] + 1
+            if gmpy2.is_prime(p):
+                break
+        p = int(p)
+        g = next(g for g in range(2, p) if all(pow(g, (p - 1) // q, p) != 1 for q in set(factor)))
+        x = random.randrange(p - 1)
+
+        self.assertEqual(pohlig_hellman(g, pow(g, x, p), factor), (x, p - 1))
+        self.assertEqual(pohlig_hellman(g, pow(g, x, p), factor, workers=2), (x, p - 1))
+
+    def test_pohlig_hellman_not_found(self):
+        # y is outside the subgroup of order q
+        y = next(y for y in range(2, self.p) if pow(y, self.q, self.p) != 1)
+        self.assertIsNone(pohlig_hellman(self.g, y, [self.q], self.p))
+
+    def test_pohlig_hellman_no_group(self):
+        with self.assertRaises(ValueError):
+            pohlig_hellman(self.g, self.g)
+
+    def test_pohlig_hellman_prime_power(self):
+        # p - 1 = 2 * 3**40 * 7**3 * 1000003 * ...
+        while True:
+            factor = {2: 1, 3: 40, 7: 3, int(gmpy2.next_prime(random.getrandbits(24))): 2}
+            p = 2 * 3**40 * 7**3 * next(q for q in factor if q > 7) ** 2 + 1
+            if gmpy2.is_prime(p):
+                break
+        g = next(g for g in range(2, p) if all(pow(g, (p - 1) // q, p) != 1 for q in factor))
+        x = random.randrange(p - 1)
+
+        self.assertEqual(pohlig_hellman(g, pow(g, x, p), p=p), (x, p - 1))
+        self.assertEqual(pohlig_hellman(g, pow(g, x, p), factor, p, workers=2), (x, p - 1))
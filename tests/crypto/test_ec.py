@@ -0,0 +1,78 @@
+import random
+import unittest
+
+from toyotama.crypto.curve import P256, Curve, secp256k1
+from toyotama.crypto.ec import Point, batch_normalize, multi_scalar_mul, wnaf
+
+
+def affine_add(P, Q, curve):
+    if P is None:
+        return Q
+    if Q is None:
+        return P
+    p = curve.p
+    if P[0] == Q[0] and (P[1] + Q[1]) % p == 0:
+        return None
+    if P == Q:
+        l = (3 * P[0] * P[0] + curve.a) * pow(2 * P[1], -1, p) % p
+    else:
+        l = (Q[1] - P[1]) * pow(Q[0] - P[0], -1, p) % p
+    x = (l * l - P[0] - Q[0]) % p
+    return x, (l * (P[0] - x) - P[1]) % p
+
+
+class ECTestCase(unittest.TestCase):
+    def test_small_curve(self):
+        curve = Curve("small", 1009, 37, 11)
+        points = [None] + [(x, y) for x in range(curve.p) for y in range(curve.p) if (y * y - x**3 - curve.a * x - curve.b) % curve.p == 0]
+        P, Q = random.sample(points[1:], 2)
+
+        R = None
+        for k in range(2 * len(points) + 3):
+            self.assertEqual((curve.point(*P) * k).xy, R)
+            self.assertEqual((k * curve.point(*P)).xy, R)
+            R = affine_add(R, P, curve)
+
+        self.assertEqual((curve.point(*P) + curve.point(*Q)).xy, affine_add(P, Q, curve))
+        self.assertEqual((curve.point(*P) * len(points)), curve.O)
+        self.assertEqual(curve.point(*P) - curve.point(*P), curve.O)
+        self.assertEqual(curve.lift_x(P[0]).x, P[0])
+
+    def test_scalar_mul(self):
+        for curve in (P256, secp256k1):
+            G = curve.G
+            self.assertTrue(G.is_on_curve())
+            self.assertTrue((G * curve.order).is_infinity())
+            self.assertEqual(G * (curve.order + 1), G)
+
+            a, b = random.getrandbits(256), random.getrandbits(256)
+            self.assertEqual((G * a) * b, G * (a * b))
+            self.assertEqual(G * a + G * b, G * (a + b))
+            self.assertEqual(G * -a, -(G * a))
+            self.assertEqual(G.double().double(), G * 4)
+
+    def test_wnaf(self):
+        for w in range(2, 8):
+            k = random.getrandbits(256)
+            digits = wnaf(k, w)
+            self.assertEqual(sum(d << i for i, d in enumerate(digits)), k)
+            for i, d in enumerate(digits):
+                self.assertTrue(d == 0 or (d % 2 == 1 and abs(d) < 1 << (w - 1)))
+                if d:
+                    self.assertFalse(any(digits[i + 1 : i + w]))
+
+    def test_multi_scalar_mul(self):
+        for n in (1, 5, 40):
+            points = [P256.G * random.getrandbits(256) for _ in range(n)]
+            scalars = [random.getrandbits(256) - (1 << 255) for _ in range(n)]
+            expected = P256.O
+            for P, k in zip(points, scalars):
+                expected += P * k
+            self.assertEqual(multi_scalar_mul(points, scalars), expected)
+
+    def test_batch_normalize(self):
+        points = [P256.G * random.getrandbits(256) for _ in range(10)] + [P256.O]
+        normalized = batch_normalize(points)
+        self.assertEqual(normalized, points)
+        self.assertTrue(all(P.Z == 1 for P in normalized[:-1]))
+        self.assertIsInstance(normalized[0], Point)
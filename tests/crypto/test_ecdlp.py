@@ -0,0 +1,99 @@
+import random
+import unittest
+
+import gmpy2
+
+from toyotama.crypto.curve import Curve
+from toyotama.crypto.ecdlp import (
+    ec_babystep_giantstep,
+    ec_discrete_log,
+    ec_pohlig_hellman,
+    ec_pollard_rho,
+    embedding_degree,
+    is_anomalous,
+    mov_attack,
+    smart_attack,
+)
+from toyotama.crypto.factor import factorize
+
+
+def random_point(curve):
+    while (P := curve.lift_x(random.randrange(curve.p))) is None:
+        pass
+    return P
+
+
+def anomalous_curve(bits):
+    # y^2 = x^3 + b with p = (1 + 3v^2)/4 has a twist of order p + 1 - 1
+    while True:
+        v = random.getrandbits(bits // 2) | 1
+        p = (1 + 3 * v * v) // 4
+        if gmpy2.is_prime(p):
+            break
+    for b in range(1, 100):
+        curve = Curve("anomalous", p, 0, b)
+        G = random_point(curve)
+        if (G * p).is_infinity():
+            curve.order, curve.gx, curve.gy = p, *G.xy
+            return curve
+
+
+def supersingular_curve(bits, cofactor_bits=16):
+    # y^2 = x^3 + x has p + 1 points for p = 3 (mod 4)
+    while True:
+        q = int(gmpy2.next_prime(random.getrandbits(bits)))
+        p = q * random.getrandbits(cofactor_bits) * 4 - 1
+        if gmpy2.is_prime(p):
+            break
+    curve = Curve("supersingular", p, 1, 0)
+    while (G := random_point(curve) * ((p + 1) // q)).is_infinity():
+        pass
+    curve.order, curve.gx, curve.gy = q, *G.xy
+    return curve
+
+
+class ECDLPTestCase(unittest.TestCase):
+    def test_babystep_giantstep(self):
+        curve = supersingular_curve(24)
+        k = random.randrange(curve.order)
+        self.assertEqual(ec_babystep_giantstep(curve.G, curve.G * k, curve.order), k)
+
+    def test_pollard_rho(self):
+        curve = supersingular_curve(28)
+        k = random.randrange(curve.order)
+        self.assertEqual(ec_pollard_rho(curve.G, curve.G * k, curve.order), k)
+        self.assertEqual(ec_pollard_rho(curve.G, curve.G * k, curve.order, workers=2), k)
+
+    def test_pohlig_hellman(self):
+        curve = supersingular_curve(20)
+        G = random_point(curve)
+        # the group of y^2 = x^3 + x may not be cyclic, so find the order of G
+        order = curve.p + 1
+        for q in factorize(order):
+            while order % q == 0 and (G * (order // q)).is_infinity():
+                order //= q
+        k = random.randrange(order)
+        self.assertEqual(ec_pohlig_hellman(G, G * k, factorize(order)), (k, order))
+        self.assertEqual(ec_discrete_log(G, G * k, order), k)
+
+    def test_smart_attack(self):
+        curve = anomalous_curve(128)
+        self.assertTrue(is_anomalous(curve))
+        k = random.randrange(curve.order)
+        self.assertEqual(smart_attack(curve.G, curve.G * k), k)
+        self.assertEqual(ec_discrete_log(curve.G, curve.G * k), k)
+
+    def test_mov_attack(self):
+        curve = supersingular_curve(32, 200)
+        self.assertEqual(embedding_degree(curve.order, curve.p), 2)
+        k = random.randrange(curve.order)
+        self.assertEqual(mov_attack(curve.G, curve.G * k), k)
+        self.assertEqual(ec_discrete_log(curve.G, curve.G * k), k)
+        self.assertEqual(ec_discrete_log(curve.G, curve.G * k, curve_order=curve.p + 1), k)
+        # the order of G does not divide p
+        self.assertIsNone(mov_attack(curve.G, curve.G * k, curve_order=curve.p))
+
+        # the number of points follows from the order of G by the Hasse bound
+        curve = supersingular_curve(32)
+        k = random.randrange(curve.order)
+        self.assertEqual(mov_attack(curve.G, curve.G * k), k)
@@ -0,0 +1,77 @@
+import random
+import unittest
+from math import prod
+
+import gmpy2
+
+from toyotama.crypto.factor import FactorizationPipeline, batch_gcd, ecm, factorize, fermat, pollard_pm1, prime_sieve, williams_pp1
+from toyotama.crypto.rsa import RSASolver
+
+
+def generate_prime(bits):
+    return int(gmpy2.next_prime(random.getrandbits(bits) | 1 << (bits - 1)))
+
+
+def generate_smooth_prime(bits: int, delta: int) -> int:
+    primes = prime_sieve(10000)[1:]
+    while True:
+        p = 2 * prod(random.sample(primes, bits // 13))
+        if gmpy2.is_prime(p + delta):
+            return p + delta
+
+
+class FactorTestCase(unittest.TestCase):
+    def test_prime_sieve(self):
+        self.assertEqual(prime_sieve(30), [2, 3, 5, 7, 11, 13, 17, 19, 23, 29])
+        self.assertEqual(prime_sieve(10000), [p for p in range(10000) if gmpy2.is_prime(p)])
+
+    def test_factorize(self):
+        n = 2**10 * 3 * generate_prime(20) ** 3 * generate_prime(40) * generate_prime(40)
+        factors = factorize(n)
+        self.assertEqual(prod(p**k for p, k in factors.items()), n)
+        self.assertTrue(all(gmpy2.is_prime(p) for p in factors))
+
+    def test_methods(self):
+        q = generate_prime(256)
+
+        p = generate_prime(256)
+        r = int(gmpy2.next_prime(p + random.getrandbits(100)))
+        self.assertEqual(fermat(p * r), p)
+
+        p = generate_smooth_prime(128, 1)
+        self.assertEqual(pollard_pm1(p * q, bound=10000), p)
+
+        # p - 1 = 2 * 3**5 * small primes, exactly 243-powersmooth
+        small = [5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97, 101, 103, 107, 109, 113]
+        while not gmpy2.is_prime(p := 2 * 3**5 * prod(random.sample(small, 12)) + 1):
+            pass
+        self.assertEqual(pollard_pm1(p * q, bound=243), p)
+
+        p = generate_smooth_prime(128, -1)
+        self.assertEqual(williams_pp1(p * q, bound=10000, seeds=tuple(range(3, 30, 2))), p)
+
+        p = generate_prime(32)
+        self.assertEqual(ecm(p * q, bound=2000, curves=200), p)
+
+    def test_batch_gcd(self):
+        p, q, r, s, t = (generate_prime(64) for _ in range(5))
+        self.assertEqual(batch_gcd([p * q, q * r, s * t]), [q, q, 1])
+        self.assertEqual(batch_gcd([p * q, q * r, s * t, p * r]), [q, q, 1, p])
+        self.assertEqual(batch_gcd([s * t, p * q, s * t]), [s * t, 1, s * t])
+
+    def test_pipeline(self):
+        found = []
+        n = generate_prime(24) * generate_prime(32) ** 2 * generate_prime(200)
+        factors, composites = FactorizationPipeline(lambda p, k: found.append((p, k)), workers=2, budget=10).run(n)
+        self.assertEqual(composites, [])
+        self.assertEqual(prod(p**k for p, k in factors.items()), n)
+        self.assertEqual(prod(p**k for p, k in found), n)
+
+    def test_rsa_solver(self):
+        p, q, e = generate_prime(200), generate_prime(32), 0x10001
+        m = random.getrandbits(200)
+
+        solver = RSASolver()
+        solver.n, solver.e, solver.c = p * q, e, pow(m, e, p * q)
+        solver.checkers = [solver._check_factorization]
+        self.assertEqual(solver.solve(plaintext=False), m)
@@ -0,0 +1,78 @@
+import hashlib
+import random
+import unittest
+
+from toyotama.crypto.hash import MD5, SHA1, SHA256, SHA512, MerkleDamgardHash
+from toyotama.crypto.hash.sha256 import length_extension, length_extension_batch
+
+
+class SHA256TestCase(unittest.TestCase):
+    def test_digest(self):
+        for n in (0, 1, 55, 56, 63, 64, 65, 1000):
+            data = random.randbytes(n)
+            self.assertEqual(SHA256(data).digest(), hashlib.sha256(data).digest())
+            self.assertEqual(SHA256(data).hexdigest(), hashlib.sha256(data).hexdigest())
+
+    def test_update(self):
+        data = random.randbytes(1000)
+        h = SHA256()
+        for i in range(0, len(data), 37):
+            h.update(data[i : i + 37])
+            self.assertEqual(h.digest(), hashlib.sha256(data[: i + 37]).digest())
+
+        h1 = SHA256(data[:500])
+        h2 = h1.copy()
+        h2.update(data[500:])
+        self.assertEqual(h1.digest(), hashlib.sha256(data[:500]).digest())
+        self.assertEqual(h2.digest(), hashlib.sha256(data).digest())
+
+    def test_length_extension(self):
+        secret, message, suffix = random.randbytes(random.randrange(8, 40)), b"user=guest", b";admin=true" * 10
+        digest = hashlib.sha256(secret + message).digest()
+
+        new_digest, appended = length_extension(digest, len(secret + message), suffix)
+        self.assertEqual(new_digest, hashlib.sha256(secret + message + appended).digest())
+        self.assertTrue(appended.endswith(suffix))
+
+        candidates = length_extension_batch(digest, message, suffix, range(1, 64))
+        self.assertEqual(len(candidates), 63)
+        for secret_len, new_digest, forged in candidates:
+            self.assertTrue(forged.startswith(message))
+            self.assertEqual(new_digest == hashlib.sha256(secret + forged).digest(), secret_len == len(secret))
+
+
+class HashFamilyTestCase(unittest.TestCase):
+    ALGORITHMS = [(MD5, hashlib.md5), (SHA1, hashlib.sha1), (SHA256, hashlib.sha256), (SHA512, hashlib.sha512)]
+
+    def test_digest(self):
+        for H, reference in self.ALGORITHMS:
+            for n in (0, 1, 55, 56, 63, 64, 111, 112, 127, 128, 129, 1000):
+                data = random.randbytes(n)
+                self.assertEqual(H(data).digest(), reference(data).digest(), (H, n))
+
+            h = H()
+            data = random.randbytes(300)
+            for i in range(0, len(data), 7):
+                h.update(data[i : i + 7])
+            self.assertEqual(h.copy().hexdigest(), reference(data).hexdigest())
+
+    def test_state(self):
+        for H, reference in self.ALGORITHMS:
+            data = random.randbytes(3 * H.BLOCK_SIZE)
+            state = H.compress(H.INITIAL_VECTOR, data[: 2 * H.BLOCK_SIZE])
+            h = H(data[2 * H.BLOCK_SIZE :], iv=state, input_bytes=2 * H.BLOCK_SIZE)
+            self.assertEqual(h.digest(), reference(data).digest())
+
+    def test_abstract(self):
+        class Incomplete(MerkleDamgardHash):
+            DIGEST_SIZE, STATE_FORMAT, INITIAL_VECTOR = 4, ">L", [0]
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_length_extension(self):
+        for H, reference in self.ALGORITHMS:
+            secret, message, suffix = random.randbytes(16), b"file=a.txt", b"&file=flag.txt"
+            digest = reference(secret + message).digest()
+            for secret_len, new_digest, forged in H.length_extension_batch(digest, message, suffix, range(8, 24)):
+                self.assertEqual(new_digest == reference(secret + forged).digest(), secret_len == len(secret))
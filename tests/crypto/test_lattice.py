@@ -0,0 +1,62 @@
+import random
+import unittest
+
+from toyotama.crypto.lattice import babai, bkz, lll
+
+
+def _norm(v: list[int]) -> int:
+    return sum(x * x for x in v)
+
+
+def _knapsack(n: int) -> tuple[list[list[int]], list[int]]:
+    a = [random.getrandbits(2 * n) for _ in range(n)]
+    x = [random.randrange(2) for _ in range(n)]
+    s = sum(ai * xi for ai, xi in zip(a, x))
+    N = 1 << n
+    basis = [[2 * (i == j) for j in range(n)] + [N * a[i]] for i in range(n)]
+    basis.append([1] * n + [N * s])
+    return basis, [2 * xi - 1 for xi in x]
+
+
+class LatticeTestCase(unittest.TestCase):
+    def test_lll(self):
+        basis = [[1, 0, 0, 31], [0, 1, 0, 41], [0, 0, 1, 59], [0, 0, 0, 1000]]
+        for exact in (False, True):
+            reduced = lll(basis, exact=exact)
+            self.assertEqual(sorted(map(abs, reduced[0])), [0, 1, 2, 3])
+            for row in reduced:
+                self.assertEqual((31 * row[0] + 41 * row[1] + 59 * row[2] - row[3]) % 1000, 0)
+
+        # linearly dependent
+        self.assertEqual(len(lll([[1, 2, 3], [2, 4, 6], [1, 0, 1]])), 2)
+
+    def test_knapsack(self):
+        for n in (20, 40):
+            basis, x = _knapsack(n)
+            reduced = lll(basis)
+            self.assertTrue(any(row[:-1] in (x, [-v for v in x]) and row[-1] == 0 for row in reduced))
+
+    def test_random(self):
+        n = 60
+        basis = [[random.getrandbits(100) for _ in range(n)] for _ in range(n)]
+        reduced = lll(basis)
+        self.assertEqual(len(reduced), n)
+        self.assertLessEqual(_norm(reduced[0]), _norm(min(basis, key=_norm)))
+
+    def test_bkz(self):
+        n = 30
+        basis = [[random.getrandbits(60) if j == 0 else int(i == j) for j in range(n)] for i in range(n)]
+        basis[0] = [1 << 60] + [0] * (n - 1)
+        self.assertLessEqual(_norm(bkz(basis, 10)[0]), _norm(lll(basis)[0]))
+
+    def test_babai(self):
+        n = 20
+        basis = [[random.randrange(-1000, 1000) for _ in range(n)] for _ in range(n)]
+        coefficients = [random.randrange(-50, 50) for _ in range(n)]
+        v = [sum(c * row[j] for c, row in zip(coefficients, basis)) for j in range(n)]
+        target = [x + random.randrange(-3, 4) for x in v]
+        self.assertEqual(babai(basis, target), v)
+
+
+if __name__ == "__main__":
+    unittest.main()
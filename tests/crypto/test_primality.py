@@ -0,0 +1,37 @@
+import random
+import unittest
+
+import gmpy2
+
+from toyotama.crypto.primality import bpsw, is_prime, is_prime_many, miller_rabin
+
+
+class PrimalityTestCase(unittest.TestCase):
+    def test_is_prime(self):
+        self.assertEqual([n for n in range(-10, 5000) if is_prime(n)], [n for n in range(5000) if gmpy2.is_prime(n)])
+
+        for bits in (20, 40, 64, 82, 128, 512):
+            for _ in range(100):
+                n = random.getrandbits(bits)
+                self.assertEqual(is_prime(n), gmpy2.is_prime(n), n)
+
+    def test_pseudoprimes(self):
+        # Carmichael numbers
+        for n in (561, 41041, 825265, 321197185, 5394826801, 232250619601, 9746347772161):
+            self.assertFalse(is_prime(n))
+        # Strong pseudoprimes to the bases 2, 3, ..., 37
+        n = 318665857834031151167461
+        self.assertTrue(miller_rabin(n, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)))
+        self.assertFalse(miller_rabin(n))
+        self.assertFalse(is_prime(n))
+        self.assertFalse(bpsw(3825123056546413051))
+
+        p = 2**521 - 1
+        self.assertTrue(is_prime(p))
+        self.assertFalse(is_prime(p * (2**127 - 1)))
+
+    def test_is_prime_many(self):
+        ns = [random.getrandbits(256) for _ in range(2000)] + [2, 3, 4, 1021, 2**127 - 1]
+        expected = [bool(gmpy2.is_prime(n)) for n in ns]
+        self.assertEqual(is_prime_many(ns), expected)
+        self.assertEqual(is_prime_many(ns, workers=2), expected)
@@ -0,0 +1,41 @@
+import hashlib
+import unittest
+
+from toyotama.crypto.proof_of_work import solve_pow, solve_pow_challenge
+
+
+class ProofOfWorkTestCase(unittest.TestCase):
+    def test_zero_bits(self):
+        for workers in (1, 2):
+            nonce = solve_pow(b"prefix", zero_bits=12, workers=workers)
+            digest = hashlib.sha256(b"prefix" + nonce).digest()
+            self.assertLess(int.from_bytes(digest, "big"), 1 << (256 - 12))
+
+    def test_hex_prefix(self):
+        nonce = solve_pow(b"abc", hash_name="md5", hex_prefix="abc", workers=1)
+        self.assertTrue(hashlib.md5(b"abc" + nonce).hexdigest().startswith("abc"))
+
+    def test_digest(self):
+        digest = hashlib.sha1(b"z9" + b"suffix").hexdigest()
+        self.assertEqual(solve_pow(suffix=b"suffix", hash_name="sha1", digest=digest, length=2, workers=2), b"z9")
+
+    def test_challenge(self):
+        line = f"sha256(XXX + 'tail') == {hashlib.sha256(b'Ab1tail').hexdigest()}".encode()
+        self.assertEqual(solve_pow_challenge(line, workers=1), b"Ab1")
+
+        answer = solve_pow_challenge('sha256("head" + S).hexdigest().startswith("000")', workers=1)
+        self.assertTrue(hashlib.sha256(b"head" + answer).hexdigest().startswith("000"))
+
+        answer = solve_pow_challenge("Give me S such that sha256(head + S) has 10 leading zero bits", workers=1)
+        self.assertLess(int.from_bytes(hashlib.sha256(b"head" + answer).digest(), "big"), 1 << 246)
+
+        stamp = solve_pow_challenge("hashcash -mb8 resource", workers=1)
+        self.assertTrue(stamp.startswith(b"1:8:"))
+        self.assertEqual(hashlib.sha1(stamp).digest()[0], 0)
+
+        with self.assertRaises(ValueError):
+            solve_pow_challenge("give me a flag")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import random
+import unittest
+
+import gmpy2
+
+from toyotama.crypto.rng import LCG, MT19937, lcg_crack, lcg_crack_truncated, lcg_jump, lcg_modulus, mt19937_recover, mt19937_solve, temper, untemper
+
+
+class LCGTestCase(unittest.TestCase):
+    def setUp(self):
+        self.m = int(gmpy2.next_prime(random.getrandbits(64)))
+        self.a, self.b, self.seed = (random.randrange(self.m) for _ in range(3))
+
+    def test_crack(self):
+        lcg = LCG(self.a, self.b, self.m, self.seed)
+        x = [next(lcg) for _ in range(10)]
+        self.assertEqual(lcg_crack(x), (self.a, self.b, self.m))
+        self.assertEqual(lcg_modulus([next(lcg) for _ in range(1000)]), self.m)
+
+        # few samples leave spurious factors, but not at the expense of a power-of-two modulus
+        a, b, m = 6364136223846793005, 1442695040888963407, 1 << 64
+        for _ in range(500):
+            lcg = LCG(a, b, m, random.getrandbits(64))
+            self.assertEqual(lcg_modulus([next(lcg) for _ in range(6)]) % m, 0)
+
+    def test_jump(self):
+        lcg = LCG(self.a, self.b, self.m, self.seed)
+        x = [next(lcg) for _ in range(1000)]
+        self.assertEqual(lcg_jump(self.seed, self.a, self.b, self.m, 1000), x[-1])
+        self.assertEqual(lcg_jump(x[-1], self.a, self.b, self.m, -999), x[0])
+        self.assertEqual(lcg.prev(), x[-2])
+        self.assertEqual(lcg.jump(2), next(LCG(self.a, self.b, self.m, x[-1])))
+
+    def test_crack_truncated(self):
+        for shift, k in ((32, 6), (48, 12)):
+            lcg = LCG(self.a, self.b, self.m, self.seed)
+            x = [next(lcg) for _ in range(k)]
+            self.assertEqual(lcg_crack_truncated([v >> shift for v in x], shift, self.a, self.b, self.m), x[0])
+
+        a, b, m = 6364136223846793005, 1442695040888963407, 1 << 64
+        lcg = LCG(a, b, m, self.seed)
+        x = [next(lcg) for _ in range(10)]
+        self.assertEqual(lcg_crack_truncated([v >> 32 for v in x], 32, a, b, m), x[0])
+
+
+class MT19937TestCase(unittest.TestCase):
+    def test_compatible(self):
+        for seed in (0, 12345, 1 << 100 | 7):
+            r, mt = random.Random(seed), MT19937.from_seed(seed)
+            self.assertEqual([r.getrandbits(k) for k in (1, 32, 100)], [mt.getrandbits(k) for k in (1, 32, 100)])
+            self.assertEqual(r.random(), mt.random())
+            self.assertEqual(r.getstate(), mt.to_random().getstate())
+
+    def test_untemper(self):
+        for y in [0, (1 << 32) - 1] + [random.getrandbits(32) for _ in range(1000)]:
+            self.assertEqual(untemper(temper(y)), y)
+
+    def test_recover(self):
+        r = random.Random()
+        for bits, n in ((32, 624), (64, 400)):
+            mt = mt19937_recover([r.getrandbits(bits) for _ in range(n)], bits)
+            self.assertEqual(mt.to_random().getrandbits(256), r.getrandbits(256))
+
+    def test_solve(self):
+        r = random.Random()
+        outputs = [r.getrandbits(8) for _ in range(2600)]
+        self.assertEqual(mt19937_solve(outputs, 8).getrandbits(64), r.getrandbits(64))
+
+        outputs = [r.getrandbits(40) for _ in range(1300)]
+        outputs[::2] = [None] * 650
+        self.assertEqual(mt19937_recover(outputs, 40).getrandbits(64), r.getrandbits(64))
+
+        with self.assertRaises(ValueError):
+            mt19937_solve([r.getrandbits(8) for _ in range(100)], 8)
+
+    def test_jump(self):
+        r = random.Random()
+        r.getrandbits(32 * 100)
+        mt = MT19937.from_random(r)
+        for n in (0, 1, 623, 624, 100000):
+            mt.jump(n)
+            for _ in range(n):
+                r.getrandbits(32)
+            self.assertEqual(mt.genrand(), r.getrandbits(32))
+
+        a, b = MT19937.from_seed(1), MT19937.from_seed(1)
+        a.jump(10**12)
+        a.jump(10**12)
+        b.jump(2 * 10**12)
+        self.assertEqual(a.getrandbits(64), b.getrandbits(64))
+
+
+if __name__ == "__main__":
+    unittest.main()
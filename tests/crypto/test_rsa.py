@@ -0,0 +1,143 @@
+import random
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import gmpy2
+
+from toyotama.crypto.rsa import (
+    RSASolver,
+    batch_gcd_attack,
+    hastad_broadcast_attack,
+    lsb_decryption_oracle_attack,
+    lsb_decryption_oracle_attack_batch,
+    rsa_checker,
+)
+
+
+def generate_prime(bits):
+    return int(gmpy2.next_prime(random.getrandbits(bits)))
+
+
+class RSATestCase(unittest.TestCase):
+    def setUp(self):
+        p, q = generate_prime(256), generate_prime(256)
+        self.factors = [p, q]
+        self.n, self.e = p * q, 0x10001
+        self.d = pow(self.e, -1, (p - 1) * (q - 1))
+        self.m = random.randrange(self.n)
+        self.c = pow(self.m, self.e, self.n)
+
+    def oracle(self, c: int) -> bool:
+        return pow(c, self.d, self.n) & 1
+
+    def test_lsb_decryption_oracle_attack(self):
+        self.assertEqual(lsb_decryption_oracle_attack(self.n, self.e, self.c, self.oracle, debug=False), self.m)
+
+    def test_lsb_decryption_oracle_attack_batch(self):
+        queries = []
+
+        def oracle(cs: list[int]) -> list[bool]:
+            queries.append(len(cs))
+            return [self.oracle(c) for c in cs]
+
+        self.assertEqual(lsb_decryption_oracle_attack_batch(self.n, self.e, self.c, oracle, batch_size=100, debug=False), self.m)
+        self.assertEqual(sum(queries), self.n.bit_length())
+        self.assertEqual(len(queries), -(-self.n.bit_length() // 100))
+
+    def test_batch_gcd_attack(self):
+        primes = [generate_prime(128) for _ in range(20)]
+        moduli = [primes[i] * primes[i + 1] for i in range(10)] + [primes[i] * primes[i + 1] for i in range(11, 19)]
+
+        solvers = []
+        for n in moduli:
+            solver = RSASolver()
+            solver.n, solver.e, solver.c = n, self.e, pow(self.m, self.e, n)
+            solvers.append(solver)
+
+        factorized = batch_gcd_attack(solvers)
+        self.assertEqual(len(factorized), len(moduli))
+        for solver in factorized:
+            self.assertEqual(solver.solve(plaintext=False), self.m % solver.n)
+
+    def test_hastad_broadcast_attack(self):
+        e = 17
+        moduli = [generate_prime(256) * generate_prime(256) for _ in range(e)]
+        m = random.getrandbits(500)
+        c = [pow(m, e, n) for n in moduli]
+        self.assertEqual(hastad_broadcast_attack(c, moduli), m)
+        self.assertIsNone(hastad_broadcast_attack(c[:10], moduli[:10], e))
+
+    def test_solver_wieners_attack(self):
+        p, q = generate_prime(256), generate_prime(256)
+        phi = (p - 1) * (q - 1)
+        while gmpy2.gcd(d := random.getrandbits(100) | 1, phi) != 1:
+            pass
+        e = pow(d, -1, phi)
+
+        solver = RSASolver()
+        solver.n, solver.e, solver.c = p * q, e, pow(self.m % (p * q), e, p * q)
+        self.assertEqual(solver.solve(plaintext=False), self.m % (p * q))
+        self.assertEqual(solver.d, d)
+
+        solver = RSASolver()
+        solver.n = p * q
+        solver.checkers = [solver._check_wieners_attack]
+        self.assertIsNone(solver.solve())
+
+    def test_solver_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            solver = RSASolver()
+            solver.n, solver.e, solver.c, solver.cache_dir = self.n, self.e, self.c, cache_dir
+            solver.checkers = [rsa_checker(cost=0.0)(lambda: solver.__dict__.update(factors=[(p, 1) for p in self.factors], factorized=True))]
+            self.assertEqual(solver.solve(plaintext=False), self.m)
+            (path,) = Path(cache_dir).iterdir()
+            inode = path.stat().st_ino
+
+            solver = RSASolver()
+            solver.n, solver.e, solver.c, solver.cache_dir = self.n, self.e, self.c, cache_dir
+            solver.checkers = []
+            self.assertEqual(solver.solve(plaintext=False), self.m)
+            self.assertEqual(solver.d, self.d)
+            # a hit does not rewrite the cache
+            self.assertEqual(path.stat().st_ino, inode)
+
+    def test_solver_race(self):
+        solver = RSASolver()
+        solver.n, solver.e, solver.c, solver.workers = self.n, self.e, self.c, 2
+
+        @rsa_checker(cost=5.0)
+        def sleep():
+            time.sleep(60)
+
+        @rsa_checker(cost=6.0)
+        def succeed():
+            solver.d = self.d
+
+        @rsa_checker(cost=5.0, timeout=0.5)
+        def sleep_briefly():
+            time.sleep(60)
+
+        start = time.monotonic()
+        solver.checkers = [sleep, succeed]
+        self.assertEqual(solver.solve(plaintext=False), self.m)
+
+        solver.d = solver.m = None
+        solver.workers = 1
+        solver.checkers = [sleep_briefly, succeed]
+        self.assertEqual(solver.solve(plaintext=False), self.m)
+        self.assertLess(time.monotonic() - start, 10)
+
+    def test_solver_budget(self):
+        solver = RSASolver()
+        solver.n, solver.e, solver.c, solver.workers, solver.budget = self.n, self.e, self.c, 1, 1.0
+
+        @rsa_checker(cost=5.0)
+        def sleep():
+            time.sleep(60)
+
+        start = time.monotonic()
+        solver.checkers = [sleep, sleep]
+        self.assertIsNone(solver.solve())
+        self.assertLess(time.monotonic() - start, 10)
@@ -1,9 +1,21 @@
 import random
 import unittest
+from math import gcd, prod
 
 import gmpy2
 
-from toyotama.crypto.util import chinese_remainder, mod_sqrt
+from toyotama.crypto.util import (
+    batch_inverse,
+    batch_mod_sqrt,
+    chinese_remainder,
+    extended_gcd,
+    inverse,
+    miller_rabin_Test,
+    mod_sqrt,
+    product_tree,
+    remainder_tree,
+    xor,
+)
 
 
 def generate_prime(bits):
@@ -11,18 +23,77 @@ def generate_prime(bits):
 
 
 class UtilTestCase(unittest.TestCase):
+    def test_miller_rabin_Test(self):
+        p = generate_prime(256)
+        self.assertTrue(miller_rabin_Test(p))
+        self.assertTrue(miller_rabin_Test(p, 20))
+        self.assertFalse(miller_rabin_Test(p * generate_prime(64), 20))
+
     def test_mod_sqrt(self):
         p = generate_prime(1024)
-        x = random.getrandbits(1024)
+        x = random.randrange(p)
         xx = x * x % p
         X = mod_sqrt(xx, p)
         ok = x == X or x == p - X
 
         self.assertTrue(ok)
 
+    def test_batch_mod_sqrt(self):
+        # p = 1 (mod 2**16) makes Tonelli-Shanks take many rounds
+        p = random.getrandbits(256) << 16 | 1
+        while not gmpy2.is_prime(p):
+            p += 1 << 16
+        non_residue = next(v for v in range(2, p) if gmpy2.jacobi(v, p) == -1)
+        x = [random.randrange(p) for _ in range(50)]
+        roots = batch_mod_sqrt([v * v for v in x] + [non_residue], p)
+        for v, r in zip(x, roots):
+            self.assertIn(r, (v, p - v))
+        self.assertEqual(roots[-1], 0)
+
+    def test_inverse(self):
+        a, b = random.getrandbits(512), random.getrandbits(512)
+        x, y, g = extended_gcd(a, b)
+        self.assertEqual(a * x + b * y, g)
+        self.assertEqual(g, gcd(a, b))
+
+        n = random.getrandbits(512) | 1
+        a = [random.randrange(n) for _ in range(100)] + [0, n - 1]
+        self.assertEqual(batch_inverse(a, n), [inverse(v, n) for v in a])
+        for v, inv in zip(a, batch_inverse(a, n)):
+            self.assertEqual(v * inv % n, 1 if gcd(v, n) == 1 else 0)
+
     def test_chinese_remainder(self):
         y = random.getrandbits(1024)
         m = [random.getrandbits(512) for _ in range(4)]
         a = [y % x for x in m]
         A, M = chinese_remainder(a, m)
         self.assertEqual(A % M, y)
+
+        m = [generate_prime(64) for _ in range(100)]
+        a = [y % x for x in m]
+        self.assertEqual(chinese_remainder(a, m), (y, prod(m)))
+
+        self.assertEqual(chinese_remainder([1, 3], [4, 6]), (9, 12))
+        self.assertEqual(chinese_remainder([1, 2], [4, 6]), (0, 0))
+
+    def test_product_tree(self):
+        m = [random.getrandbits(64) | 1 for _ in range(13)]
+        tree = product_tree(m)
+        self.assertEqual(tree[0], m)
+        self.assertEqual(tree[-1], [prod(m)])
+
+        x = random.getrandbits(1024)
+        self.assertEqual(remainder_tree(x, tree), [x % v for v in m])
+        self.assertEqual(remainder_tree(x, tree, square=True), [x % (v * v) for v in m])
+
+    def test_xor(self):
+        a = random.randbytes(1000)
+        b = random.randbytes(1200)
+        key = b"key"
+        self.assertEqual(xor(a, b), bytes(x ^ y for x, y in zip(a, b)))
+        self.assertEqual(xor(a, key, cycle=True), bytes(x ^ key[i % 3] for i, x in enumerate(a)))
+        self.assertRaises(ValueError, xor, a, b, strict=True)
+
+        out = bytearray(1000)
+        self.assertIs(xor(a, a, out=out), out)
+        self.assertEqual(out, bytes(1000))
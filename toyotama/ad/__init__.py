@@ -1 +1,3 @@
+from toyotama.ad.runner import *
+from toyotama.ad.submitter import *
 from toyotama.ad.util import *
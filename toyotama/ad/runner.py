@@ -0,0 +1,132 @@
+"""Attack-and-Defense exploit runner
+"""
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any
+
+from ..util.log import get_logger
+from ..util.util import extract_flag
+
+logger = get_logger()
+
+
+class ExploitRunner:
+    """Run an exploit against every team in parallel and submit the flags.
+
+    `exploit` is called as ``exploit(target)`` on a thread pool (or a process pool
+    with ``process=True``, in which case it must be picklable). It returns either the
+    raw output (str or bytes), from which flags are taken with `extract_flag`, or an
+    iterable of flags. Flags that have not been seen by this runner yet are handed to
+    `submit` from a background thread as soon as each target finishes, so submission
+    overlaps with the remaining exploits.
+
+    A target that runs longer than `timeout` seconds is abandoned. Python cannot
+    interrupt a running thread, so exploits should still set their own socket
+    timeouts to give the worker back.
+
+    Args:
+        exploit (Callable[[str], Any]): The exploit.
+        submit (Callable[[list[str]], Any], optional): Called with each batch of new flags.
+        workers (int, optional): The number of workers. Defaults to 32.
+        timeout (float, optional): The time limit per target in seconds. Defaults to 30.0.
+        process (bool, optional): Use a process pool instead of a thread pool. Defaults to False.
+        head (str, optional): The head of flag format. Defaults to "{".
+        tail (str, optional): The tail of flag format. Defaults to "}".
+    """
+
+    POLL_INTERVAL: float = 0.05
+
+    def __init__(
+        self,
+        exploit: Callable[[str], Any],
+        submit: Callable[[list[str]], Any] | None = None,
+        workers: int = 32,
+        timeout: float = 30.0,
+        process: bool = False,
+        head: str = "{",
+        tail: str = "}",
+    ):
+        self.exploit = exploit
+        self.submit = submit
+        self.workers = workers
+        self.timeout = timeout
+        self.process = process
+        self.head = head
+        self.tail = tail
+        self.seen: set[str] = set()
+
+    def _extract(self, output: Any) -> set[str]:
+        if output is None:
+            return set()
+        if isinstance(output, (str, bytes)):
+            output = extract_flag(output, self.head, self.tail) or set()
+
+        return {flag.decode() if isinstance(flag, bytes) else flag for flag in output}
+
+    def _submitter(self, batches: queue.Queue):
+        while (flags := batches.get()) is not None:
+            try:
+                self.submit(flags)
+            except Exception as e:
+                logger.error(f"Submission failed: {e!r}")
+
+    def run(self, targets: Iterable[str]) -> dict[str, set[str]]:
+        """Run the exploit against all of the targets.
+
+        Args:
+            targets (Iterable[str]): The targets passed to the exploit.
+        Returns:
+            dict[str, set[str]]: The flags found for each target that finished in time.
+        """
+        results: dict[str, set[str]] = {}
+        new_flags = 0
+
+        batches: queue.Queue = queue.Queue()
+        submitter = threading.Thread(target=self._submitter, args=(batches,), daemon=True)
+        if self.submit:
+            submitter.start()
+
+        executor_class = ProcessPoolExecutor if self.process else ThreadPoolExecutor
+        executor = executor_class(max_workers=self.workers)
+        try:
+            pending: dict[Future, str] = {executor.submit(self.exploit, target): target for target in targets}
+            n_targets = len(pending)
+            started: dict[Future, float] = {}
+
+            while pending:
+                done, _ = wait(pending, timeout=self.POLL_INTERVAL, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    target = pending.pop(future)
+                    try:
+                        flags = self._extract(future.result())
+                    except Exception as e:
+                        logger.error(f"{target}: {e!r}")
+                        continue
+
+                    results[target] = flags
+                    new = flags - self.seen
+                    self.seen |= new
+                    new_flags += len(new)
+                    if new and self.submit:
+                        batches.put(sorted(new))
+
+                now = time.monotonic()
+                for future, target in list(pending.items()):
+                    if future.running():
+                        started.setdefault(future, now)
+                    if now - started.get(future, now) > self.timeout:
+                        logger.warning(f"{target}: timed out")
+                        del pending[future]
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            if submitter.is_alive():
+                batches.put(None)
+                submitter.join()
+
+        logger.info(f"{len(results)}/{n_targets} targets succeeded, {new_flags} new flags.")
+
+        return results
@@ -0,0 +1,195 @@
+"""Attack-and-Defense flag submission client
+"""
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+import requests
+
+from ..util.log import get_logger
+
+logger = get_logger()
+
+
+class FlagStore:
+    """Append-only on-disk set of flags that the game server has already accepted.
+
+    One flag per line, so the file can be shared between runs and inspected by hand.
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path: Path | None = Path(path) if path else None
+        self.flags: set[str] = set()
+        self._lock = threading.Lock()
+
+        if self.path and self.path.exists():
+            self.flags = set(self.path.read_text().split())
+
+    def __contains__(self, flag: str) -> bool:
+        return flag in self.flags
+
+    def __len__(self) -> int:
+        return len(self.flags)
+
+    def add(self, flags: Iterable[str]):
+        with self._lock:
+            new = [flag for flag in flags if flag not in self.flags]
+            self.flags.update(new)
+            if self.path and new:
+                with self.path.open("a") as f:
+                    f.writelines(f"{flag}\n" for flag in new)
+
+
+class FlagSubmitter:
+    """Submit flags from a bounded queue over a persistent HTTP session.
+
+    Flags are queued with `put` (or by calling the submitter, so it can be passed as
+    ``ExploitRunner(submit=...)``) and sent from a background thread. With
+    ``batch_size > 1`` up to `batch_size` flags are sent in a single request as a JSON
+    list; otherwise each flag is posted as ``flag=<flag>`` like `submit_flag`.
+    Requests are spaced to at most `rate` per second, and failed ones are retried with
+    exponential backoff. Flags found in `store`, or already queued, are dropped.
+
+    Args:
+        url (str): The submission endpoint.
+        token (str): The team token sent as the `x-api-key` header.
+        batch_size (int, optional): The maximum number of flags per request. Defaults to 1.
+        rate (float, optional): The maximum number of requests per second. Defaults to None (unlimited).
+        retries (int, optional): The number of retries per request. Defaults to 3.
+        backoff (float, optional): The first retry delay in seconds, doubled on each retry. Defaults to 0.5.
+        store (str | Path, optional): The file to keep accepted flags in. Defaults to None (in memory).
+        maxsize (int, optional): The capacity of the queue; `put` blocks when it is full. Defaults to 4096.
+        method (str, optional): The HTTP method. Defaults to "POST".
+        timeout (float, optional): The request timeout in seconds. Defaults to 10.0.
+        accepted (Callable[[list[str], requests.Response], Iterable[str]], optional):
+            Picks the flags that should not be submitted again from a response.
+            Defaults to all of them when the response status is 2xx.
+    """
+
+    FLUSH_INTERVAL: float = 0.2
+
+    def __init__(
+        self,
+        url: str,
+        token: str,
+        batch_size: int = 1,
+        rate: float | None = None,
+        retries: int = 3,
+        backoff: float = 0.5,
+        store: str | Path | None = None,
+        maxsize: int = 4096,
+        method: str = "POST",
+        timeout: float = 10.0,
+        accepted: Callable[[list[str], requests.Response], Iterable[str]] | None = None,
+    ):
+        self.url = url
+        self.batch_size = batch_size
+        self.interval = 1 / rate if rate else 0.0
+        self.retries = retries
+        self.backoff = backoff
+        self.store = FlagStore(store)
+        self.method = method
+        self.timeout = timeout
+        self.accepted = accepted or (lambda flags, response: flags if response.ok else [])
+
+        self.session = requests.Session()
+        self.session.headers["x-api-key"] = token
+
+        self.queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self.queued: set[str] = set()
+        self._lock = threading.Lock()
+        self._last_request = 0.0
+        self._closed = threading.Event()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def put(self, flag: str):
+        with self._lock:
+            if flag in self.store or flag in self.queued:
+                return
+            self.queued.add(flag)
+        self.queue.put(flag)
+
+    def put_many(self, flags: Iterable[str]):
+        for flag in flags:
+            self.put(flag)
+
+    __call__ = put_many
+
+    def _next_batch(self) -> list[str]:
+        try:
+            batch = [self.queue.get(timeout=self.FLUSH_INTERVAL)]
+        except queue.Empty:
+            return []
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _request(self, flags: list[str]) -> requests.Response | None:
+        if self.batch_size > 1:
+            kwargs = {"json": flags}
+        else:
+            kwargs = {"data": {"flag": flags[0]}}
+
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            wait = self._last_request + self.interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request = time.monotonic()
+
+            try:
+                response = self.session.request(self.method, self.url, timeout=self.timeout, **kwargs)
+                if response.status_code != 429 and response.status_code < 500:
+                    return response
+                logger.warning(f"Submission returned {response.status_code} (attempt {attempt + 1}/{self.retries + 1})")
+            except requests.RequestException as e:
+                logger.warning(f"Submission failed: {e!r} (attempt {attempt + 1}/{self.retries + 1})")
+
+            if attempt < self.retries:
+                time.sleep(delay)
+                delay *= 2
+
+        return None
+
+    def _run(self):
+        while not (self._closed.is_set() and self.queue.empty()):
+            if not (flags := self._next_batch()):
+                continue
+
+            try:
+                response = self._request(flags)
+                if response is None:
+                    logger.error(f"Gave up submitting {len(flags)} flags.")
+                else:
+                    logger.info(response.text)
+                    self.store.add(self.accepted(flags, response))
+            except Exception as e:
+                logger.error(e)
+            finally:
+                with self._lock:
+                    self.queued.difference_update(flags)
+                for _ in flags:
+                    self.queue.task_done()
+
+    def flush(self):
+        """Block until every queued flag has been submitted."""
+        self.queue.join()
+
+    def close(self):
+        self._closed.set()
+        self._worker.join()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, e_type, e_value, traceback):
+        self.close()
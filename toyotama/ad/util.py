@@ -8,17 +8,18 @@ from ..util.log import get_logger
 logger = get_logger()
 
 
-def submit_flag(flag: str, url: str, token: str):
+def submit_flag(flag: str, url: str, token: str, session: requests.Session | None = None):
     header = {
         "x-api-key": token,
     }
     data = {
         "flag": flag,
     }
-    response = requests.post(url, data=data, headers=header)
+    response = (session or requests).post(url, data=data, headers=header)
     logger.info(response.text)
 
 
 def submit_flags(flags: list[str], url: str, token: str):
-    for flag in flags:
-        submit_flag(flag, url, token)
+    with requests.Session() as session:
+        for flag in dict.fromkeys(flags):
+            submit_flag(flag, url, token, session)
@@ -1,4 +1,6 @@
+from .async_process import AsyncProcess
+from .async_socket import AsyncSocket
 from .process import Process
 from .socket import Socket
 
-__all__ = ["Socket", "Process"]
+__all__ = ["Socket", "Process", "AsyncSocket", "AsyncProcess"]
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import pty
+import signal
+import subprocess
+import tty
+from pathlib import Path
+
+from ..util.log import get_logger
+from .async_tube import AsyncTube
+
+logger = get_logger()
+
+
+class AsyncProcess(AsyncTube):
+    def __init__(self, args: list[str], env: dict[str, str] | None = None, timeout: float | None = None):
+        super().__init__(timeout=timeout)
+        self.path: Path = Path(args[0])
+        self.args: list[str] = args
+        self.env: dict[str, str] | None = env
+        self.proc: asyncio.subprocess.Process | None = None
+        self.transport: asyncio.ReadTransport | None = None
+
+    async def open(self) -> "AsyncProcess":
+        master, slave = pty.openpty()
+        try:
+            tty.setraw(master)
+            tty.setraw(slave)
+            self.proc = await asyncio.create_subprocess_exec(
+                *self.args,
+                env=self.env,
+                stdin=subprocess.PIPE,
+                stdout=slave,
+                stderr=subprocess.STDOUT,
+            )
+        except BaseException:
+            os.close(master)
+            raise
+        finally:
+            os.close(slave)
+
+        loop = asyncio.get_running_loop()
+        self.reader = asyncio.StreamReader()
+        # The transport owns the master from here and closes it in close().
+        self.transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(self.reader), os.fdopen(master, "rb", 0))
+        self.writer = self.proc.stdin
+
+        logger.info(f"Created a new process (PID: {self.proc.pid})")
+
+        return self
+
+    def pid(self) -> int:
+        return getattr(self.proc, "pid", -1)
+
+    @property
+    def returncode(self) -> int | None:
+        if self.proc is None:
+            return None
+        return self.proc.returncode
+
+    def is_alive(self) -> bool:
+        return self.proc is not None and self.proc.returncode is None
+
+    def is_dead(self) -> bool:
+        return not self.is_alive()
+
+    async def close(self):
+        if self.proc is None:
+            return
+
+        if self.proc.returncode is None:
+            self.proc.kill()
+        await self.proc.wait()
+
+        if self.proc.returncode < 0:
+            logger.info(f"{self.path!s} terminated: {signal.strsignal(-self.proc.returncode)} (PID={self.proc.pid})")
+        else:
+            logger.info(f"{self.path!s} exited with {self.proc.returncode} (PID={self.proc.pid})")
+
+        if self.transport is not None:
+            self.transport.close()
+
+        self.proc = self.reader = self.writer = self.transport = None
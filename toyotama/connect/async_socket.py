@@ -0,0 +1,28 @@
+import asyncio
+
+from ..util.log import get_logger
+from .async_tube import AsyncTube
+
+logger = get_logger()
+
+
+class AsyncSocket(AsyncTube):
+    def __init__(self, target: str, timeout: float | None = 30.0):
+        super().__init__(timeout=timeout)
+        _, host, port = target.split()
+        self.host: str = host
+        self.port: int = int(port)
+
+    async def open(self) -> "AsyncSocket":
+        self.reader, self.writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        return self
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+            self.reader = self.writer = None
+            logger.info(f"Connection to {self.host}:{self.port} closed.")
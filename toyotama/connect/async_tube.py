@@ -0,0 +1,154 @@
+import ast
+import asyncio
+import errno
+from abc import ABCMeta, abstractmethod
+from typing import Any, Callable
+
+from ..crypto.proof_of_work import solve_pow_challenge
+from ..util.log import get_logger
+from .buffer import BufferMixin
+
+logger = get_logger()
+
+
+class AsyncTube(BufferMixin, metaclass=ABCMeta):
+    """asyncio counterpart of :class:`Tube`.
+
+    Every receive/send method of ``Tube`` is available as a coroutine with the same
+    name and arguments, so an exploit can be ported by adding ``await``.
+
+    >>> async with AsyncSocket("nc localhost 1337") as r:
+    ...     await r.sendlineafter(b"> ", b"1")
+    ...     x = await r.recvint()
+    """
+
+    def __init__(self, timeout: float | None = None):
+        self.recv_bytes = 0
+        self.send_bytes = 0
+        self.buffer = bytearray()
+        self.timeout: float | None = timeout
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+
+    @abstractmethod
+    async def open(self) -> "AsyncTube":
+        ...
+
+    def __await__(self):
+        return self.open().__await__()
+
+    async def _recv(self, n: int = 4096) -> bytes:
+        if self.reader is None:
+            return b""
+
+        try:
+            buf = await asyncio.wait_for(self.reader.read(n), self.timeout)
+        except asyncio.TimeoutError:
+            # TimeoutError is an OSError since 3.11, and a timeout is not an EOF.
+            raise
+        except OSError as e:
+            # A pty master reports EIO once the child has closed its end.
+            if e.errno != errno.EIO:
+                logger.error(e)
+            return b""
+
+        self.recv_bytes += len(buf)
+
+        return buf
+
+    async def recv(self, n: int = 4096, debug: bool = True) -> bytes:
+        if self.buffer:
+            buf = self._consume(n)
+        else:
+            buf = await self._recv(n)
+
+        if debug:
+            logger.debug(f"[> {buf!r}")
+
+        return buf
+
+    async def _fill(self) -> int:
+        return self._feed(await self._recv(self.RECV_SIZE))
+
+    async def recvuntil(self, term: bytes | str) -> bytes:
+        term = self._to_bytes(term)
+
+        buf, start = self._consume_until(term)
+        while buf is None:
+            await self._fill()
+            buf, start = self._consume_until(term, start)
+
+        return buf
+
+    async def recvline(self) -> bytes:
+        return await self.recvuntil(term=b"\n")
+
+    async def recvlines(self, repeat: int) -> list[bytes]:
+        return [await self.recvline() for _ in range(repeat)]
+
+    async def recvlineafter(self, term: bytes | str) -> bytes:
+        await self.recvuntil(term)
+        return await self.recvline()
+
+    async def recvvalue(self, parser: Callable = ast.literal_eval) -> Any:
+        return self._parse_value(await self.recvline(), parser)
+
+    async def recvint(self) -> int:
+        return await self.recvvalue(parser=lambda x: int(x, 0))
+
+    async def recvhex(self) -> bytes:
+        return await self.recvvalue(parser=lambda x: bytes.fromhex(x))
+
+    async def send(self, message: bytes | str | int, term: bytes | str = b""):
+        if self.writer is None:
+            return
+
+        payload = self._to_bytes(message) + self._to_bytes(term)
+
+        try:
+            self.writer.write(payload)
+            await self.writer.drain()
+            self.send_bytes += len(payload)
+            logger.debug(f"<] {payload!r}")
+        except OSError as e:
+            logger.error(e)
+
+    async def sendline(self, message: bytes | str | int):
+        await self.send(message, term=b"\n")
+
+    async def sendlines(self, messages: list[bytes | str | int]):
+        await self.send(b"\n".join(self._to_bytes(message) for message in messages), term=b"\n")
+
+    async def sendafter(self, term: bytes | str, message: bytes | str | int) -> bytes:
+        data = await self.recvuntil(term)
+        await self.send(message)
+        return data
+
+    async def sendlineafter(self, term: bytes | str, message: bytes | str | int) -> bytes:
+        data = await self.recvuntil(term)
+        await self.sendline(message)
+        return data
+
+    async def solve_pow(self, line: bytes | str | None = None, send: bool = True, workers: int | None = None) -> bytes:
+        """Solve a proof of work challenge in an executor, so that the other tubes keep running."""
+        if line is None:
+            line = await self.recvline()
+        answer = await asyncio.get_running_loop().run_in_executor(None, solve_pow_challenge, line, workers)
+        if send:
+            await self.sendline(answer)
+        return answer
+
+    async def cmd(self, command: bytes | str, term: bytes | str = b"$ "):
+        await self.sendlineafter(term, command)
+
+    async def __aenter__(self):
+        if self.reader is None:
+            await self.open()
+        return self
+
+    async def __aexit__(self, e_type, e_value, traceback):
+        await self.close()
+
+    @abstractmethod
+    async def close(self):
+        ...
@@ -0,0 +1,69 @@
+import ast
+import re
+from typing import Any, Callable
+
+from ..util.log import get_logger
+
+logger = get_logger()
+
+
+class BufferMixin:
+    """The I/O-independent part of :class:`Tube` and :class:`AsyncTube`.
+
+    The subclass owns ``self.buffer`` and feeds it with what it reads; this mixin
+    only searches, consumes and parses it.
+    """
+
+    RECV_SIZE: int = 1 << 16
+    VALUE_PATTERN: re.Pattern = re.compile(r"(?P<name>.*?) *[=:] *(?P<value>.*)")
+
+    buffer: bytearray
+
+    def _feed(self, buf: bytes) -> int:
+        if not buf:
+            raise EOFError("Got EOF while receiving.")
+        self.buffer += buf
+        return len(buf)
+
+    def _consume(self, n: int) -> bytes:
+        buf = bytes(self.buffer[:n])
+        del self.buffer[:n]
+        return buf
+
+    def _consume_until(self, term: bytes, start: int = 0) -> tuple[bytes | None, int]:
+        """Consume the buffer up to and including `term`, searching from `start`.
+
+        Returns:
+            tuple[bytes | None, int]: The data, or None and where to resume the search once more data is fed.
+        """
+        index = self.buffer.find(term, start)
+        if index < 0:
+            # Only the tail can contain a delimiter split across two reads.
+            return None, max(0, len(self.buffer) - len(term) + 1)
+
+        buf = self._consume(index + len(term))
+
+        logger.debug(f"[> {buf!r}")
+
+        return buf, 0
+
+    def _to_bytes(self, value: bytes | str | int, encode: str = "utf-8") -> bytes:
+        if isinstance(value, bytes):
+            return value
+        if isinstance(value, str):
+            return value.encode(encode)
+        if isinstance(value, int):
+            return str(value).encode(encode)
+
+        raise ValueError(f"Cannot convert {value!r} to bytes.")
+
+    def _parse_value(self, line: bytes, parser: Callable = ast.literal_eval) -> Any:
+        match = self.VALUE_PATTERN.match(line.decode())
+        if not match:
+            return None
+        name = match.group("name").strip()
+        value = parser(match.group("value"))
+
+        logger.debug("%s: %s", name, value)
+
+        return value
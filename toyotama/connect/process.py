@@ -1,8 +1,11 @@
+import errno
 import fcntl
 import os
 import pty
+import select
 import signal
 import subprocess
+import time
 import tty
 from pathlib import Path
 
@@ -13,11 +16,14 @@ logger = get_logger()
 
 
 class Process(Tube):
-    def __init__(self, args: list[str], env: dict[str, str] | None = None):
+    POLL_INTERVAL: float = 0.05
+
+    def __init__(self, args: list[str], env: dict[str, str] | None = None, timeout: float | None = None):
         super().__init__()
         self.path: Path = Path(args[0])
         self.args: list[str] = args
         self.env: dict[str, str] | None = env
+        self.timeout: float | None = timeout
         self.proc: subprocess.Popen | None
         self.returncode: int | None = None
 
@@ -36,6 +42,9 @@ class Process(Tube):
             )
         except Exception as e:
             logger.error(e)
+        finally:
+            # Only the child keeps the slave, so that the master reports EOF once it exits.
+            os.close(slave)
 
         if self.proc is None:
             logger.error("Failed to create a new process")
@@ -72,42 +81,44 @@ class Process(Tube):
     def is_dead(self):
         return not self.is_alive()
 
-    def recv(self, n: int = 4096, debug: bool = True) -> bytes:
-        if self.is_dead():
+    def _recv(self, n: int = 4096) -> bytes:
+        if self.proc is None or self.proc.stdout is None:
             return b""
 
-        if self.proc.stdout is None:
-            return b""
-        try:
-            buf = self.proc.stdout.read(n)
-            if buf:
-                self.recv_bytes += len(buf)
-        except Exception as e:
-            logger.error(e)
-            return b""
-
-        if debug:
-            logger.debug(f"[> {buf!r}")
+        fd = self.proc.stdout.fileno()
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while True:
+            readable, _, _ = select.select([fd], [], [], self.POLL_INTERVAL)
+            if not readable:
+                if self.proc.poll() is not None and not select.select([fd], [], [], 0)[0]:
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError(f"No data from {self.path!s} in {self.timeout}s")
+                continue
+
+            try:
+                buf = os.read(fd, n)
+            except BlockingIOError:
+                continue
+            except OSError as e:
+                # A pty master reports EIO once the child has closed its end.
+                if e.errno != errno.EIO:
+                    logger.error(e)
+                break
+
+            self.recv_bytes += len(buf)
+            self._poll()
+            return buf
 
         self._poll()
-
-        return buf or b""
+        return b""
 
     def send(self, message: bytes | str | int, term: bytes | str = b"", debug: bool = True):
-        if self.id_dead():
+        if self.is_dead():
             return b""
 
         self._poll()
-        payload = b""
-        if isinstance(message, str):
-            payload += message.encode()
-        if isinstance(message, int):
-            payload += str(message).encode()
-
-        if isinstance(term, str):
-            term = term.encode()
-
-        payload += term
+        payload = self._to_bytes(message) + self._to_bytes(term)
 
         try:
             self.proc.stdin.write(payload)
@@ -20,20 +20,20 @@ class Socket(Tube):
     def _socket(self):
         return self.sock
 
-    def recv(self, n: int = 4096, debug: bool = True) -> bytes:
+    def _recv(self, n: int = 4096) -> bytes:
         if self.sock is None:
             return b""
         buf = b""
         try:
             buf += self.sock.recv(n)
-        except Exception as e:
+        except TimeoutError:
+            # not an EOF
+            raise
+        except OSError as e:
             logger.error(e)
 
         self.recv_bytes += len(buf)
 
-        if debug:
-            logger.debug(f"[> {buf!r}")
-
         return buf
 
     def send(self, message: bytes | str | int, term: bytes | str = b""):
@@ -57,17 +57,6 @@ class Socket(Tube):
             self.is_alive = False
             logger.error(e)
 
-    def pow(pattern: bytes, start: str | None = None, end: str | None = None, hash_func: str = "sha256") -> str:
-        command = "pow"
-        args = ["--hash", hash_func]
-        if start:
-            args += ["--start", start]
-        if end:
-            args += ["--end", end]
-        args += [pattern]
-        r = subprocess.run([command, *args], capture_output=True).stdout.decode().strip()
-        return r
-
     def close(self):
         if self.sock:
             self.sock.close()
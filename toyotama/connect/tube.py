@@ -1,47 +1,52 @@
 import ast
 import base64
-import re
 import sys
 import threading
 import time
 from abc import ABCMeta, abstractmethod
 from typing import Any, Callable
 
+from ..crypto.proof_of_work import solve_pow_challenge
 from ..terminal.style import Style
 from ..util.log import get_logger
+from .buffer import BufferMixin
 
 logger = get_logger()
 
 
-class Tube(metaclass=ABCMeta):
+class Tube(BufferMixin, metaclass=ABCMeta):
     INPUT_READ_DELAY: float = 0.05
 
     def __init__(self):
         self.recv_bytes = 0
         self.send_bytes = 0
+        self.buffer = bytearray()
 
     @abstractmethod
-    def recv(self, n: int = 4096, debug: bool = False) -> bytes:
+    def _recv(self, n: int = 4096) -> bytes:
         ...
 
-    def _to_bytes(self, value: bytes | str | int, encode: str = "utf-8") -> bytes:
-        if isinstance(value, bytes):
-            return value
-        if isinstance(value, str):
-            return value.encode(encode)
-        if isinstance(value, int):
-            return str(value).encode(encode)
+    def recv(self, n: int = 4096, debug: bool = True) -> bytes:
+        if self.buffer:
+            buf = self._consume(n)
+        else:
+            buf = self._recv(n)
 
-        raise ValueError(f"Cannot convert {value!r} to bytes.")
+        if debug:
+            logger.debug(f"[> {buf!r}")
+
+        return buf
+
+    def _fill(self) -> int:
+        return self._feed(self._recv(self.RECV_SIZE))
 
     def recvuntil(self, term: bytes | str) -> bytes:
-        buf = b""
         term = self._to_bytes(term)
 
-        while not buf.endswith(term):
-            buf += self.recv(1, debug=False) or b""
-
-        logger.debug(f"[> {buf!r}")
+        buf, start = self._consume_until(term)
+        while buf is None:
+            self._fill()
+            buf, start = self._consume_until(term, start)
 
         return buf
 
@@ -56,17 +61,7 @@ class Tube(metaclass=ABCMeta):
         return self.recvline()
 
     def recvvalue(self, parser: Callable = ast.literal_eval) -> Any:
-        pattern_raw = r"(?P<name>.*?) *[=:] *(?P<value>.*)"
-        pattern = re.compile(pattern_raw)
-        line = pattern.match(self.recvline().decode())
-        if not line:
-            return None
-        name = line.group("name").strip()
-        value = parser(line.group("value"))
-
-        logger.debug("%s: %s", name, value)
-
-        return value
+        return self._parse_value(self.recvline(), parser)
 
     def recvint(self) -> int:
         return self.recvvalue(parser=lambda x: int(x, 0))
@@ -81,6 +76,9 @@ class Tube(metaclass=ABCMeta):
     def sendline(self, message: bytes | str | int):
         self.send(message, term=b"\n")
 
+    def sendlines(self, messages: list[bytes | str | int]):
+        self.send(b"\n".join(self._to_bytes(message) for message in messages), term=b"\n")
+
     def sendafter(self, term: bytes | str, message: bytes | str | int) -> bytes:
         data = self.recvuntil(term)
         self.send(message)
@@ -91,6 +89,23 @@ class Tube(metaclass=ABCMeta):
         self.sendline(message)
         return data
 
+    def solve_pow(self, line: bytes | str | None = None, send: bool = True, workers: int | None = None) -> bytes:
+        """Solve a proof of work challenge sent by the server.
+
+        Args:
+            line (bytes | str | None, optional): The challenge. Defaults to the next line received.
+            send (bool, optional): Whether to send the answer. Defaults to True.
+            workers (int | None, optional): The number of processes. Defaults to os.cpu_count().
+        Returns:
+            bytes: The answer.
+        """
+        if line is None:
+            line = self.recvline()
+        answer = solve_pow_challenge(line, workers)
+        if send:
+            self.sendline(answer)
+        return answer
+
     def interactive(self):
         logger.info("🔄 Switching to interactive mode.")
 
@@ -100,12 +115,13 @@ class Tube(metaclass=ABCMeta):
             while not go.is_set():
                 try:
                     buf = self.recv(debug=False)
-                    if buf:
-                        sys.stdout.buffer.write(buf)
-                        sys.stdout.flush()
-                except EOFError:
+                except TimeoutError:
+                    continue
+                if not buf:
                     logger.error("❌ Got EOF while reading in interactive")
                     break
+                sys.stdout.buffer.write(buf)
+                sys.stdout.flush()
 
         t = threading.Thread(target=recv_thread)
         t.daemon = True
@@ -129,8 +145,8 @@ class Tube(metaclass=ABCMeta):
             logger.warning("⏸️ Interrupted")
             go.set()
 
-        while t.is_alive():
-            t.join(timeout=0.1)
+        # The receiving thread may be waiting for data. It is a daemon and stops at the next read.
+        t.join(timeout=self.INPUT_READ_DELAY)
 
     def cmd(self, command: bytes | str, term: bytes | str = b"$ "):
         self.sendlineafter(term, command)
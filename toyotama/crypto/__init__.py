@@ -1,6 +1,14 @@
 from .aes import *
 from .classical_cipher import *
+from .coppersmith import *
 from .curve import *
+from .dlog import *
+from .ec import *
+from .ecdlp import *
+from .factor import *
+from .lattice import *
+from .primality import *
+from .proof_of_work import *
 from .rng import *
 from .rsa import *
 from .util import *
@@ -1,5 +1,6 @@
-import sys
+import queue
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from itertools import pairwise
 from random import sample
 
@@ -12,64 +13,93 @@ logger = get_logger(__name__)
 
 
 def ecb_chosen_plaintext_attack(
-    encrypt_oracle: Callable[[bytes], bool],
+    encrypt_oracle: Callable[[bytes], bytes],
     plaintext_space: bytes = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789{}_",
     known_plaintext: bytes = b"",
     block_size: int = 16,
     verbose: bool = False,
-):
+    batch: bool = False,
+) -> bytes:
     """AES ECB mode chosen plaintext attack
 
     This function helps solving chosen plaintext attack.
+    The oracle must return encrypt(chosen_plaintext + secret).
+    The encrypted block which includes the next unknown byte depends only on the
+    length of the padding in front of it, so it is requested once per padding length.
 
     Args:
-        encrypt_oracle (typing.Callable[[bytes], bool]): the encryption oracle.
+        encrypt_oracle (typing.Callable[[bytes], bytes]): the encryption oracle.
         plaintext_space (bytes, optional): Defaults to uppercase + lowercase + numbers + "{}_".
         known_plaintext (bytes, optional): Defaults to b"".
         block_size (int, optional): Defaults to 16.
         verbose (bool, optional): Defaults to False.
+        batch (bool, optional): Encrypt the blocks for all of the candidate characters in a single oracle call. Defaults to False.
     Returns:
         bytes: The plaintext.
     """
 
-    block_end = block_size * (len(known_plaintext) // (block_size - 2) + 1)
-    for _ in range(1, 100):
-        # shuffle plaintext_space to reduce complexity
-        plaintext_space = bytes(sample(bytearray(plaintext_space), len(plaintext_space)))
+    encrypted_cache: dict[int, bytes] = {}
 
-        # get the encrypted block which includes the beginning of FLAG
-        if verbose:
-            logger.info("Getting the encrypted block which includes the beginning of FLAG")
-
-        if len(known_plaintext) % block_size == block_size - 1:
-            block_end += block_size
+    while True:
+        # the next unknown byte is the last byte of the block at `index`
+        padding_length = (block_size - 1 - len(known_plaintext)) % block_size
+        index = (padding_length + len(known_plaintext)) // block_size
+        prefix = (bytes(padding_length) + known_plaintext)[-(block_size - 1) :]
 
-        chosen_plaintext = bytes(block_end - len(known_plaintext) - 1)
-        encrypted_block = encrypt_oracle(chosen_plaintext)
-        encrypted_block = encrypted_block[block_end - block_size : block_end]
+        # get the encrypted block which includes the next byte of FLAG
+        if padding_length not in encrypted_cache:
+            encrypted_cache[padding_length] = encrypt_oracle(bytes(padding_length))
+        encrypted_block = encrypted_cache[padding_length][index * block_size : (index + 1) * block_size]
+        if len(encrypted_block) < block_size:
+            break
 
         # bruteforcing all of the characters in plaintext_space
+        found = None
+        if batch:
+            encrypted = encrypt_oracle(b"".join(prefix + bytes([c]) for c in plaintext_space))
+            for i, c in enumerate(plaintext_space):
+                if encrypted[i * block_size : (i + 1) * block_size] == encrypted_block:
+                    found = c
+                    break
+        else:
+            # shuffle plaintext_space to reduce complexity
+            for c in sample(plaintext_space, len(plaintext_space)):
+                if encrypt_oracle(prefix + bytes([c]))[:block_size] == encrypted_block:
+                    found = c
+                    break
+
+        if found is None:
+            break
+
+        known_plaintext += bytes([found])
         if verbose:
-            logger.info("Bruteforcing all of the characters in plaintext_space")
-        for c in plaintext_space:
-            payload = b"\x00" * (block_end - len(known_plaintext) - 1) + known_plaintext + bytearray([c])
-            enc_block = encrypt_oracle(payload)[block_end - block_size : block_end]
-            if encrypted_block == enc_block:
-                known_plaintext += bytearray([c])
-                if verbose:
-                    sys.stderr.write("\n")
-                break
+            logger.info(f"{known_plaintext!r}")
+
+    return known_plaintext
 
 
 class PKCS7PaddingOracleAttack:
+    """PKCS#7 padding oracle attack.
+
+    With `batch_size` > 1 the oracle is called as ``padding_oracle(ciphertexts, iv)``
+    with a list of up to `batch_size` candidate ciphertexts and must return a list of
+    bools, so that one round trip tests many candidate bytes.
+    `padding_oracles` is a pool of oracles (e.g. one per connection); the blocks of
+    `decryption_attack` are independent and are solved concurrently, one per oracle.
+    """
+
     def __init__(
         self,
         padding_oracle: Callable[[bytes, bytes], bool] = None,
         block_size: int = 16,
         debug: bool = False,
+        padding_oracles: list[Callable] | None = None,
+        batch_size: int = 1,
     ):
         self.padding_oracle = padding_oracle
+        self.padding_oracles = padding_oracles or []
         self.block_size = block_size
+        self.batch_size = batch_size
         self.debug = debug
 
     @staticmethod
@@ -84,7 +114,42 @@ class PKCS7PaddingOracleAttack:
     def set_padding_oracle(self, padding_oracle: Callable[[bytes, bytes], bool]):
         self.padding_oracle = padding_oracle
 
-    def solve_decrypted_block(self, ct_target: bytes, iv: bytes = b"") -> bytes:
+    def set_padding_oracles(self, padding_oracles: list[Callable]):
+        self.padding_oracles = padding_oracles
+
+    def _is_valid(self, oracle: Callable, ct: bytearray, ct_target: bytes, iv: bytes, i: int) -> bool:
+        # For the last byte, a hit can also come from a longer padding like b"\x02\x02".
+        # Changing the byte before it breaks such a padding but not b"\x01".
+        if i != self.block_size - 1 or i == 0:
+            return True
+        tampered = bytearray(ct)
+        tampered[i - 1] ^= 1
+        if self.batch_size <= 1:
+            return oracle(bytes(tampered + ct_target), iv)
+        return oracle([bytes(tampered + ct_target)], iv)[0]
+
+    def _find_byte(self, oracle: Callable, ct: bytearray, ct_target: bytes, iv: bytes, i: int) -> int | None:
+        if self.batch_size <= 1:
+            for c in range(0x100):
+                ct[i] = c
+                if oracle(bytes(ct + ct_target), iv) and self._is_valid(oracle, ct, ct_target, iv, i):
+                    return c
+            return None
+
+        candidates = []
+        for c in range(0x100):
+            ct[i] = c
+            candidates.append(bytes(ct + ct_target))
+
+        for start in range(0, 0x100, self.batch_size):
+            results = oracle(candidates[start : start + self.batch_size], iv)
+            for c, ok in enumerate(results, start):
+                ct[i] = c
+                if ok and self._is_valid(oracle, ct, ct_target, iv, i):
+                    return c
+        return None
+
+    def solve_decrypted_block(self, ct_target: bytes, iv: bytes = b"", padding_oracle: Callable | None = None) -> bytes:
         """
         [_____ct_____]   [_ct_target__]
               |                |
@@ -96,6 +161,7 @@ class PKCS7PaddingOracleAttack:
                                |
                          [ Plain text ]
         """
+        oracle = padding_oracle or self.padding_oracle
         iv = iv or bytes(self.block_size)
         ct = bytearray([0 for _ in range(self.block_size)])
         d = bytearray([0 for _ in range(self.block_size)])
@@ -104,25 +170,23 @@ class PKCS7PaddingOracleAttack:
             padding = self.block_size - i
 
             # Bruteforce one byte
-            for c in range(0x100):
-                ct[i] = c
-                if self.padding_oracle(bytes(ct + ct_target), iv):
-                    # Recalculate d
-                    d = self._xor(ct, self._make_padding_block(padding))
+            if self._find_byte(oracle, ct, ct_target, iv, i) is None:
+                raise ValueError("Padding Oracle Attack failed.")
 
-                    if i == 0:
-                        break
+            # Recalculate d
+            d = self._xor(ct, self._make_padding_block(padding))
 
-                    # Recalculate next c
-                    ct = self._xor(d, self._make_padding_block(padding + 1))
-                    break
-            else:
-                raise ValueError("Padding Oracle Attack failed.")
+            if i == 0:
+                break
+
+            # Recalculate next c
+            ct = self._xor(d, self._make_padding_block(padding + 1))
         return d
 
     def decryption_attack(self, ciphertext: bytes, iv: bytes) -> bytes:
         """Padding oracle decryption attack.
         This function helps solving padding oracle decryption attack.
+        The blocks are solved in parallel when a pool of oracles is set.
 
         Args:
             ciphertext (bytes): A ciphertext.
@@ -130,13 +194,27 @@ class PKCS7PaddingOracleAttack:
         Returns:
             bytes: decrypt(ciphertext)
         """
-        ciphertext_block: list[bytes] = [iv] + to_block(ciphertext)
-        plaintext_block = b""
+        ciphertext_block: list[bytes] = [iv] + to_block(ciphertext, self.block_size)
+
+        if len(self.padding_oracles) <= 1:
+            oracle = self.padding_oracles[0] if self.padding_oracles else self.padding_oracle
+            return b"".join(xor(ct1, self.solve_decrypted_block(ct2, iv, oracle)) for ct1, ct2 in pairwise(ciphertext_block))
+
+        oracles: queue.Queue = queue.Queue()
+        for oracle in self.padding_oracles:
+            oracles.put(oracle)
+
+        def solve(ct2: bytes) -> bytes:
+            oracle = oracles.get()
+            try:
+                return self.solve_decrypted_block(ct2, iv, oracle)
+            finally:
+                oracles.put(oracle)
 
-        for ct1, ct2 in pairwise(ciphertext_block):
-            plaintext_block += xor(ct1, self.solve_decrypted_block(ct2, iv))
+        with ThreadPoolExecutor(max_workers=len(self.padding_oracles)) as executor:
+            decrypted_block = list(executor.map(solve, ciphertext_block[1:]))
 
-        return plaintext_block
+        return b"".join(xor(ct1, d) for ct1, d in zip(ciphertext_block, decrypted_block))
 
     def encryption_attack(self, plaintext: bytes, ciphertext: bytes, iv: bytes) -> tuple[bytes, bytes]:
         """Padding oracle encryption attack.
@@ -153,9 +231,10 @@ class PKCS7PaddingOracleAttack:
         plaintext_block: list[bytes] = to_block(plaintext)
         ciphertext_block: list[bytes] = to_block(ciphertext)
         tampered_ciphertext_block: list[bytes] = [ciphertext_block.pop()]
+        oracle = self.padding_oracles[0] if self.padding_oracles else self.padding_oracle
         while plaintext_block:
             pt, ct = plaintext_block.pop(), tampered_ciphertext_block[0]
-            tampered_ciphertext_block = [xor(pt, self.solve_decrypted_block(ct, iv))] + tampered_ciphertext_block
+            tampered_ciphertext_block = [xor(pt, self.solve_decrypted_block(ct, iv, oracle))] + tampered_ciphertext_block
 
         iv = tampered_ciphertext_block.pop(0)
         tampered_ciphertext = b"".join(tampered_ciphertext_block)
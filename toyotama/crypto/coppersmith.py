@@ -0,0 +1,447 @@
+"""Coppersmith's method
+
+Small roots of modular polynomials by lattice reduction, in Howgrave-Graham's formulation.
+A univariate polynomial is a list of coefficients from the constant term, and a bivariate one
+is a dict {(i, j): coefficient of x^i y^j}.
+"""
+import random
+from math import ceil, isqrt, log2
+
+import gmpy2
+
+from ..util.log import get_logger
+from .lattice import lll
+
+logger = get_logger()
+
+Polynomial = list[int]
+BivariatePolynomial = dict[tuple[int, int], int]
+
+
+def _reduce(basis: list[list[int]]) -> list[list[int]]:
+    """LLL with the floating point precision about the size of the entries, which the dynamic range of these lattices needs."""
+    bits = max(abs(x).bit_length() for row in basis for x in row)
+    return lll(basis, precision=bits + 2 * len(basis) + 64)
+
+
+def _invert_leading(a: int, N: int) -> int:
+    try:
+        return int(gmpy2.invert(a, N))
+    except ZeroDivisionError:
+        # which gives a factor of N
+        raise ValueError(f"The leading coefficient is not invertible: gcd = {gmpy2.gcd(a, N)}") from None
+
+
+def _trim(f: Polynomial) -> Polynomial:
+    while f and not f[-1]:
+        f.pop()
+    return f
+
+
+def poly_mul(f: Polynomial, g: Polynomial) -> Polynomial:
+    if not f or not g:
+        return []
+    h = [0] * (len(f) + len(g) - 1)
+    for i, a in enumerate(f):
+        if a:
+            for j, b in enumerate(g):
+                h[i + j] += a * b
+    return h
+
+
+def poly_eval(f: Polynomial, x: int) -> int:
+    y = 0
+    for a in reversed(f):
+        y = y * x + a
+    return y
+
+
+def _mod(f: Polynomial, p: int) -> Polynomial:
+    return _trim([a % p for a in f])
+
+
+def _divmod_mod(f: Polynomial, g: Polynomial, p: int) -> tuple[Polynomial, Polynomial]:
+    """Polynomial division over GF(p)."""
+    f = list(f)
+    inv = int(gmpy2.invert(g[-1], p))
+    q = [0] * max(0, len(f) - len(g) + 1)
+    for i in reversed(range(len(q))):
+        c = f[i + len(g) - 1] * inv % p
+        q[i] = c
+        if c:
+            for j, b in enumerate(g):
+                f[i + j] = (f[i + j] - c * b) % p
+    return q, _mod(f[: len(g) - 1], p)
+
+
+def _gcd_mod(f: Polynomial, g: Polynomial, p: int) -> Polynomial:
+    while g:
+        f, g = g, _divmod_mod(f, g, p)[1]
+    inv = int(gmpy2.invert(f[-1], p))
+    return [a * inv % p for a in f]
+
+
+def _powmod_mod(f: Polynomial, k: int, h: Polynomial, p: int) -> Polynomial:
+    """f^k mod (h, p)"""
+    result = [1]
+    f = _divmod_mod(f, h, p)[1]
+    for bit in bin(k)[2:]:
+        result = _divmod_mod(_mod(poly_mul(result, result), p), h, p)[1]
+        if bit == "1":
+            result = _divmod_mod(_mod(poly_mul(result, f), p), h, p)[1]
+    return result
+
+
+def _split_roots(g: Polynomial, p: int, rng: random.Random) -> list[int]:
+    """The roots of a product of distinct linear factors over GF(p), by Cantor-Zassenhaus."""
+    if len(g) <= 1:
+        return []
+    if len(g) == 2:
+        return [-g[0] * int(gmpy2.invert(g[1], p)) % p]
+    while True:
+        a = rng.randrange(p)
+        h = _powmod_mod([a, 1], (p - 1) // 2, g, p)
+        h = _gcd_mod(g, _mod([h[0] - 1 if h else -1, *h[1:]], p), p) if h else [1]
+        if 1 < len(h) < len(g):
+            return _split_roots(h, p, rng) + _split_roots(_divmod_mod(g, h, p)[0], p, rng)
+
+
+def roots_mod_prime(f: Polynomial, p: int, seed: int | None = None) -> list[int]:
+    """The roots of a polynomial over GF(p) for an odd prime p.
+
+    The product of the distinct linear factors gcd(f, x^p - x) is split by Cantor-Zassenhaus.
+
+    Args:
+        f (Polynomial): The coefficients from the constant term.
+        p (int): The odd prime.
+        seed (int | None, optional): The seed of the random splitting.
+    Returns:
+        list[int]: The sorted roots.
+    """
+    f = _mod(f, p)
+    if not f:
+        raise ValueError("The polynomial is zero modulo p.")
+    roots = []
+    if f[0] == 0:
+        roots.append(0)
+        while f and f[0] == 0:
+            f.pop(0)
+    if len(f) <= 1:
+        return roots
+
+    xp = _powmod_mod([0, 1], p, f, p)
+    g = _gcd_mod(f, _mod([a - b for a, b in zip(xp + [0] * 2, [0, 1] + [0] * len(xp))], p), p)
+    return sorted(roots + _split_roots(g, p, random.Random(seed)))
+
+
+def integer_roots(f: Polynomial, bound: int | None = None) -> list[int]:
+    """The integer roots of a polynomial over the integers.
+
+    The roots are found modulo a prime larger than twice the bound and checked over the integers.
+
+    Args:
+        f (Polynomial): The coefficients from the constant term.
+        bound (int | None, optional): The bound of the absolute values of the roots. Defaults to Cauchy's bound.
+    Returns:
+        list[int]: The sorted roots.
+    """
+    f = _trim([int(a) for a in f])
+    if len(f) <= 1:
+        return []
+    roots = []
+    if f[0] == 0:
+        roots.append(0)
+        while f[0] == 0:
+            f.pop(0)
+        if len(f) == 1:
+            return roots
+
+    if bound is None:
+        bound = 1 + max(abs(a) for a in f[:-1]) // abs(f[-1]) + 1
+    p = int(gmpy2.next_prime(2 * bound + random.getrandbits(32)))
+    while f[-1] % p == 0:
+        p = int(gmpy2.next_prime(p))
+
+    for r in roots_mod_prime(f, p):
+        x = r - p if r > p // 2 else r
+        if abs(x) <= bound and x and poly_eval(f, x) == 0:
+            roots.append(x)
+    return sorted(roots)
+
+
+def small_roots(
+    f: Polynomial,
+    N: int,
+    beta: float = 1.0,
+    epsilon: float | None = None,
+    X: int | None = None,
+) -> list[int]:
+    """The small roots of a univariate polynomial modulo an unknown divisor of N (Coppersmith, Howgrave-Graham).
+
+    Find x0 with |x0| <= X and f(x0) = 0 mod b for a divisor b >= N^beta of N,
+    which works for X up to about N^(beta^2 / deg f - epsilon).
+    The lattice is spanned by the coefficients of x^j N^(m-i) f^i(xX) and x^j f^m(xX),
+    and the shortest vector after LLL gives a polynomial which has x0 as a root over the integers.
+
+    Args:
+        f (Polynomial): The coefficients from the constant term. It is made monic modulo N,
+            and a ValueError with the factor of N is raised if the leading coefficient is not invertible.
+        N (int): The modulus.
+        beta (float, optional): The size of the divisor. Defaults to 1.0 (N itself).
+        epsilon (float | None, optional): A smaller epsilon gives a larger bound and a larger lattice. Defaults to beta / 8.
+        X (int | None, optional): The bound of the roots. Defaults to the largest one for epsilon.
+    Returns:
+        list[int]: The roots.
+    """
+    f = _trim([a % N for a in f])
+    delta = len(f) - 1
+    assert delta >= 1, "The polynomial must not be constant."
+    if f[-1] != 1:
+        inv = _invert_leading(f[-1], N)
+        f = [a * inv % N for a in f]
+
+    epsilon = epsilon or beta / 8
+    m = max(ceil(beta**2 / (delta * epsilon)), ceil(7 * beta / delta))
+    t = int(delta * m * (1 / beta - 1))
+    if X is None:
+        X = 1 << max(0, int(N.bit_length() * (beta**2 / delta - epsilon)) - 1)
+
+    polynomials = []
+    fi = [1]
+    for i in range(m):
+        for j in range(delta):
+            polynomials.append([0] * j + [a * N ** (m - i) for a in fi])
+        fi = poly_mul(fi, f)
+    for j in range(t):
+        polynomials.append([0] * j + fi)
+
+    n = delta * m + t
+    logger.debug(f"Coppersmith: m={m}, t={t}, dimension {n}")
+    basis = [[a * X**k for k, a in enumerate(g)] + [0] * (n - len(g)) for g in polynomials]
+    reduced = _reduce(basis)
+
+    roots = set()
+    for row in reduced[:2]:
+        h = [a // X**k for k, a in enumerate(row)]
+        for x in integer_roots(h, X):
+            g = gmpy2.gcd(poly_eval(f, x), N)
+            if g > 1 and log2(g) >= beta * log2(N) - 1e-9:
+                roots.add(x)
+        if roots:
+            break
+    return sorted(roots)
+
+
+def _bivariate_mul(f: BivariatePolynomial, g: BivariatePolynomial) -> BivariatePolynomial:
+    h: BivariatePolynomial = {}
+    for (i1, j1), a in f.items():
+        for (i2, j2), b in g.items():
+            h[i1 + i2, j1 + j2] = h.get((i1 + i2, j1 + j2), 0) + a * b
+    return {k: v for k, v in h.items() if v}
+
+
+def _bivariate_at_x(f: BivariatePolynomial, x: int, p: int | None = None) -> Polynomial:
+    """f(x, y) as a polynomial in y. Modulo p, the degree in y is kept even if the leading coefficient vanishes."""
+    g = [0] * (max(j for _, j in f) + 1)
+    for (i, j), a in f.items():
+        g[j] += a * x**i if p is None else a * pow(x, i, p)
+    return _trim(g) if p is None else [a % p for a in g]
+
+
+def _bivariate_eval(f: BivariatePolynomial, x: int, y: int) -> int:
+    return sum(a * x**i * y**j for (i, j), a in f.items())
+
+
+def _resultant_mod(f: Polynomial, g: Polynomial, p: int) -> int:
+    """The resultant over GF(p) by the determinant of the Sylvester matrix."""
+    m, n = len(f) - 1, len(g) - 1
+    if m <= 0 or n <= 0:
+        return pow(f[0], n, p) if m == 0 and f else pow(g[0], m, p) if n == 0 and g else 0
+    size = m + n
+    rows = [[0] * i + list(reversed(f)) + [0] * (size - m - 1 - i) for i in range(n)]
+    rows += [[0] * i + list(reversed(g)) + [0] * (size - n - 1 - i) for i in range(m)]
+
+    det = 1
+    for c in range(size):
+        pivot = next((r for r in range(c, size) if rows[r][c] % p), None)
+        if pivot is None:
+            return 0
+        if pivot != c:
+            rows[c], rows[pivot] = rows[pivot], rows[c]
+            det = -det
+        det = det * rows[c][c] % p
+        inv = int(gmpy2.invert(rows[c][c], p))
+        for r in range(c + 1, size):
+            if rows[r][c] % p:
+                k = rows[r][c] * inv % p
+                rows[r] = [(a - k * b) % p for a, b in zip(rows[r], rows[c])]
+    return det % p
+
+
+def _interpolate_mod(xs: list[int], ys: list[int], p: int) -> Polynomial:
+    """Newton interpolation over GF(p)."""
+    coefficients = list(ys)
+    n = len(xs)
+    for j in range(1, n):
+        for i in reversed(range(j, n)):
+            coefficients[i] = (coefficients[i] - coefficients[i - 1]) * int(gmpy2.invert(xs[i] - xs[i - j], p)) % p
+    f = [coefficients[-1]]
+    for i in reversed(range(n - 1)):
+        # f = f * (x - xs[i]) + coefficients[i]
+        f = [(a - xs[i] * b) % p for a, b in zip([0] + f, f + [0])]
+        f[0] = (f[0] + coefficients[i]) % p
+    return _trim(f)
+
+
+def _common_roots(h1: BivariatePolynomial, h2: BivariatePolynomial, X: int, Y: int) -> list[tuple[int, int]]:
+    """The integer common roots by the resultant with respect to y, computed modulo a prime."""
+    p = int(gmpy2.next_prime(2 * max(X, Y) + random.getrandbits(32)))
+    degree = max(i for i, _ in h1) * max(j for _, j in h2) + max(i for i, _ in h2) * max(j for _, j in h1)
+    xs = list(range(degree + 1))
+    ys = [_resultant_mod(_bivariate_at_x(h1, x, p), _bivariate_at_x(h2, x, p), p) for x in xs]
+    resultant = _interpolate_mod(xs, ys, p)
+    if len(resultant) <= 1:
+        return []
+
+    roots = []
+    for r in roots_mod_prime(resultant, p):
+        x = r - p if r > p // 2 else r
+        if abs(x) > X:
+            continue
+        for y in integer_roots(_bivariate_at_x(h1, x), Y):
+            if _bivariate_eval(h2, x, y) == 0:
+                roots.append((x, y))
+    return roots
+
+
+def small_roots_bivariate(f: BivariatePolynomial, M: int, X: int, Y: int, m: int = 3, t: int = 1) -> list[tuple[int, int]]:
+    """The small roots of a bivariate polynomial modulo M (Coppersmith, Boneh-Durfee style shifts).
+
+    The lattice is spanned by the x-shifts x^i f^k M^(m-k) (i <= m - k) and the y-shifts y^j f^k M^(m-k) (1 <= j <= t)
+    evaluated at (xX, yY). Two short vectors after LLL give polynomials which have the root over the integers,
+    and the root is found from their resultant.
+
+    Args:
+        f (BivariatePolynomial): The polynomial {(i, j): coefficient of x^i y^j}. Its leading coefficient must be invertible modulo M.
+        M (int): The modulus.
+        X (int): The bound of |x0|.
+        Y (int): The bound of |y0|.
+        m (int, optional): The maximum power of f. Defaults to 3.
+        t (int, optional): The number of the y-shifts. Defaults to 1.
+    Returns:
+        list[tuple[int, int]]: The roots (x0, y0).
+    """
+    f = {k: v % M for k, v in f.items() if v % M}
+    # make the leading monomial monic
+    lead = max(f, key=lambda k: (k[0] + k[1], k[1]))
+    inv = _invert_leading(f[lead], M)
+    f = {k: v * inv % M for k, v in f.items()}
+
+    powers = [{(0, 0): 1}]
+    for _ in range(m):
+        powers.append(_bivariate_mul(powers[-1], f))
+
+    polynomials = []
+    for k in range(m + 1):
+        for i in range(m - k + 1):
+            polynomials.append({(a + i, b): c * M ** (m - k) for (a, b), c in powers[k].items()})
+    for j in range(1, t + 1):
+        for k in range(m + 1):
+            polynomials.append({(a, b + j): c * M ** (m - k) for (a, b), c in powers[k].items()})
+
+    monomials = sorted({k for g in polynomials for k in g}, key=lambda k: (k[0] + k[1], k[1], k[0]))
+    basis = [[g.get((i, j), 0) * X**i * Y**j for i, j in monomials] for g in polynomials]
+    logger.debug(f"Coppersmith: {len(basis)} polynomials, {len(monomials)} monomials")
+    reduced = [row for row in _reduce(basis) if any(row)]
+
+    shorts = [{(i, j): a // (X**i * Y**j) for (i, j), a in zip(monomials, row) if a} for row in reduced[:4]]
+    for a in range(len(shorts)):
+        for b in range(a + 1, len(shorts)):
+            roots = [
+                (x, y)
+                for x, y in _common_roots(shorts[a], shorts[b], X, Y)
+                if abs(y) <= Y and _bivariate_eval(f, x, y) % M == 0
+            ]
+            if roots:
+                return sorted(set(roots))
+    return []
+
+
+def factor_with_known_msb(n: int, p_msb: int, unknown_bits: int, epsilon: float | None = None) -> tuple[int, int] | None:
+    """Factor n = pq when all but the lower bits of p are known.
+
+    Args:
+        n (int): The modulus.
+        p_msb (int): p with the unknown lower bits set to 0.
+        unknown_bits (int): The number of the unknown lower bits, up to about a quarter of n.
+        epsilon (float | None, optional): The parameter of small_roots. Defaults to the largest one for the unknown bits.
+    Returns:
+        tuple[int, int] | None: (p, q), or None if failed.
+    """
+    beta = (p_msb.bit_length() - 1) / n.bit_length()
+    epsilon = epsilon or beta**2 - (unknown_bits + 2) / n.bit_length()
+    if epsilon <= 0:
+        logger.warning("Too many unknown bits.")
+        return None
+    for x in small_roots([p_msb, 1], n, beta, epsilon, 1 << unknown_bits):
+        p = p_msb + x
+        if 1 < p < n and n % p == 0:
+            return p, n // p
+    return None
+
+
+def stereotyped_message_attack(n: int, e: int, c: int, m_msb: int, unknown_bits: int, epsilon: float | None = None) -> int | None:
+    """Recover m from c = m^e mod n when all but the lower bits of m are known.
+
+    Args:
+        n (int): The modulus.
+        e (int): The (small) public exponent.
+        c (int): The ciphertext.
+        m_msb (int): m with the unknown lower bits set to 0.
+        unknown_bits (int): The number of the unknown lower bits, up to about n.bit_length() / e.
+        epsilon (float | None, optional): The parameter of small_roots. Defaults to the largest one for the unknown bits.
+    Returns:
+        int | None: The plaintext, or None if failed.
+    """
+    epsilon = epsilon or 1 / e - (unknown_bits + 2) / n.bit_length()
+    if epsilon <= 0:
+        logger.warning("Too many unknown bits.")
+        return None
+    f = [1]
+    for _ in range(e):
+        f = poly_mul(f, [m_msb, 1])
+    f[0] -= c
+    for x in small_roots(f, n, 1.0, epsilon, 1 << unknown_bits):
+        if 0 <= x:
+            return m_msb + x
+    return None
+
+
+def boneh_durfee_attack(n: int, e: int, delta: float = 0.26, m: int = 4, t: int | None = None) -> int | None:
+    """Boneh-Durfee attack on a small private exponent d < n^delta, beyond Wiener's bound n^0.25.
+
+    ed = 1 + k phi gives 1 + x (A + y) = 0 mod e at x = 2k and y = -(p + q) / 2 with A = (n + 1) / 2.
+
+    Args:
+        n (int): The modulus.
+        e (int): The public exponent.
+        delta (float, optional): The bound of d as a power of n, up to 0.284. Defaults to 0.26.
+        m (int, optional): The parameter of the lattice. Defaults to 4.
+        t (int | None, optional): The number of the y-shifts. Defaults to (1 - 2 delta) m.
+    Returns:
+        int | None: The private exponent, or None if failed.
+    """
+    t = int((1 - 2 * delta) * m) if t is None else t
+    X = 2 << int(n.bit_length() * delta)
+    Y = 2 << n.bit_length() // 2
+    A = (n + 1) // 2
+
+    for _, y in small_roots_bivariate({(1, 1): 1, (1, 0): A, (0, 0): 1}, e, X, Y, m, t):
+        s = -2 * y
+        D = s * s - 4 * n
+        if D < 0 or isqrt(D) ** 2 != D:
+            continue
+        p = (s + isqrt(D)) // 2
+        if 1 < p < n and n % p == 0:
+            return int(gmpy2.invert(e, (p - 1) * (n // p - 1)))
+    return None
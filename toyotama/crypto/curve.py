@@ -1,5 +1,9 @@
+from .ec import Point
+from .util import mod_sqrt
+
+
 class Curve:
-    def __init__(self, name: str, p: int, a: int, b: int, order: int, gx: int, gy: int):
+    def __init__(self, name: str, p: int, a: int, b: int, order: int | None = None, gx: int | None = None, gy: int | None = None):
         self.name = name
         self.p = p
         self.a = a
@@ -11,6 +15,37 @@ class Curve:
     def __repr__(self):
         return f"Curve(name='{self.name}',p={self.p},a={self.a},b={self.b},order={self.order},gx={self.gx},gy={self.gy})"
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Curve):
+            return NotImplemented
+        return (self.p, (self.a - other.a) % self.p, (self.b - other.b) % self.p) == (other.p, 0, 0)
+
+    def __hash__(self) -> int:
+        return hash((self.p, self.a % self.p, self.b % self.p))
+
+    @property
+    def G(self) -> Point:
+        """The generator."""
+        return Point(self, self.gx, self.gy)
+
+    @property
+    def O(self) -> Point:
+        """The point at infinity."""
+        return Point.infinity(self)
+
+    def point(self, x: int, y: int) -> Point:
+        P = Point(self, x, y)
+        assert P.is_on_curve(), "The point is not on the curve."
+        return P
+
+    def lift_x(self, x: int) -> Point | None:
+        """A point with the x-coordinate, or None if there is no such point."""
+        rhs = (x**3 + self.a * x + self.b) % self.p
+        y = mod_sqrt(rhs, self.p)
+        if y * y % self.p != rhs:
+            return None
+        return Point(self, x, y)
+
 
 P192 = Curve(
     "P192",
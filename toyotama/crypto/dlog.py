@@ -0,0 +1,382 @@
+"""Discrete logarithm
+"""
+import multiprocessing
+import multiprocessing.pool
+import random
+from array import array
+from collections import Counter
+from math import isqrt, prod
+
+import gmpy2
+
+from ..util.log import get_logger
+from .factor import factorize
+from .util import chinese_remainder
+
+logger = get_logger()
+
+# Default memory budget of a baby-step table in bytes.
+DLOG_MEMORY: int = 1 << 28
+# Each attempt of Pollard's rho walks this many times sqrt(order) steps, about 13 times the expected.
+DLOG_RHO_BUDGET: int = 16
+DLOG_RHO_RESTARTS: int = 4
+
+
+class BabyStepTable:
+    """Baby steps g**j (mod p) in an open-addressing hash table backed by an array.
+
+    Each slot packs a truncated hash (the low bits) of g**j together with j into
+    8 bytes, so the table size depends only on the number of baby steps, not on p.
+    A tag match is a candidate which is verified by the caller.
+    """
+
+    def __init__(self, g: int, p: int, m: int):
+        self.m = m
+        self.index_bits = m.bit_length()
+        self.tag_mask = (1 << (64 - self.index_bits)) - 1
+        self.capacity = 1 << (2 * m - 1).bit_length()
+        self.table = array("Q", bytes(8 * self.capacity))
+
+        table, mask, tag_mask, index_bits = self.table, self.capacity - 1, self.tag_mask, self.index_bits
+        g, b = gmpy2.mpz(g), gmpy2.mpz(1)
+        for j in range(1, m + 1):
+            tag = int(b & tag_mask)
+            slot = tag & mask
+            while table[slot]:
+                slot = (slot + 1) & mask
+            table[slot] = tag << index_bits | j
+            b = b * g % p
+
+    @staticmethod
+    def size(m: int) -> int:
+        return 8 << (2 * m - 1).bit_length()
+
+    def search(self, g: int, y: int, p: int, start: int, stop: int) -> int | None:
+        """Find x in [start*m, stop*m) such that g**x == y (mod p)."""
+        table, mask, tag_mask, index_bits = self.table, self.capacity - 1, self.tag_mask, self.index_bits
+        index_mask = (1 << index_bits) - 1
+
+        g, y = gmpy2.mpz(g), gmpy2.mpz(y)
+        giant = gmpy2.powmod(g, -self.m, p)
+        gamma = y * gmpy2.powmod(giant, start, p) % p
+        for i in range(start, stop):
+            tag = int(gamma & tag_mask)
+            slot = tag & mask
+            while entry := table[slot]:
+                if entry >> index_bits == tag:
+                    x = i * self.m + (entry & index_mask) - 1
+                    if gmpy2.powmod(g, x, p) == y:
+                        return x
+                slot = (slot + 1) & mask
+            gamma = gamma * giant % p
+
+        return None
+
+
+def _pool(workers: int, initializer=None, initargs=()) -> multiprocessing.pool.Pool:
+    return multiprocessing.get_context("fork").Pool(workers, initializer, initargs)
+
+
+_table: BabyStepTable | None = None
+
+
+def _set_table(table: BabyStepTable):
+    global _table
+    _table = table
+
+
+def _search_table(args: tuple[int, int, int, int, int]) -> int | None:
+    return _table.search(*args)
+
+
+def babystep_giantstep(g: int, y: int, p: int, order: int | None = None, memory: int = DLOG_MEMORY, workers: int = 1) -> int | None:
+    """Baby-step giant-step.
+
+    The number of baby steps is limited so that the table fits in `memory` bytes;
+    the remaining work moves to the giant steps, which are split across `workers` processes.
+
+    Args:
+        g (int): The generator.
+        y (int): The value.
+        p (int): The modulus.
+        order (int, optional): The order of g. Defaults to p - 1.
+        memory (int, optional): The memory budget of the table in bytes. Defaults to 256 MiB.
+        workers (int, optional): The number of processes for the giant steps. Defaults to 1.
+    Returns:
+        int | None: x such that g**x == y (mod p), or None if there is none.
+    """
+    order = order or p - 1
+    y %= p
+    if y == 1:
+        return 0
+
+    m = isqrt(order - 1) + 1
+    while m > 1 and BabyStepTable.size(m) > memory:
+        m //= 2
+    n = -(-order // m)
+
+    table = BabyStepTable(g, p, m)
+    if workers <= 1:
+        return table.search(g, y, p, 0, n)
+
+    chunk = -(-n // (workers * 16))
+    tasks = [(g, y, p, start, min(start + chunk, n)) for start in range(0, n, chunk)]
+    with _pool(workers, _set_table, (table,)) as pool:
+        for x in pool.imap_unordered(_search_table, tasks):
+            if x is not None:
+                pool.terminate()
+                return x
+
+    return None
+
+
+def _rho_walk(args: tuple) -> list[tuple[int, int, int]]:
+    g, y, p, q, steps, dp_mask, seed, count = args
+    rng = random.Random(seed)
+    g, y = gmpy2.mpz(g), gmpy2.mpz(y)
+    r = len(steps)
+    multipliers = [gmpy2.powmod(g, a, p) * gmpy2.powmod(y, b, p) % p for a, b in steps]
+
+    points = []
+    for _ in range(count):
+        a, b = rng.randrange(q), rng.randrange(q)
+        x = gmpy2.powmod(g, a, p) * gmpy2.powmod(y, b, p) % p
+        # a walk which does not reach a distinguished point is likely stuck in a cycle
+        for _ in range(20 * (dp_mask + 1)):
+            if not x & dp_mask:
+                points.append((int(x), a, b))
+                break
+            i = int(x % r)
+            x = x * multipliers[i] % p
+            a += steps[i][0]
+            b += steps[i][1]
+    return [(x, a % q, b % q) for x, a, b in points]
+
+
+def pollard_rho(g: int, y: int, p: int, order: int, workers: int = 1, seed: int | None = None) -> int | None:
+    """Pollard's rho with distinguished points.
+
+    Random walks run on `workers` processes and only report the distinguished points
+    they reach, so the memory use is small and the speedup is linear in the number of workers.
+
+    Args:
+        g (int): The generator.
+        y (int): The value.
+        p (int): The modulus.
+        order (int): The order of g, which must be prime.
+        workers (int, optional): The number of processes. Defaults to 1.
+        seed (int, optional): The random seed.
+    Returns:
+        int | None: x such that g**x == y (mod p), or None if it was not found in DLOG_RHO_RESTARTS attempts,
+        e.g. because `order` is not the order of g.
+    """
+    q = order
+    y %= p
+    if y == 1:
+        return 0
+    if pow(y, q, p) != 1:
+        return None
+    if q < 1 << 16:
+        return babystep_giantstep(g, y, p, q)
+
+    rng = random.Random(seed)
+    dp_mask = (1 << max(0, q.bit_length() // 2 - 8)) - 1
+    count = 16
+    # the walks of each attempt, about DLOG_RHO_BUDGET * sqrt(q) steps in total
+    n_tasks = -(-DLOG_RHO_BUDGET * isqrt(q) // (count * (dp_mask + 1)))
+
+    seen: dict[int, tuple[int, int]] = {}
+
+    def collide(points: list[tuple[int, int, int]]) -> int | None:
+        for x, a, b in points:
+            if x not in seen:
+                seen[x] = (a, b)
+                continue
+            a_, b_ = seen[x]
+            if gmpy2.gcd(b - b_, q) != 1:
+                continue
+            # g**a * y**b == g**a_ * y**b_
+            k = (a_ - a) * pow(b - b_, -1, q) % q
+            if pow(g, k, p) == y:
+                return k
+        return None
+
+    for attempt in range(DLOG_RHO_RESTARTS):
+        # a new walk for each attempt, in case the last one only gave degenerate collisions
+        steps = [(rng.randrange(q), rng.randrange(q)) for _ in range(20)]
+        seen.clear()
+        tasks = ((g, y, p, q, steps, dp_mask, rng.getrandbits(64), count) for _ in range(n_tasks))
+
+        if workers <= 1:
+            for task in tasks:
+                if (x := collide(_rho_walk(task))) is not None:
+                    return x
+        else:
+            with _pool(workers) as pool:
+                for points in pool.imap_unordered(_rho_walk, tasks):
+                    if (x := collide(points)) is not None:
+                        pool.terminate()
+                        return x
+
+        logger.info(f"Pollard's rho found no collision ({attempt + 1}/{DLOG_RHO_RESTARTS}).")
+
+    return None
+
+
+def pollard_kangaroo(g: int, y: int, p: int, lower: int, upper: int, retry: int = 8) -> int | None:
+    """Pollard's kangaroo (lambda) method.
+
+    Args:
+        g (int): The generator.
+        y (int): The value.
+        p (int): The modulus.
+        lower (int): The lower bound of x.
+        upper (int): The upper bound of x.
+        retry (int, optional): The number of attempts with different jump functions. Defaults to 8.
+    Returns:
+        int | None: x in [lower, upper] such that g**x == y (mod p), or None if it was not found.
+    """
+    g, y = gmpy2.mpz(g), gmpy2.mpz(y) % p
+    width = upper - lower
+    if width < 1 << 16:
+        x = babystep_giantstep(g, y * gmpy2.powmod(g, -lower, p) % p, p, width + 1)
+        # BSGS searches up to ceil(sqrt(width + 1))**2, beyond the range.
+        return None if x is None or x > width else lower + x
+
+    # the mean jump is about sqrt(width) / 2
+    k = 1
+    while ((1 << k) - 1) // k < isqrt(width) // 2:
+        k += 1
+    jumps = [1 << i for i in range(k)]
+    multipliers = [gmpy2.powmod(g, jump, p) for jump in jumps]
+    mean = ((1 << k) - 1) // k
+
+    for _ in range(retry):
+        salt = random.getrandbits(32) | 1
+
+        tame, tame_distance = gmpy2.powmod(g, upper, p), 0
+        # the tame kangaroo travels about `width` so the wild one crosses its path often enough
+        for _ in range(width // mean + k):
+            i = int(tame * salt >> 7) % k
+            tame = tame * multipliers[i] % p
+            tame_distance += jumps[i]
+
+        wild, wild_distance = y, 0
+        while wild_distance <= width + tame_distance:
+            if wild == tame:
+                return upper + tame_distance - wild_distance
+            i = int(wild * salt >> 7) % k
+            wild = wild * multipliers[i] % p
+            wild_distance += jumps[i]
+
+    return None
+
+
+def discrete_log(
+    g: int,
+    y: int,
+    p: int,
+    order: int | None = None,
+    bounds: tuple[int, int] | None = None,
+    memory: int = DLOG_MEMORY,
+    workers: int = 1,
+) -> int | None:
+    """Discrete logarithm in (Z/pZ)*.
+
+    Uses the kangaroo method when `bounds` is given, baby-step giant-step when its
+    table fits in `memory` (or the order is not prime), and Pollard's rho otherwise.
+
+    Args:
+        g (int): The generator.
+        y (int): The value.
+        p (int): The modulus.
+        order (int, optional): The order of g. Defaults to p - 1.
+        bounds (tuple[int, int], optional): The range of x.
+        memory (int, optional): The memory budget in bytes. Defaults to 256 MiB.
+        workers (int, optional): The number of processes. Defaults to 1.
+    Returns:
+        int | None: x such that g**x == y (mod p), or None if it was not found.
+    """
+    order = order or p - 1
+    if bounds:
+        return pollard_kangaroo(g, y, p, *bounds)
+    if BabyStepTable.size(isqrt(order - 1) + 1) <= memory or not gmpy2.is_prime(order):
+        return babystep_giantstep(g, y, p, order, memory, workers)
+    return pollard_rho(g, y, p, order, workers)
+
+
+def _prime_power_log(args: tuple[int, int, int, int, int, int]) -> int | None:
+    """Discrete logarithm in a subgroup of order q**e by Hensel lifting.
+
+    x = x_0 + x_1*q + ... + x_{e-1}*q**(e-1) is found one digit at a time,
+    each digit by a discrete logarithm in the subgroup of order q.
+    """
+    g, y, p, q, e, memory = args
+    gamma = pow(g, q ** (e - 1), p)
+    g_inv = pow(g, -1, p)
+
+    x = 0
+    for k in range(e):
+        h = pow(pow(g_inv, x, p) * y % p, q ** (e - 1 - k), p)
+        d = discrete_log(gamma, h, p, q, memory=memory)
+        if d is None:
+            return None
+        x += d * q**k
+
+    return x
+
+
+def pohlig_hellman(
+    g: int,
+    y: int,
+    factor: list[int] | dict[int, int] | None = None,
+    p: int | None = None,
+    memory: int = DLOG_MEMORY,
+    workers: int = 1,
+) -> tuple[int, int] | None:
+    """Pohlig-Hellman algorithm.
+
+    The subgroup of each prime power q**e is solved by Hensel lifting, i.e. e discrete
+    logarithms of order q, and the subgroups are solved on a pool of `workers` processes.
+    The factorizations of group orders are cached, so solving many instances over the
+    same prime factorizes p - 1 only once.
+
+    Args:
+        g (int): The generator.
+        y (int): The value.
+        factor (list[int] | dict[int, int], optional): The factorization of the order of g,
+            either as the list of prime factors repeated by their multiplicity or as {prime: multiplicity}.
+            Defaults to the factorization of p - 1.
+        p (int, optional): The modulus. Defaults to prod(factor) + 1.
+        memory (int, optional): The memory budget of each subgroup in bytes. Defaults to 256 MiB.
+        workers (int, optional): The number of processes. Defaults to 1.
+    Returns:
+        tuple[int, int] | None: x and the order of g such that g**x == y (mod p), or None if it was not found.
+    """
+    if factor is None and p is None:
+        raise ValueError("Either the factorization of the order of g or the modulus p is required.")
+    if factor is None:
+        factor = factorize(p - 1)
+    if not isinstance(factor, dict):
+        factor = Counter(factor)
+
+    order = prod(q**e for q, e in factor.items())
+    p = p or order + 1
+    moduli = [q**e for q, e in factor.items()]
+    tasks = [(pow(g, order // m, p), pow(y, order // m, p), p, q, e, memory) for (q, e), m in zip(factor.items(), moduli)]
+
+    if workers <= 1:
+        x = [_prime_power_log(task) for task in tasks]
+    else:
+        with _pool(workers) as pool:
+            x = pool.map(_prime_power_log, tasks)
+
+    if None in x:
+        logger.error("No discrete logarithm found.")
+        return None
+
+    return chinese_remainder(x, moduli)
+
+
+# Aliases
+bsgs = babystep_giantstep
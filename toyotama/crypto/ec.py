@@ -0,0 +1,331 @@
+"""Elliptic curve arithmetic
+
+Points on y^2 = x^3 + ax + b over GF(p) are kept in Jacobian coordinates
+(X, Y, Z) ~ (X/Z^2, Y/Z^3), where Z = 0 stands for the point at infinity.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from .util import batch_inverse
+
+if TYPE_CHECKING:
+    from .curve import Curve
+
+WNAF_WIDTH: int = 5
+PIPPENGER_THRESHOLD: int = 32
+
+Jacobian = tuple[int, int, int]
+INFINITY: Jacobian = (1, 1, 0)
+
+
+def _double(P: Jacobian, a: int, p: int) -> Jacobian:
+    X, Y, Z = P
+    if Z == 0 or Y == 0:
+        return INFINITY
+    XX = X * X % p
+    YY = Y * Y % p
+    YYYY = YY * YY % p
+    ZZ = Z * Z % p
+    S = 2 * ((X + YY) ** 2 - XX - YYYY) % p
+    if a == p - 3:
+        M = 3 * (X - ZZ) * (X + ZZ) % p
+    else:
+        M = (3 * XX + a * ZZ * ZZ) % p
+    X3 = (M * M - 2 * S) % p
+    Y3 = (M * (S - X3) - 8 * YYYY) % p
+    Z3 = ((Y + Z) ** 2 - YY - ZZ) % p
+    return X3, Y3, Z3
+
+
+def _add(P: Jacobian, Q: Jacobian, a: int, p: int) -> Jacobian:
+    X1, Y1, Z1 = P
+    X2, Y2, Z2 = Q
+    if Z1 == 0:
+        return Q
+    if Z2 == 0:
+        return P
+
+    Z1Z1 = Z1 * Z1 % p
+    U2 = X2 * Z1Z1 % p
+    S2 = Y2 * Z1 * Z1Z1 % p
+    if Z2 == 1:
+        # mixed addition
+        U1, S1 = X1, Y1
+    else:
+        Z2Z2 = Z2 * Z2 % p
+        U1 = X1 * Z2Z2 % p
+        S1 = Y1 * Z2 * Z2Z2 % p
+
+    H = (U2 - U1) % p
+    r = 2 * (S2 - S1) % p
+    if H == 0:
+        return _double(P, a, p) if r == 0 else INFINITY
+
+    I = 4 * H * H % p
+    J = H * I % p
+    V = U1 * I % p
+    X3 = (r * r - J - 2 * V) % p
+    Y3 = (r * (V - X3) - 2 * S1 * J) % p
+    Z3 = 2 * Z1 * H % p if Z2 == 1 else ((Z1 + Z2) ** 2 - Z1Z1 - Z2Z2) * H % p
+    return X3, Y3, Z3
+
+
+def _neg(P: Jacobian, p: int) -> Jacobian:
+    return P[0], -P[1] % p, P[2]
+
+
+def _normalize(points: list[Jacobian], p: int) -> list[Jacobian]:
+    """Convert to Z = 1 with a single modular inversion."""
+    finite = [i for i, P in enumerate(points) if P[2] != 0]
+    invs = batch_inverse([points[i][2] for i in finite], p)
+    result = list(points)
+    for i, zinv in zip(finite, invs):
+        X, Y, _ = points[i]
+        zinv2 = zinv * zinv % p
+        result[i] = (X * zinv2 % p, Y * zinv2 * zinv % p, 1)
+    return result
+
+
+def wnaf(k: int, width: int = WNAF_WIDTH) -> list[int]:
+    """Width-w non-adjacent form.
+
+    Args:
+        k (int): A non-negative scalar.
+        width (int, optional): The window width. Defaults to 5.
+    Returns:
+        list[int]: The odd digits in (-2^(w-1), 2^(w-1)), least significant first.
+    """
+    digits = []
+    half, full = 1 << (width - 1), 1 << width
+    while k:
+        if k & 1:
+            d = k & (full - 1)
+            if d >= half:
+                d -= full
+            k -= d
+        else:
+            d = 0
+        digits.append(d)
+        k >>= 1
+    return digits
+
+
+def _odd_multiples(P: Jacobian, n: int, a: int, p: int) -> list[Jacobian]:
+    """[P, 3P, 5P, ..., (2n-1)P]"""
+    table = [P]
+    P2 = _double(P, a, p)
+    for _ in range(n - 1):
+        table.append(_add(P2, table[-1], a, p))
+    return table
+
+
+@lru_cache(maxsize=256)
+def _precomputed(curve: Curve, x: int, y: int, width: int) -> list[Jacobian]:
+    """The table of odd multiples, cached per affine point (mostly generators)."""
+    return _normalize(_odd_multiples((x, y, 1), 1 << (width - 2), curve.a % curve.p, curve.p), curve.p)
+
+
+def _scalar_mul(curve: Curve, P: Jacobian, k: int) -> Jacobian:
+    p, a = curve.p, curve.a % curve.p
+    if P[2] == 0 or k == 0:
+        return INFINITY
+    if k < 0:
+        P, k = _neg(P, p), -k
+
+    width = WNAF_WIDTH if k.bit_length() > 64 else 3
+    if P[2] == 1:
+        table = _precomputed(curve, P[0], P[1], width)
+    else:
+        table = _normalize(_odd_multiples(P, 1 << (width - 2), a, p), p)
+
+    R = INFINITY
+    for d in reversed(wnaf(k, width)):
+        R = _double(R, a, p)
+        if d > 0:
+            R = _add(R, table[d >> 1], a, p)
+        elif d < 0:
+            R = _add(R, _neg(table[-d >> 1], p), a, p)
+    return R
+
+
+def _straus(curve: Curve, points: list[Jacobian], scalars: list[int]) -> Jacobian:
+    p, a = curve.p, curve.a % curve.p
+    tables = _normalize([Q for P in points for Q in _odd_multiples(P, 1 << (WNAF_WIDTH - 2), a, p)], p)
+    size = 1 << (WNAF_WIDTH - 2)
+    tables = [tables[i : i + size] for i in range(0, len(tables), size)]
+    digits = [wnaf(k, WNAF_WIDTH) for k in scalars]
+
+    R = INFINITY
+    for i in reversed(range(max(map(len, digits), default=0))):
+        R = _double(R, a, p)
+        for table, ds in zip(tables, digits):
+            d = ds[i] if i < len(ds) else 0
+            if d > 0:
+                R = _add(R, table[d >> 1], a, p)
+            elif d < 0:
+                R = _add(R, _neg(table[-d >> 1], p), a, p)
+    return R
+
+
+def _pippenger(curve: Curve, points: list[Jacobian], scalars: list[int]) -> Jacobian:
+    p, a = curve.p, curve.a % curve.p
+    c = max(2, len(points).bit_length() - 2)
+    mask = (1 << c) - 1
+    bits = max(k.bit_length() for k in scalars)
+
+    R = INFINITY
+    for shift in reversed(range(0, bits, c)):
+        for _ in range(c):
+            R = _double(R, a, p)
+        buckets = [INFINITY] * (mask + 1)
+        for P, k in zip(points, scalars):
+            d = k >> shift & mask
+            if d:
+                buckets[d] = _add(buckets[d], P, a, p)
+        # sum_d d * buckets[d]
+        running, total = INFINITY, INFINITY
+        for d in range(mask, 0, -1):
+            running = _add(running, buckets[d], a, p)
+            total = _add(total, running, a, p)
+        R = _add(R, total, a, p)
+    return R
+
+
+class Point:
+    """A point on an elliptic curve in Jacobian coordinates."""
+
+    __slots__ = ("curve", "X", "Y", "Z")
+
+    def __init__(self, curve: Curve, x: int, y: int, z: int = 1):
+        self.curve = curve
+        self.X = x % curve.p
+        self.Y = y % curve.p
+        self.Z = z % curve.p
+
+    @classmethod
+    def infinity(cls, curve: Curve) -> Point:
+        return cls(curve, *INFINITY)
+
+    @property
+    def jacobian(self) -> Jacobian:
+        return self.X, self.Y, self.Z
+
+    def is_infinity(self) -> bool:
+        return self.Z == 0
+
+    def normalize(self) -> Point:
+        """Return the same point with Z = 1."""
+        return Point(self.curve, *_normalize([self.jacobian], self.curve.p)[0])
+
+    @property
+    def xy(self) -> tuple[int, int] | None:
+        """The affine coordinates. None for the point at infinity."""
+        if self.is_infinity():
+            return None
+        X, Y, _ = _normalize([self.jacobian], self.curve.p)[0]
+        return X, Y
+
+    @property
+    def x(self) -> int | None:
+        xy = self.xy
+        return xy and xy[0]
+
+    @property
+    def y(self) -> int | None:
+        xy = self.xy
+        return xy and xy[1]
+
+    def is_on_curve(self) -> bool:
+        if self.is_infinity():
+            return True
+        p = self.curve.p
+        Z2 = self.Z * self.Z % p
+        Z4 = Z2 * Z2 % p
+        return (self.Y * self.Y - self.X**3 - self.curve.a * self.X * Z4 - self.curve.b * Z4 * Z2) % p == 0
+
+    def double(self) -> Point:
+        return Point(self.curve, *_double(self.jacobian, self.curve.a % self.curve.p, self.curve.p))
+
+    def __add__(self, other: Point) -> Point:
+        assert self.curve == other.curve, "The points must be on the same curve."
+        return Point(self.curve, *_add(self.jacobian, other.jacobian, self.curve.a % self.curve.p, self.curve.p))
+
+    def __neg__(self) -> Point:
+        return Point(self.curve, *_neg(self.jacobian, self.curve.p))
+
+    def __sub__(self, other: Point) -> Point:
+        return self + -other
+
+    def __mul__(self, k: int) -> Point:
+        P = self.jacobian
+        if self.Z not in (0, 1):
+            P = _normalize([P], self.curve.p)[0]
+        return Point(self.curve, *_scalar_mul(self.curve, P, int(k)))
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Point):
+            return NotImplemented
+        if self.curve != other.curve:
+            return False
+        if self.is_infinity() or other.is_infinity():
+            return self.is_infinity() and other.is_infinity()
+        p = self.curve.p
+        Z1Z1, Z2Z2 = self.Z * self.Z % p, other.Z * other.Z % p
+        return (self.X * Z2Z2 - other.X * Z1Z1) % p == 0 and (self.Y * Z2Z2 * other.Z - other.Y * Z1Z1 * self.Z) % p == 0
+
+    def __hash__(self) -> int:
+        return hash((self.curve, self.xy))
+
+    def __repr__(self) -> str:
+        if self.is_infinity():
+            return f"Point({self.curve.name}, infinity)"
+        x, y = self.xy
+        return f"Point({self.curve.name}, x={x:#x}, y={y:#x})"
+
+
+def batch_normalize(points: list[Point]) -> list[Point]:
+    """Convert the points to Z = 1 with a single modular inversion.
+
+    Args:
+        points (list[Point]): The points on the same curve.
+    Returns:
+        list[Point]: The normalized points.
+    """
+    if not points:
+        return []
+    curve = points[0].curve
+    return [Point(curve, *P) for P in _normalize([P.jacobian for P in points], curve.p)]
+
+
+def multi_scalar_mul(points: list[Point], scalars: list[int]) -> Point:
+    """Multi-scalar multiplication sum(k_i * P_i).
+
+    Straus' interleaved wNAF is used for a few points and Pippenger's bucket method for many.
+
+    Args:
+        points (list[Point]): The points on the same curve.
+        scalars (list[int]): The scalars.
+    Returns:
+        Point: The sum.
+    """
+    assert len(points) == len(scalars), "The length of points and scalars must be same."
+    assert points, "At least one point is required."
+
+    curve = points[0].curve
+    Ps, ks = [], []
+    for P, k in zip(batch_normalize(points), scalars):
+        if k < 0:
+            P, k = -P, -k
+        if k and not P.is_infinity():
+            Ps.append(P.jacobian)
+            ks.append(k)
+    if not Ps:
+        return Point.infinity(curve)
+
+    if len(Ps) < PIPPENGER_THRESHOLD:
+        return Point(curve, *_straus(curve, Ps, ks))
+    return Point(curve, *_pippenger(curve, Ps, ks))
@@ -0,0 +1,483 @@
+"""Elliptic curve discrete logarithm
+"""
+import random
+from collections import Counter
+from math import isqrt, prod
+
+import gmpy2
+
+from ..util.log import get_logger
+from .curve import Curve
+from .dlog import _pool
+from .ec import Point, _add, _double, batch_normalize
+from .factor import factorize
+from .util import batch_inverse, chinese_remainder, mod_sqrt
+
+logger = get_logger()
+
+# Subgroups with an order below this bound are solved by baby-step giant-step.
+EC_BSGS_BOUND: int = 1 << 36
+# Pollard's rho walks run in lockstep so that their inversions are batched.
+EC_RHO_WALKS: int = 64
+
+
+def ec_babystep_giantstep(P: Point, Q: Point, order: int) -> int | None:
+    """Baby-step giant-step on an elliptic curve.
+
+    The baby steps are keyed by the x-coordinate only, so a match gives +-j.
+
+    Args:
+        P (Point): The base point.
+        Q (Point): The target point.
+        order (int): The order of P.
+    Returns:
+        int | None: k such that k*P == Q, or None if there is none.
+    """
+    if Q.is_infinity():
+        return 0
+
+    m = isqrt(order - 1) + 1
+    baby = [Point.infinity(P.curve)]
+    for _ in range(m):
+        baby.append(baby[-1] + P)
+    table = {}
+    for j, B in enumerate(batch_normalize(baby[1:]), 1):
+        table.setdefault(B.X, j)
+
+    step = -(P * m)
+    chunk = min(m, 1 << 12)
+    R = Q
+    for i in range(0, m + 1, chunk):
+        giant = []
+        for _ in range(chunk):
+            giant.append(R)
+            R = R + step
+        for di, G in enumerate(batch_normalize(giant)):
+            if G.is_infinity():
+                return (i + di) * m % order
+            if (j := table.get(G.X)) is not None:
+                for k in ((i + di) * m + j, (i + di) * m - j):
+                    if P * k == Q:
+                        return k % order
+    return None
+
+
+def _affine(P: Point) -> tuple[int, int]:
+    return P.normalize().jacobian[:2]
+
+
+def _ec_rho_walk(args: tuple) -> list[tuple[int, int, int]]:
+    curve, P, Q, q, steps, dp_mask, seed, count = args
+    rng = random.Random(seed)
+    p = curve.p
+    multipliers = [_affine(P * a + Q * b) for a, b in steps]
+    r = len(steps)
+
+    def start():
+        while True:
+            a, b = rng.randrange(q), rng.randrange(q)
+            R = P * a + Q * b
+            if not R.is_infinity():
+                return [*_affine(R), a, b, 0]
+
+    walks = [start() for _ in range(EC_RHO_WALKS)]
+    points = []
+    # a walk which does not reach a distinguished point is likely stuck in a cycle
+    limit = 20 * (dp_mask + 1)
+    while len(points) < count:
+        invs = batch_inverse([multipliers[w[0] % r][0] - w[0] for w in walks], p)
+        for i, (w, inv) in enumerate(zip(walks, invs)):
+            x, y, a, b, n = w
+            j = x % r
+            mx, my = multipliers[j]
+            if inv == 0 or n > limit:
+                walks[i] = start()
+                continue
+            l = (my - y) * inv % p
+            x3 = (l * l - x - mx) % p
+            w[0], w[1] = x3, (l * (x - x3) - y) % p
+            w[2], w[3], w[4] = a + steps[j][0], b + steps[j][1], n + 1
+            if not x3 & dp_mask:
+                # the walk goes on from the distinguished point; restarting would cost two scalar multiplications
+                points.append((x3, w[2] % q, w[3] % q))
+                w[4] = 0
+    return points
+
+
+def ec_pollard_rho(P: Point, Q: Point, order: int, workers: int = 1, seed: int | None = None) -> int | None:
+    """Pollard's rho with distinguished points on an elliptic curve.
+
+    Each process runs a batch of r-adding walks in lockstep, sharing one modular inversion
+    per step by Montgomery's trick, and reports only the distinguished points.
+
+    Args:
+        P (Point): The base point.
+        Q (Point): The target point.
+        order (int): The order of P, which must be prime.
+        workers (int, optional): The number of processes. Defaults to 1.
+        seed (int, optional): The random seed.
+    Returns:
+        int | None: k such that k*P == Q, or None if there is none.
+    """
+    q = order
+    if Q.is_infinity():
+        return 0
+    if not (Q * q).is_infinity():
+        return None
+    if q < 1 << 16:
+        return ec_babystep_giantstep(P, Q, q)
+
+    rng = random.Random(seed)
+    steps = [(rng.randrange(q), rng.randrange(q)) for _ in range(20)]
+    dp_mask = (1 << max(0, q.bit_length() // 2 - 8)) - 1
+    count = 16
+    P, Q = P.normalize(), Q.normalize()
+
+    seen: dict[int, tuple[int, int]] = {}
+
+    def collide(points: list[tuple[int, int, int]]) -> int | None:
+        for x, a, b in points:
+            if x not in seen:
+                seen[x] = (a, b)
+                continue
+            a_, b_ = seen[x]
+            # a*P + b*Q == +-(a_*P + b_*Q)
+            for sa, sb in ((a_, b_), (-a_, -b_)):
+                if (b - sb) % q == 0:
+                    continue
+                k = (sa - a) * pow(b - sb, -1, q) % q
+                if P * k == Q:
+                    return k
+        return None
+
+    def tasks():
+        while True:
+            yield (P.curve, P, Q, q, steps, dp_mask, rng.getrandbits(64), count)
+
+    if workers <= 1:
+        for task in tasks():
+            if (x := collide(_ec_rho_walk(task))) is not None:
+                return x
+
+    with _pool(workers) as pool:
+        task = tasks()
+        pending = [pool.apply_async(_ec_rho_walk, (next(task),)) for _ in range(2 * workers)]
+        while pending:
+            result = pending.pop(0)
+            if (x := collide(result.get())) is not None:
+                pool.terminate()
+                return x
+            pending.append(pool.apply_async(_ec_rho_walk, (next(task),)))
+
+    return None
+
+
+def _ec_prime_log(P: Point, Q: Point, q: int, workers: int) -> int | None:
+    if q < EC_BSGS_BOUND:
+        return ec_babystep_giantstep(P, Q, q)
+    return ec_pollard_rho(P, Q, q, workers)
+
+
+def ec_pohlig_hellman(P: Point, Q: Point, factor: list[int] | dict[int, int] | None = None, workers: int = 1) -> tuple[int, int] | None:
+    """Pohlig-Hellman algorithm on an elliptic curve.
+
+    The subgroup of each prime power q**e is solved by Hensel lifting, with baby-step giant-step
+    for small q and Pollard's rho on `workers` processes for large q.
+
+    Args:
+        P (Point): The base point.
+        Q (Point): The target point.
+        factor (list[int] | dict[int, int], optional): The factorization of the order of P,
+            either as the list of prime factors repeated by their multiplicity or as {prime: multiplicity}.
+            Defaults to the factorization of `P.curve.order`.
+        workers (int, optional): The number of processes for Pollard's rho. Defaults to 1.
+    Returns:
+        tuple[int, int] | None: k and the order of P such that k*P == Q, or None if it was not found.
+    """
+    if factor is None:
+        factor = factorize(P.curve.order)
+    if not isinstance(factor, dict):
+        factor = Counter(factor)
+
+    order = prod(q**e for q, e in factor.items())
+    x, moduli = [], []
+    for q, e in factor.items():
+        P_, Q_ = P * (order // q**e), Q * (order // q**e)
+        gamma = P_ * q ** (e - 1)
+        k = 0
+        for i in range(e):
+            h = (Q_ - P_ * k) * q ** (e - 1 - i)
+            d = _ec_prime_log(gamma, h, q, workers)
+            if d is None:
+                logger.error("No discrete logarithm found.")
+                return None
+            k += d * q**i
+        x.append(k)
+        moduli.append(q**e)
+
+    return chinese_remainder(x, moduli)
+
+
+def is_anomalous(curve: Curve, order: int | None = None) -> bool:
+    """Whether the points of the given order are in a subgroup of order p, where Smart's attack applies."""
+    return (order or curve.order) == curve.p
+
+
+def embedding_degree(order: int, p: int, bound: int = 6) -> int | None:
+    """The smallest k <= `bound` such that order | p**k - 1, where the MOV attack applies.
+
+    Args:
+        order (int): The order of the point.
+        p (int): The characteristic.
+        bound (int, optional): The largest degree to check. Defaults to 6.
+    Returns:
+        int | None: The embedding degree, or None if it is larger than `bound`.
+    """
+    for k in range(1, bound + 1):
+        if pow(p, k, order) == 1:
+            return k
+    return None
+
+
+def _lift(x: int, y: int, a: int, b: int, p: int) -> tuple[int, int]:
+    """Hensel-lift (x, y) to a point on y^2 = x^3 + ax + b over Z/p^2."""
+    p2 = p * p
+    f = (x**3 + a * x + b - y * y) % p2
+    return x, (y + f * pow(2 * y, -1, p2)) % p2
+
+
+def _p_adic_log(P: tuple[int, int], p: int, a: int) -> int:
+    """psi(p*P) for a point P on the lift: -x/y of p*P divided by p."""
+    p2 = p * p
+    R = P[0], P[1], 1
+    S = (1, 1, 0)
+    for bit in bin(p)[2:]:
+        S = _double(S, a, p2)
+        if bit == "1":
+            S = _add(S, R, a, p2)
+    X, Y, Z = S
+    # x/y = X*Z/Y, and Z = 0 (mod p)
+    return -X * Z * pow(Y, -1, p2) % p2 // p
+
+
+def smart_attack(P: Point, Q: Point, retry: int = 8) -> int | None:
+    """Smart's attack on anomalous curves, where the order of P is p.
+
+    The points are lifted to Z/p^2 on a random lift of the curve, multiplied by p into the
+    kernel of the reduction, and compared through the p-adic elliptic logarithm.
+
+    Args:
+        P (Point): The base point of order p.
+        Q (Point): The target point.
+        retry (int, optional): The number of random lifts to try. Defaults to 8.
+    Returns:
+        int | None: k such that k*P == Q, or None if it was not found.
+    """
+    curve = P.curve
+    p = curve.p
+    if Q.is_infinity():
+        return 0
+
+    (px, py), (qx, qy) = _affine(P), _affine(Q)
+    for _ in range(retry):
+        a = curve.a % p + p * random.randrange(1, p)
+        b = curve.b % p + p * random.randrange(1, p)
+        u = _p_adic_log(_lift(px, py, a, b, p), p, a)
+        v = _p_adic_log(_lift(qx, qy, a, b, p), p, a)
+        if u % p == 0:
+            # the canonical lift
+            continue
+        k = v * pow(u, -1, p) % p
+        if P * k == Q:
+            return k
+    return None
+
+
+class _Fp2:
+    """GF(p^2) = GF(p)[t] / (t^2 - r) with elements u + v*t as tuples."""
+
+    def __init__(self, p: int):
+        self.p = p
+        self.r = next(r for r in range(2, p) if gmpy2.jacobi(r, p) == -1)
+
+    def mul(self, x: tuple[int, int], y: tuple[int, int]) -> tuple[int, int]:
+        p = self.p
+        return (x[0] * y[0] + x[1] * y[1] * self.r) % p, (x[0] * y[1] + x[1] * y[0]) % p
+
+    def pow(self, x: tuple[int, int], k: int) -> tuple[int, int]:
+        result = (1, 0)
+        for bit in bin(k)[2:]:
+            result = self.mul(result, result)
+            if bit == "1":
+                result = self.mul(result, x)
+        return result
+
+    def inv(self, x: tuple[int, int]) -> tuple[int, int]:
+        n = pow((x[0] * x[0] - x[1] * x[1] * self.r) % self.p, -1, self.p)
+        return x[0] * n % self.p, -x[1] * n % self.p
+
+    def log(self, g: tuple[int, int], h: tuple[int, int], order: int) -> int | None:
+        """Pohlig-Hellman with baby-step giant-step in the subgroup generated by g."""
+        x, moduli = [], []
+        for q, e in factorize(order).items():
+            g_ = self.pow(g, order // q**e)
+            h_ = self.pow(h, order // q**e)
+            gamma = self.pow(g_, q ** (e - 1))
+            m = isqrt(q - 1) + 1
+            baby, b = {}, (1, 0)
+            for j in range(m):
+                baby.setdefault(b, j)
+                b = self.mul(b, gamma)
+            step = self.inv(self.pow(gamma, m))
+            k = 0
+            for i in range(e):
+                y = self.pow(self.mul(self.inv(self.pow(g_, k)), h_), q ** (e - 1 - i))
+                for s in range(m):
+                    if (j := baby.get(y)) is not None:
+                        break
+                    y = self.mul(y, step)
+                else:
+                    return None
+                k += (s * m + j) * q**i
+            x.append(k)
+            moduli.append(q**e)
+        return chinese_remainder(x, moduli)[0]
+
+
+def _tate_pairing(P: tuple[int, int], R: tuple[int, int], n: int, a: int, F: _Fp2) -> tuple[int, int]:
+    """The reduced Tate pairing e(P, R') in GF(p^2), where R' = (R[0], R[1]*t) lies on E(GF(p^2)).
+
+    R' has its x-coordinate in GF(p), so the vertical lines vanish in the final exponentiation.
+    """
+    p = F.p
+    xr, sr = R
+
+    def line(T, l):
+        # y_R - y_T - l(x_R - x_T)
+        return -(T[1] + l * (xr - T[0])) % p, sr
+
+    f, T = (1, 0), P
+    for bit in bin(n)[3:]:
+        l = (3 * T[0] * T[0] + a) * pow(2 * T[1], -1, p) % p
+        f = F.mul(F.mul(f, f), line(T, l))
+        x3 = (l * l - 2 * T[0]) % p
+        T = x3, (l * (T[0] - x3) - T[1]) % p
+        if bit == "1":
+            if T[0] == P[0]:
+                # T + P is the point at infinity, a vertical line
+                continue
+            l = (P[1] - T[1]) * pow(P[0] - T[0], -1, p) % p
+            f = F.mul(f, line(T, l))
+            x3 = (l * l - T[0] - P[0]) % p
+            T = x3, (l * (T[0] - x3) - T[1]) % p
+    return F.pow(f, (p * p - 1) // n)
+
+
+def _hasse_multiple(order: int, p: int) -> int | None:
+    """The number of points on a curve over GF(p) with a point of the given order, if the Hasse bound determines it."""
+    if order <= 4 * isqrt(p) + 4:
+        # several multiples may lie within p + 1 +- 2*sqrt(p)
+        return None
+    first = -(-(p - 1 - 2 * isqrt(p)) // order) * order
+    return next((m for m in (first, first + order) if (p + 1 - m) ** 2 <= 4 * p), None)
+
+
+def mov_attack(P: Point, Q: Point, order: int | None = None, curve_order: int | None = None, retry: int = 64) -> int | None:
+    """The MOV attack for curves with embedding degree 2.
+
+    The points are mapped into GF(p^2) by the Tate pairing against a point of the quadratic twist,
+    and the discrete logarithm is solved there by Pohlig-Hellman.
+
+    Args:
+        P (Point): The base point.
+        Q (Point): The target point.
+        order (int, optional): The odd order of P. Defaults to `P.curve.order`.
+        curve_order (int, optional): The number of points on the curve. Defaults to the only multiple of `order`
+            in the Hasse interval, or p + 1 (supersingular) if there are several.
+        retry (int, optional): The number of random points of the twist to try. Defaults to 64.
+    Returns:
+        int | None: k such that k*P == Q, or None if it was not found.
+    """
+    curve = P.curve
+    p, n = curve.p, order or curve.order
+    if embedding_degree(n, p, 2) != 2:
+        logger.error("The embedding degree is not 2.")
+        return None
+    if n % 2 == 0:
+        logger.error("The order must be odd.")
+        return None
+    curve_order = curve_order or _hasse_multiple(n, p) or p + 1
+    # The pairing needs a point of order n on the twist.
+    twist_order = 2 * (p + 1) - curve_order
+    if curve_order % n or twist_order % n:
+        logger.error("The order does not divide the numbers of points on the curve and its twist.")
+        return None
+    if Q.is_infinity():
+        return 0
+
+    F = _Fp2(p)
+    r = F.r
+    # (x, s) with r*s^2 = x^3 + ax + b is (r*x, r^2*s) on y^2 = x^3 + a*r^2*x + b*r^3
+    twist = Curve(f"{curve.name}-twist", p, curve.a * r * r, curve.b * r**3)
+    cofactor = twist_order // n
+    r_inv = pow(r, -1, p)
+
+    (px, py), (qx, qy) = _affine(P), _affine(Q)
+    for _ in range(retry):
+        x = random.randrange(p)
+        rhs = (x**3 + curve.a * x + curve.b) % p
+        if gmpy2.jacobi(rhs, p) != -1:
+            continue
+        s = mod_sqrt(rhs * r_inv % p, p)
+        R = Point(twist, r * x, r * r * s) * cofactor
+        if R.is_infinity() or not (R * n).is_infinity():
+            continue
+        X, Y = _affine(R)
+        R = X * r_inv % p, Y * r_inv * r_inv % p
+
+        g = _tate_pairing((px, py), R, n, curve.a % p, F)
+        if g == (1, 0):
+            continue
+        h = _tate_pairing((qx, qy), R, n, curve.a % p, F)
+        k = F.log(g, h, n)
+        if k is not None and P * k == Q:
+            return k
+        return None
+    return None
+
+
+def ec_discrete_log(P: Point, Q: Point, order: int | None = None, workers: int = 1, curve_order: int | None = None) -> int | None:
+    """Elliptic curve discrete logarithm.
+
+    The curve is checked for weaknesses first: Smart's attack if the order is p and the MOV
+    attack if the embedding degree is 2. Otherwise Pohlig-Hellman is used over the order of P.
+
+    Args:
+        P (Point): The base point.
+        Q (Point): The target point.
+        order (int, optional): The order of P. Defaults to `P.curve.order`.
+        workers (int, optional): The number of processes for Pollard's rho. Defaults to 1.
+        curve_order (int, optional): The number of points on the curve, for the MOV attack. Defaults to the one derived from `order`.
+    Returns:
+        int | None: k such that k*P == Q, or None if it was not found.
+    """
+    curve = P.curve
+    order = order or curve.order
+    assert order and (P * order).is_infinity(), "The order of P is required."
+
+    if is_anomalous(curve, order):
+        logger.info("The curve is anomalous. Trying Smart's attack.")
+        if (k := smart_attack(P, Q)) is not None:
+            return k
+
+    degree = embedding_degree(order, curve.p)
+    if degree is not None:
+        logger.info(f"The embedding degree is {degree}.")
+        if degree == 2 and order % 2 and max(factorize(order)) < EC_BSGS_BOUND:
+            logger.info("Trying the MOV attack.")
+            if (k := mov_attack(P, Q, order, curve_order)) is not None:
+                return k
+
+    if (result := ec_pohlig_hellman(P, Q, factorize(order), workers)) is None:
+        return None
+    return result[0]
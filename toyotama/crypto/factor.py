@@ -0,0 +1,501 @@
+"""Integer factorization
+"""
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter
+from collections.abc import Callable
+from functools import lru_cache
+from math import isqrt
+
+import gmpy2
+
+from ..util.log import get_logger
+from .util import product_tree, remainder_tree
+
+logger = get_logger()
+
+
+def prime_sieve(n: int) -> list[int]:
+    """Sieve of Eratosthenes.
+
+    Args:
+        n (int): The upper bound.
+    Returns:
+        list[int]: The primes less than n.
+    """
+    if n <= 2:
+        return []
+    # sieve[i] stands for 2*i + 1
+    sieve = bytearray([1]) * (n // 2)
+    sieve[0] = 0
+    for i in range(1, (isqrt(n - 1) - 1) // 2 + 1):
+        if sieve[i]:
+            p = 2 * i + 1
+            sieve[p * p // 2 :: p] = bytes(len(range(p * p // 2, n // 2, p)))
+    return [2] + [2 * i + 1 for i in range(n // 2) if sieve[i]]
+
+
+SMALL_PRIMES: list[int] = prime_sieve(1 << 16)
+
+
+@lru_cache(maxsize=4)
+def _primes(n: int) -> list[int]:
+    return SMALL_PRIMES if n <= 1 << 16 else prime_sieve(n)
+
+
+@lru_cache(maxsize=16)
+def _prime_power(p: int, bound: int) -> int:
+    """The largest power of p not exceeding `bound`, in integers as log(243, 3) = 4.9999..."""
+    q = p
+    while q * p <= bound:
+        q *= p
+    return q
+
+
+def _powersmooth(bound: int) -> gmpy2.mpz:
+    """The product of the largest powers of every prime up to `bound` not exceeding `bound`."""
+    k = gmpy2.mpz(1)
+    for p in _primes(bound + 1):
+        k *= _prime_power(p, bound)
+    return k
+
+
+def trial_division(n: int, primes: list[int] = SMALL_PRIMES) -> tuple[dict[int, int], int]:
+    """Trial division by small primes.
+
+    Args:
+        n (int): The value.
+        primes (list[int], optional): The primes to try. Defaults to the primes less than 2**16.
+    Returns:
+        tuple[dict[int, int], int]: The small prime factors with their multiplicities and the cofactor.
+    """
+    factors: dict[int, int] = {}
+    for p in primes:
+        if p * p > n:
+            break
+        if n % p:
+            continue
+        k = 0
+        while n % p == 0:
+            n //= p
+            k += 1
+        factors[p] = k
+    if 1 < n <= primes[-1] ** 2:
+        factors[n] = factors.get(n, 0) + 1
+        n = 1
+    return factors, n
+
+
+def fermat(n: int, iterations: int = 1 << 16) -> int | None:
+    """Fermat's factorization method, for n = p*q with p and q close to each other.
+
+    Args:
+        n (int): An odd composite value.
+        iterations (int, optional): The number of steps. Defaults to 2**16.
+    Returns:
+        int | None: A non-trivial factor of n, or None if it was not found.
+    """
+    a = gmpy2.isqrt(n)
+    if a * a == n:
+        return int(a)
+    a += 1
+    b2 = a * a - n
+    for _ in range(iterations):
+        if gmpy2.is_square(b2):
+            return int(a - gmpy2.isqrt(b2))
+        b2 += 2 * a + 1
+        a += 1
+    return None
+
+
+def pollard_rho_brent(n: int, iterations: int | None = None, seed: int | None = None) -> int | None:
+    """Pollard's rho method with Brent's cycle detection.
+
+    Args:
+        n (int): A composite value.
+        iterations (int, optional): The maximum number of steps. Defaults to None (unlimited).
+        seed (int, optional): The random seed.
+    Returns:
+        int | None: A non-trivial factor of n, or None if it was not found.
+    """
+    if n % 2 == 0:
+        return 2
+
+    rng = random.Random(seed)
+    n_ = gmpy2.mpz(n)
+    steps = 0
+    while iterations is None or steps < iterations:
+        y, c, m = gmpy2.mpz(rng.randrange(1, n)), gmpy2.mpz(rng.randrange(1, n)), 128
+        g = r = q = gmpy2.mpz(1)
+        while g == 1:
+            if iterations is not None and steps >= iterations:
+                return None
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n_
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n_
+                    q = q * abs(x - y) % n_
+                g = gmpy2.gcd(q, n_)
+                k += m
+            steps += 2 * r
+            r *= 2
+
+        if g == n_:
+            g = gmpy2.mpz(1)
+            while g == 1:
+                ys = (ys * ys + c) % n_
+                g = gmpy2.gcd(abs(x - ys), n_)
+
+        if g != n_:
+            return int(g)
+
+    return None
+
+
+def pollard_pm1(n: int, bound: int = 1 << 16, base: int = 2) -> int | None:
+    """Pollard's p-1 method, for a prime factor p such that p-1 is `bound`-powersmooth.
+
+    Args:
+        n (int): A composite value.
+        bound (int, optional): The smoothness bound. Defaults to 2**16.
+        base (int, optional): The base. Defaults to 2.
+    Returns:
+        int | None: A non-trivial factor of n, or None if it was not found.
+    """
+    a = gmpy2.mpz(base)
+    for p in _primes(bound + 1):
+        a = gmpy2.powmod(a, _prime_power(p, bound), n)
+    g = gmpy2.gcd(a - 1, n)
+    if 1 < g < n:
+        return int(g)
+    return None
+
+
+def _lucas_v(v: gmpy2.mpz, k: int, n: int) -> gmpy2.mpz:
+    """V_k(v) mod n of the Lucas sequence V_0 = 2, V_1 = v, V_{i+1} = v*V_i - V_{i-1}."""
+    x, y = v, (v * v - 2) % n
+    for bit in bin(k)[3:]:
+        if bit == "1":
+            x, y = (x * y - v) % n, (y * y - 2) % n
+        else:
+            x, y = (x * x - 2) % n, (x * y - v) % n
+    return x
+
+
+def williams_pp1(n: int, bound: int = 1 << 16, seeds: tuple[int, ...] = (3, 5, 7)) -> int | None:
+    """Williams' p+1 method, for a prime factor p such that p+1 is `bound`-powersmooth.
+
+    A seed only works for about half of the primes, so several are tried.
+
+    Args:
+        n (int): A composite value.
+        bound (int, optional): The smoothness bound. Defaults to 2**16.
+        seeds (tuple[int, ...], optional): The starting values V_1. Defaults to (3, 5, 7).
+    Returns:
+        int | None: A non-trivial factor of n, or None if it was not found.
+    """
+    for seed in seeds:
+        v = gmpy2.mpz(seed)
+        for p in _primes(bound + 1):
+            v = _lucas_v(v, _prime_power(p, bound), n)
+        g = gmpy2.gcd(v - 2, n)
+        if 1 < g < n:
+            return int(g)
+    return None
+
+
+def _montgomery_add(p: tuple, q: tuple, d: tuple, n: gmpy2.mpz) -> tuple:
+    """P + Q on a Montgomery curve in XZ coordinates, given D = P - Q."""
+    u = (p[0] - p[1]) * (q[0] + q[1])
+    v = (p[0] + p[1]) * (q[0] - q[1])
+    return d[1] * (u + v) ** 2 % n, d[0] * (u - v) ** 2 % n
+
+
+def _montgomery_double(p: tuple, a24: gmpy2.mpz, n: gmpy2.mpz) -> tuple:
+    s = (p[0] + p[1]) ** 2 % n
+    d = (p[0] - p[1]) ** 2 % n
+    t = s - d
+    return s * d % n, t * (d + a24 * t) % n
+
+
+def _montgomery_ladder(k: int, p: tuple, a24: gmpy2.mpz, n: gmpy2.mpz) -> tuple:
+    r0, r1 = p, _montgomery_double(p, a24, n)
+    for bit in bin(k)[3:]:
+        if bit == "1":
+            r0, r1 = _montgomery_add(r1, r0, p, n), _montgomery_double(r1, a24, n)
+        else:
+            r0, r1 = _montgomery_double(r0, a24, n), _montgomery_add(r1, r0, p, n)
+    return r0
+
+
+def _ecm_curve(n: gmpy2.mpz, bound: int, bound2: int, sigma: int) -> int | None:
+    """Try one curve of Suyama's family. Returns a factor, or None (also when the curve only finds n)."""
+    u = (sigma * sigma - 5) % n
+    v = 4 * sigma % n
+    x, z = u**3 % n, v**3 % n
+    denominator = 4 * x * v % n
+    g = gmpy2.gcd(denominator, n)
+    if g != 1:
+        return int(g) if g != n else None
+    # (A + 2) / 4
+    a24 = (v - u) ** 3 * (3 * u + v) * gmpy2.invert(4 * denominator, n) % n
+
+    # stage 1
+    q = _montgomery_ladder(_powersmooth(bound), (x, z), a24, n)
+    g = gmpy2.gcd(q[1], n)
+    if g != 1:
+        return int(g) if g != n else None
+
+    # stage 2: every prime r in (bound, bound2] is reached as r = b + 2*delta from a point R = [b]Q
+    d = max(2, isqrt(bound2) // 2)
+    s = [None, _montgomery_double(q, a24, n)]
+    s.append(_montgomery_double(s[1], a24, n))
+    for i in range(3, d + 1):
+        s.append(_montgomery_add(s[i - 1], s[1], s[i - 2], n))
+    beta = [None] + [x * z % n for x, z in s[1:]]
+
+    b = bound - 1 | 1
+    while b <= 2 * d:
+        b += 2 * d
+    t = _montgomery_ladder(b - 2 * d, q, a24, n)
+    r = _montgomery_ladder(b, q, a24, n)
+    primes = _primes(bound2 + 1)
+    i = next((i for i, p in enumerate(primes) if p > b), len(primes))
+
+    acc = gmpy2.mpz(1)
+    while b < bound2 and i < len(primes):
+        alpha = r[0] * r[1] % n
+        while i < len(primes) and primes[i] <= b + 2 * d:
+            delta = (primes[i] - b) // 2
+            acc = acc * ((r[0] - s[delta][0]) * (r[1] + s[delta][1]) - alpha + beta[delta]) % n
+            i += 1
+        r, t = _montgomery_add(r, s[d], t, n), r
+        b += 2 * d
+
+    g = gmpy2.gcd(acc, n)
+    if 1 < g < n:
+        return int(g)
+    return None
+
+
+def ecm(n: int, bound: int = 2000, curves: int | None = 100, bound2: int | None = None, seed: int | None = None) -> int | None:
+    """Lenstra's elliptic curve method on Montgomery curves, with stage 2.
+
+    Args:
+        n (int): A composite value, which is not a prime power.
+        bound (int, optional): The stage 1 bound. Defaults to 2000.
+        curves (int, optional): The number of curves. Defaults to 100. None runs until a factor is found.
+        bound2 (int, optional): The stage 2 bound. Defaults to 100*bound.
+        seed (int, optional): The random seed.
+    Returns:
+        int | None: A non-trivial factor of n, or None if it was not found.
+    """
+    rng = random.Random(seed)
+    n_ = gmpy2.mpz(n)
+    bound2 = bound2 or 100 * bound
+    tried = 0
+    while curves is None or tried < curves:
+        if (g := _ecm_curve(n_, bound, bound2, rng.randrange(6, n - 1))) is not None:
+            return g
+        tried += 1
+    return None
+
+
+# The smoothness bounds of ECM for factors of about 20, 25, 30, 35 and 40 digits.
+ECM_BOUNDS: list[int] = [11000, 50000, 250000, 1000000, 3000000]
+
+
+def _split(n: int) -> int:
+    """A non-trivial factor of a composite n."""
+    root, exact = gmpy2.iroot(n, 2)
+    if exact:
+        return int(root)
+    if (d := pollard_rho_brent(n, iterations=1 << 16)) is not None:
+        return d
+    for bound in ECM_BOUNDS:
+        if (d := ecm(n, bound, curves=50)) is not None:
+            return d
+    return pollard_rho_brent(n)
+
+
+@lru_cache(maxsize=4096)
+def _factorize(n: int) -> tuple[tuple[int, int], ...]:
+    small, n = trial_division(n)
+    factors = Counter(small)
+
+    stack = [n] if n > 1 else []
+    while stack:
+        m = stack.pop()
+        if gmpy2.is_prime(m):
+            factors[m] += 1
+            continue
+        d = _split(m)
+        stack += [d, m // d]
+
+    return tuple(sorted(factors.items()))
+
+
+def factorize(n: int) -> dict[int, int]:
+    """Factorize n.
+
+    Results are cached, so factorizing the same value again is free.
+
+    Args:
+        n (int): The value.
+    Returns:
+        dict[int, int]: The prime factors and their multiplicities.
+    """
+    if n < 1:
+        raise ValueError("n must be positive.")
+    return dict(_factorize(n))
+
+
+def _run_method(args: tuple[Callable, int, dict]) -> int | None:
+    method, n, kwargs = args
+    return method(n, **kwargs)
+
+
+class FactorizationPipeline:
+    """Factorize a value by running methods from the cheapest to the most expensive.
+
+    The cheap stages (trial division, perfect powers, Fermat and short runs of rho and p-1)
+    run in this process. The expensive stages run on a pool of `workers` processes, each
+    stage for at most its time budget: ECM runs one independent sequence of curves per
+    worker with increasing bounds, p-1 and p+1 use one worker each. Every prime factor is
+    reported to `callback(p, k)` as soon as it is known, so a partial factorization is
+    kept when the budget runs out.
+
+    Args:
+        callback (Callable[[int, int], Any], optional): Called with each prime factor and its multiplicity.
+        workers (int, optional): The number of processes. Defaults to the number of CPUs.
+        budget (float, optional): The time budget of each expensive stage in seconds. Defaults to 30.0.
+    """
+
+    POLL_INTERVAL: float = 0.05
+
+    def __init__(self, callback: Callable[[int, int], object] | None = None, workers: int | None = None, budget: float = 30.0):
+        self.callback = callback
+        self.workers = workers or os.cpu_count() or 1
+        self.budget = budget
+        self.cheap_stages: list[tuple[str, Callable, dict]] = [
+            ("Fermat", fermat, {"iterations": 1 << 16}),
+            ("Pollard rho", pollard_rho_brent, {"iterations": 1 << 16}),
+            ("Pollard p-1", pollard_pm1, {"bound": 1 << 16}),
+        ]
+        self.expensive_stages: list[tuple[str, list[tuple[Callable, dict]]]] = [
+            ("p-1/p+1", [(pollard_pm1, {"bound": 1 << 22}), (williams_pp1, {"bound": 1 << 20})]),
+            ("ECM", [(self._ecm_worker, {"seed": i}) for i in range(self.workers)]),
+            ("Pollard rho", [(pollard_rho_brent, {"seed": i}) for i in range(self.workers)]),
+        ]
+
+    @staticmethod
+    def _ecm_worker(n: int, seed: int) -> int | None:
+        rng = random.Random(seed)
+        for bound in ECM_BOUNDS:
+            if (d := ecm(n, bound, curves=20 * ECM_BOUNDS.index(bound) + 20, seed=rng.getrandbits(64))) is not None:
+                return d
+        return ecm(n, ECM_BOUNDS[-1], curves=None, seed=rng.getrandbits(64))
+
+    def _race(self, n: int, tasks: list[tuple[Callable, dict]]) -> int | None:
+        deadline = time.monotonic() + self.budget
+        with multiprocessing.get_context("fork").Pool(min(self.workers, len(tasks))) as pool:
+            results = [pool.apply_async(_run_method, ((method, n, kwargs),)) for method, kwargs in tasks]
+            while time.monotonic() < deadline:
+                for result in results:
+                    if result.ready() and (d := result.get()) is not None:
+                        return d
+                if all(result.ready() for result in results):
+                    break
+                time.sleep(self.POLL_INTERVAL)
+        return None
+
+    def _found(self, factors: Counter, p: int, k: int = 1):
+        factors[p] += k
+        if self.callback:
+            self.callback(p, k)
+
+    def run(self, n: int) -> tuple[dict[int, int], list[int]]:
+        """Run the pipeline.
+
+        Args:
+            n (int): The value.
+        Returns:
+            tuple[dict[int, int], list[int]]: The prime factors found and the composite factors left.
+        """
+        factors: Counter = Counter()
+        small, n = trial_division(n)
+        for p, k in small.items():
+            self._found(factors, p, k)
+
+        composites = [n] if n > 1 else []
+        unsolved = []
+        while composites:
+            m = composites.pop()
+            if gmpy2.is_prime(m):
+                self._found(factors, m)
+                continue
+
+            root, k = m, 1
+            for e in _primes(m.bit_length() + 1):
+                r, exact = gmpy2.iroot(m, e)
+                if exact:
+                    root, k = int(r), e
+                    break
+            if k > 1:
+                composites += [root] * k
+                continue
+
+            d = None
+            for name, method, kwargs in self.cheap_stages:
+                if (d := method(m, **kwargs)) is not None:
+                    logger.info(f"{name} found a factor: {d}")
+                    break
+            else:
+                for name, tasks in self.expensive_stages:
+                    logger.info(f"Running {name} on a {m.bit_length()}-bit composite")
+                    if (d := self._race(m, tasks)) is not None:
+                        logger.info(f"{name} found a factor: {d}")
+                        break
+
+            if d is None:
+                unsolved.append(m)
+                continue
+            composites += [d, m // d]
+
+        return dict(factors), unsolved
+
+
+def batch_gcd(moduli: list[int]) -> list[int]:
+    """Batch GCD.
+
+    Compute gcd(n_i, prod_{j != i} n_j) for all the moduli at once with a product tree and
+    a remainder tree, which takes quasi-linear time instead of the quadratic pairwise gcd.
+
+    Args:
+        moduli (list[int]): The list of moduli.
+    Returns:
+        list[int]: The gcd for each modulus. 1 if it shares no factor with the others.
+    """
+    if len(moduli) < 2:
+        return [1] * len(moduli)
+
+    tree = product_tree(moduli)
+    rems = remainder_tree(tree[-1][0], tree, square=True)
+    gcds = [int(gmpy2.gcd(r // n, n)) for r, n in zip(rems, tree[0])]
+
+    # Both of the factors are shared (or the modulus is duplicated), so split it with pairwise gcd.
+    for i, n in enumerate(moduli):
+        if gcds[i] != n:
+            continue
+        for j, m in enumerate(moduli):
+            g = gmpy2.gcd(n, m)
+            if i != j and 1 < g < n:
+                gcds[i] = int(g)
+                break
+    return gcds
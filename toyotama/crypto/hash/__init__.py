@@ -0,0 +1,5 @@
+from .base import MerkleDamgardHash
+from .md5 import MD5
+from .sha1 import SHA1
+from .sha256 import SHA256
+from .sha512 import SHA512
@@ -0,0 +1,123 @@
+import struct
+from abc import ABCMeta, abstractmethod
+from collections.abc import Iterable
+from typing import Literal
+
+
+class MerkleDamgardHash(metaclass=ABCMeta):
+    """Streaming base of the Merkle-Damgard hash functions.
+
+    A subclass defines the parameters below and the compression function, which takes
+    the chaining value as a list of words and consecutive blocks, and returns the new chaining value.
+    Both the state and the compression function are public, so a hash can be resumed from
+    a digest (length extension) or from any intermediate state.
+    """
+
+    BLOCK_SIZE: int = 64
+    DIGEST_SIZE: int
+    # The struct format of the state, e.g. ">8L"
+    STATE_FORMAT: str
+    LENGTH_SIZE: int = 8
+    BYTEORDER: Literal["big", "little"] = "big"
+    INITIAL_VECTOR: list[int]
+
+    def __init__(self, data: bytes = b"", iv: list[int] | None = None, input_bytes: int = 0):
+        """
+        Args:
+            data (bytes, optional): The first data. Defaults to b"".
+            iv (list[int] | None, optional): The state to resume from. Defaults to the initial vector.
+            input_bytes (int, optional): The number of bytes already hashed into `iv`. Defaults to 0.
+        """
+        self.state: list[int] = list(iv or self.INITIAL_VECTOR)
+        self.length: int = input_bytes
+        self.buffer: bytes = b""
+        self.update(data)
+
+    @classmethod
+    @abstractmethod
+    def compress(cls, state: list[int], blocks: bytes) -> list[int]:
+        """The compression function over consecutive blocks.
+
+        Args:
+            state (list[int]): The chaining value.
+            blocks (bytes): The blocks, whose length is a multiple of BLOCK_SIZE.
+        Returns:
+            list[int]: The new chaining value.
+        """
+        ...
+
+    @classmethod
+    def from_digest(cls, digest: bytes, input_bytes: int) -> "MerkleDamgardHash":
+        """Resume from a digest of a message whose padded length is `input_bytes`."""
+        return cls(iv=list(struct.unpack(cls.STATE_FORMAT, digest)), input_bytes=input_bytes)
+
+    @classmethod
+    def padding(cls, length: int) -> bytes:
+        """The padding appended to a message of `length` bytes."""
+        zeros = -(length + 1 + cls.LENGTH_SIZE) % cls.BLOCK_SIZE
+        return b"\x80" + bytes(zeros) + (length * 8).to_bytes(cls.LENGTH_SIZE, cls.BYTEORDER)
+
+    def update(self, data: bytes) -> None:
+        self.length += len(data)
+        data = self.buffer + data
+        end = len(data) - len(data) % self.BLOCK_SIZE
+        if end:
+            self.state = self.compress(self.state, data[:end])
+        self.buffer = data[end:]
+
+    def copy(self) -> "MerkleDamgardHash":
+        h = object.__new__(type(self))
+        h.state, h.length, h.buffer = list(self.state), self.length, self.buffer
+        return h
+
+    def digest(self) -> bytes:
+        state = self.compress(self.state, self.buffer + self.padding(self.length))
+        return struct.pack(self.STATE_FORMAT, *state)[: self.DIGEST_SIZE]
+
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+    @classmethod
+    def length_extension(cls, digest: bytes, orig_len: int, suffix: bytes) -> tuple[bytes, bytes]:
+        """Length extension attack.
+
+        Given H(m) and len(m), compute H(m || padding || suffix) without knowing m.
+
+        Args:
+            digest (bytes): The digest of the original message, which usually starts with a secret.
+            orig_len (int): The length of the original message.
+            suffix (bytes): The data to append.
+        Returns:
+            tuple[bytes, bytes]: The new digest and the data (padding || suffix) to append to the original message.
+        """
+        glue = cls.padding(orig_len)
+        h = cls.from_digest(digest, orig_len + len(glue))
+        h.update(suffix)
+        return h.digest(), glue + suffix
+
+    @classmethod
+    def length_extension_batch(cls, digest: bytes, message: bytes, suffix: bytes, secret_lengths: Iterable[int]) -> list[tuple[int, bytes, bytes]]:
+        """Length extension attack on H(secret || message) for unknown secret lengths.
+
+        The compression of the full blocks of the suffix does not depend on the length,
+        so it is done once and only the last blocks are hashed for each candidate.
+
+        Args:
+            digest (bytes): The digest of secret || message.
+            message (bytes): The known part of the original message.
+            suffix (bytes): The data to append.
+            secret_lengths (Iterable[int]): The candidates of the secret length.
+        Returns:
+            list[tuple[int, bytes, bytes]]: (secret length, new digest, message || padding || suffix) for each candidate.
+        """
+        base = cls.from_digest(digest, 0)
+        base.update(suffix)
+
+        result = []
+        for secret_len in secret_lengths:
+            orig_len = secret_len + len(message)
+            glue = cls.padding(orig_len)
+            h = base.copy()
+            h.length += orig_len + len(glue)
+            result.append((secret_len, h.digest(), message + glue + suffix))
+        return result
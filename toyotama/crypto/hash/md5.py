@@ -0,0 +1,71 @@
+import struct
+from math import floor, sin
+from typing import Literal
+
+from .base import MerkleDamgardHash
+
+
+class MD5(MerkleDamgardHash):
+    BLOCK_SIZE: int = 64
+    DIGEST_SIZE: int = 16
+    STATE_FORMAT: str = "<4L"
+    BYTEORDER: Literal["big", "little"] = "little"
+    MASK: int = (1 << 32) - 1
+    ROUND_CONSTANTS: list[int] = [floor(abs(sin(i + 1)) * (1 << 32)) for i in range(64)]
+    # The index of the message word used in each round
+    MESSAGE_INDEX: list[int] = (
+        [i for i in range(16)] + [(5 * i + 1) % 16 for i in range(16)] + [(3 * i + 5) % 16 for i in range(16)] + [7 * i % 16 for i in range(16)]
+    )
+    INITIAL_VECTOR: list[int] = [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476]
+
+    @classmethod
+    def compress(cls, state: list[int], blocks: bytes) -> list[int]:
+        mask, k, g = cls.MASK, cls.ROUND_CONSTANTS, cls.MESSAGE_INDEX
+        h0, h1, h2, h3 = state
+
+        for offset in range(0, len(blocks), cls.BLOCK_SIZE):
+            x = struct.unpack_from("<16L", blocks, offset)
+            kx = [k[i] + x[g[i]] for i in range(64)]
+
+            # four rounds per iteration, renaming the variables instead of shifting them
+            a, b, c, d = h0, h1, h2, h3
+            for i in range(0, 16, 4):
+                t = (a + (d ^ (b & (c ^ d))) + kx[i + 0]) & mask
+                a = (b + (t << 7 | t >> 25)) & mask
+                t = (d + (c ^ (a & (b ^ c))) + kx[i + 1]) & mask
+                d = (a + (t << 12 | t >> 20)) & mask
+                t = (c + (b ^ (d & (a ^ b))) + kx[i + 2]) & mask
+                c = (d + (t << 17 | t >> 15)) & mask
+                t = (b + (a ^ (c & (d ^ a))) + kx[i + 3]) & mask
+                b = (c + (t << 22 | t >> 10)) & mask
+            for i in range(16, 32, 4):
+                t = (a + (c ^ (d & (b ^ c))) + kx[i + 0]) & mask
+                a = (b + (t << 5 | t >> 27)) & mask
+                t = (d + (b ^ (c & (a ^ b))) + kx[i + 1]) & mask
+                d = (a + (t << 9 | t >> 23)) & mask
+                t = (c + (a ^ (b & (d ^ a))) + kx[i + 2]) & mask
+                c = (d + (t << 14 | t >> 18)) & mask
+                t = (b + (d ^ (a & (c ^ d))) + kx[i + 3]) & mask
+                b = (c + (t << 20 | t >> 12)) & mask
+            for i in range(32, 48, 4):
+                t = (a + (b ^ c ^ d) + kx[i + 0]) & mask
+                a = (b + (t << 4 | t >> 28)) & mask
+                t = (d + (a ^ b ^ c) + kx[i + 1]) & mask
+                d = (a + (t << 11 | t >> 21)) & mask
+                t = (c + (d ^ a ^ b) + kx[i + 2]) & mask
+                c = (d + (t << 16 | t >> 16)) & mask
+                t = (b + (c ^ d ^ a) + kx[i + 3]) & mask
+                b = (c + (t << 23 | t >> 9)) & mask
+            for i in range(48, 64, 4):
+                t = (a + (c ^ (b | (d ^ mask))) + kx[i + 0]) & mask
+                a = (b + (t << 6 | t >> 26)) & mask
+                t = (d + (b ^ (a | (c ^ mask))) + kx[i + 1]) & mask
+                d = (a + (t << 10 | t >> 22)) & mask
+                t = (c + (a ^ (d | (b ^ mask))) + kx[i + 2]) & mask
+                c = (d + (t << 15 | t >> 17)) & mask
+                t = (b + (d ^ (c | (a ^ mask))) + kx[i + 3]) & mask
+                b = (c + (t << 21 | t >> 11)) & mask
+
+            h0, h1, h2, h3 = (h0 + a) & mask, (h1 + b) & mask, (h2 + c) & mask, (h3 + d) & mask
+
+        return [h0, h1, h2, h3]
@@ -0,0 +1,75 @@
+import struct
+
+from .base import MerkleDamgardHash
+
+
+class SHA1(MerkleDamgardHash):
+    BLOCK_SIZE: int = 64
+    DIGEST_SIZE: int = 20
+    STATE_FORMAT: str = ">5L"
+    MASK: int = (1 << 32) - 1
+    ROUND_CONSTANTS: list[int] = [0x5A827999, 0x6ED9EBA1, 0x8F1BBCDC, 0xCA62C1D6]
+    INITIAL_VECTOR: list[int] = [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0]
+
+    @classmethod
+    def compress(cls, state: list[int], blocks: bytes) -> list[int]:
+        mask = cls.MASK
+        k0, k1, k2, k3 = cls.ROUND_CONSTANTS
+        h0, h1, h2, h3, h4 = state
+
+        for offset in range(0, len(blocks), cls.BLOCK_SIZE):
+            w = list(struct.unpack_from(">16L", blocks, offset))
+            for i in range(16, 80):
+                x = w[i - 3] ^ w[i - 8] ^ w[i - 14] ^ w[i - 16]
+                w.append((x << 1 | x >> 31) & mask)
+
+            # five rounds per iteration, renaming the variables instead of shifting them
+            a, b, c, d, e = h0, h1, h2, h3, h4
+            for i in range(0, 20, 5):
+                e = (e + (a << 5 | a >> 27) + (d ^ (b & (c ^ d))) + k0 + w[i + 0]) & mask
+                b = (b << 30 | b >> 2) & mask
+                d = (d + (e << 5 | e >> 27) + (c ^ (a & (b ^ c))) + k0 + w[i + 1]) & mask
+                a = (a << 30 | a >> 2) & mask
+                c = (c + (d << 5 | d >> 27) + (b ^ (e & (a ^ b))) + k0 + w[i + 2]) & mask
+                e = (e << 30 | e >> 2) & mask
+                b = (b + (c << 5 | c >> 27) + (a ^ (d & (e ^ a))) + k0 + w[i + 3]) & mask
+                d = (d << 30 | d >> 2) & mask
+                a = (a + (b << 5 | b >> 27) + (e ^ (c & (d ^ e))) + k0 + w[i + 4]) & mask
+                c = (c << 30 | c >> 2) & mask
+            for i in range(20, 40, 5):
+                e = (e + (a << 5 | a >> 27) + (b ^ c ^ d) + k1 + w[i + 0]) & mask
+                b = (b << 30 | b >> 2) & mask
+                d = (d + (e << 5 | e >> 27) + (a ^ b ^ c) + k1 + w[i + 1]) & mask
+                a = (a << 30 | a >> 2) & mask
+                c = (c + (d << 5 | d >> 27) + (e ^ a ^ b) + k1 + w[i + 2]) & mask
+                e = (e << 30 | e >> 2) & mask
+                b = (b + (c << 5 | c >> 27) + (d ^ e ^ a) + k1 + w[i + 3]) & mask
+                d = (d << 30 | d >> 2) & mask
+                a = (a + (b << 5 | b >> 27) + (c ^ d ^ e) + k1 + w[i + 4]) & mask
+                c = (c << 30 | c >> 2) & mask
+            for i in range(40, 60, 5):
+                e = (e + (a << 5 | a >> 27) + ((b & c) | (d & (b | c))) + k2 + w[i + 0]) & mask
+                b = (b << 30 | b >> 2) & mask
+                d = (d + (e << 5 | e >> 27) + ((a & b) | (c & (a | b))) + k2 + w[i + 1]) & mask
+                a = (a << 30 | a >> 2) & mask
+                c = (c + (d << 5 | d >> 27) + ((e & a) | (b & (e | a))) + k2 + w[i + 2]) & mask
+                e = (e << 30 | e >> 2) & mask
+                b = (b + (c << 5 | c >> 27) + ((d & e) | (a & (d | e))) + k2 + w[i + 3]) & mask
+                d = (d << 30 | d >> 2) & mask
+                a = (a + (b << 5 | b >> 27) + ((c & d) | (e & (c | d))) + k2 + w[i + 4]) & mask
+                c = (c << 30 | c >> 2) & mask
+            for i in range(60, 80, 5):
+                e = (e + (a << 5 | a >> 27) + (b ^ c ^ d) + k3 + w[i + 0]) & mask
+                b = (b << 30 | b >> 2) & mask
+                d = (d + (e << 5 | e >> 27) + (a ^ b ^ c) + k3 + w[i + 1]) & mask
+                a = (a << 30 | a >> 2) & mask
+                c = (c + (d << 5 | d >> 27) + (e ^ a ^ b) + k3 + w[i + 2]) & mask
+                e = (e << 30 | e >> 2) & mask
+                b = (b + (c << 5 | c >> 27) + (d ^ e ^ a) + k3 + w[i + 3]) & mask
+                d = (d << 30 | d >> 2) & mask
+                a = (a + (b << 5 | b >> 27) + (c ^ d ^ e) + k3 + w[i + 4]) & mask
+                c = (c << 30 | c >> 2) & mask
+
+            h0, h1, h2, h3, h4 = (h0 + a) & mask, (h1 + b) & mask, (h2 + c) & mask, (h3 + d) & mask, (h4 + e) & mask
+
+        return [h0, h1, h2, h3, h4]
@@ -4,66 +4,71 @@ import struct
 
 from toyotama.util.log import get_logger
 
+from .base import MerkleDamgardHash
+
 logger = get_logger(__name__)
 
 
-class SHA256(object):
+class SHA256(MerkleDamgardHash):
     BLOCK_SIZE: int = 64
-    MOD: int = 1 << 32
+    DIGEST_SIZE: int = 32
+    STATE_FORMAT: str = ">8L"
+    MASK: int = (1 << 32) - 1
     # fmt: off
     ROUND_CONSTANTS: list[int] = [0x428A2F98, 0x71374491, 0xB5C0FBCF, 0xE9B5DBA5, 0x3956C25B, 0x59F111F1, 0x923F82A4, 0xAB1C5ED5, 0xD807AA98, 0x12835B01, 0x243185BE, 0x550C7DC3, 0x72BE5D74, 0x80DEB1FE, 0x9BDC06A7, 0xC19BF174, 0xE49B69C1, 0xEFBE4786, 0x0FC19DC6, 0x240CA1CC, 0x2DE92C6F, 0x4A7484AA, 0x5CB0A9DC, 0x76F988DA, 0x983E5152, 0xA831C66D, 0xB00327C8, 0xBF597FC7, 0xC6E00BF3, 0xD5A79147, 0x06CA6351, 0x14292967, 0x27B70A85, 0x2E1B2138, 0x4D2C6DFC, 0x53380D13, 0x650A7354, 0x766A0ABB, 0x81C2C92E, 0x92722C85, 0xA2BFE8A1, 0xA81A664B, 0xC24B8B70, 0xC76C51A3, 0xD192E819, 0xD6990624, 0xF40E3585, 0x106AA070, 0x19A4C116, 0x1E376C08, 0x2748774C, 0x34B0BCB5, 0x391C0CB3, 0x4ED8AA4A, 0x5B9CCA4F, 0x682E6FF3, 0x748F82EE, 0x78A5636F, 0x84C87814, 0x8CC70208, 0x90BEFFFA, 0xA4506CEB, 0xBEF9A3F7, 0xC67178F2]
     INITIAL_VECTOR: list[int] = [0x6A09E667, 0xBB67AE85, 0x3C6EF372, 0xA54FF53A, 0x510E527F, 0x9B05688C, 0x1F83D9AB, 0x5BE0CD19]
     # fmt: on
 
-    def __init__(self, data: bytes, iv: list[int] | None = None, input_bytes: int = 0):
-        self.data: bytes = data
-        self.hashes: list[int] = iv or self.INITIAL_VECTOR
-
-        self.preprocessed_data: bytes = self._pad_data(self.data, input_bytes)
-        self._compute_hash()
-
-    def _pad_data(self, data: bytes, input_bytes: int) -> bytes:
-        pad = b"\x80" + bytes(63 - (len(data) + input_bytes + 8) % self.BLOCK_SIZE)
-        length = struct.pack(">Q", ((len(data) + input_bytes) * 8))  # 64bit-big
-        return data + pad + length
-
-    def _compute_hash(self) -> None:
-        self.blocks = [self.preprocessed_data[i : i + self.BLOCK_SIZE] for i in range(0, len(self.preprocessed_data), self.BLOCK_SIZE)]
-
-        for block in self.blocks:
-            words = list(struct.unpack(">16L", block))
-            words += [0] * 48
-
-            a, b, c, d, e, f, g, h = self.hashes
-
-            for i in range(64):
-                if i >= 16:
-                    s0 = self.ror(words[i - 15], 7) ^ self.ror(words[i - 15], 18) ^ (words[i - 15] >> 3)
-                    s1 = self.ror(words[i - 2], 17) ^ self.ror(words[i - 2], 19) ^ (words[i - 2] >> 10)
-
-                    words[i] = (words[i - 16] + s0 + words[i - 7] + s1) % self.MOD
-
-                s1 = self.ror(e, 6) ^ self.ror(e, 11) ^ self.ror(e, 25)
-                ch = (e & f) ^ (~e % self.MOD) & g
-                temp1 = (h + s1 + ch + self.ROUND_CONSTANTS[i] + words[i]) % self.MOD
-                s0 = self.ror(a, 2) ^ self.ror(a, 13) ^ self.ror(a, 22)
-                maj = (a & b) ^ (b & c) ^ (c & a)
-                temp2 = (s0 + maj) % self.MOD
-
-                a, b, c, d, e, f, g, h = (temp1 + temp2) % self.MOD, a, b, c, (d + temp1) % self.MOD, e, f, g
-            mutated_hash_values = [a, b, c, d, e, f, g, h]
-            self.hashes = [(x + mutated_hash_values[i]) % self.MOD for i, x in enumerate(self.hashes)]
-
-        self.hash = b"".join(x.to_bytes(4, "big") for x in self.hashes)
-
-    def ror(self, x: int, n: int) -> int:
-        return (x << (32 - n)) | (x >> n) % self.MOD
-
-    def digest(self) -> bytes:
-        return self.hash
-
-    def hexdigest(self) -> str:
-        return self.hash.hex()
+    @classmethod
+    def compress(cls, state: list[int], blocks: bytes) -> list[int]:
+        mask, k = cls.MASK, cls.ROUND_CONSTANTS
+        h0, h1, h2, h3, h4, h5, h6, h7 = state
+
+        for offset in range(0, len(blocks), cls.BLOCK_SIZE):
+            w = list(struct.unpack_from(">16L", blocks, offset))
+            for i in range(16, 64):
+                x, y = w[i - 15], w[i - 2]
+                s0 = (x >> 7 | x << 25) ^ (x >> 18 | x << 14) ^ (x >> 3)
+                s1 = (y >> 17 | y << 15) ^ (y >> 19 | y << 13) ^ (y >> 10)
+                w.append((w[i - 16] + s0 + w[i - 7] + s1) & mask)
+            kw = [x + y for x, y in zip(k, w)]
+
+            # eight rounds per iteration, renaming the variables instead of shifting them
+            a, b, c, d, e, f, g, h = h0, h1, h2, h3, h4, h5, h6, h7
+            for i in range(0, 64, 8):
+                t = h + (((e >> 6 | e << 26) ^ (e >> 11 | e << 21) ^ (e >> 25 | e << 7)) & mask) + (g ^ (e & (f ^ g))) + kw[i + 0]
+                d = (d + t) & mask
+                h = (t + (((a >> 2 | a << 30) ^ (a >> 13 | a << 19) ^ (a >> 22 | a << 10)) & mask) + ((a & b) | (c & (a | b)))) & mask
+                t = g + (((d >> 6 | d << 26) ^ (d >> 11 | d << 21) ^ (d >> 25 | d << 7)) & mask) + (f ^ (d & (e ^ f))) + kw[i + 1]
+                c = (c + t) & mask
+                g = (t + (((h >> 2 | h << 30) ^ (h >> 13 | h << 19) ^ (h >> 22 | h << 10)) & mask) + ((h & a) | (b & (h | a)))) & mask
+                t = f + (((c >> 6 | c << 26) ^ (c >> 11 | c << 21) ^ (c >> 25 | c << 7)) & mask) + (e ^ (c & (d ^ e))) + kw[i + 2]
+                b = (b + t) & mask
+                f = (t + (((g >> 2 | g << 30) ^ (g >> 13 | g << 19) ^ (g >> 22 | g << 10)) & mask) + ((g & h) | (a & (g | h)))) & mask
+                t = e + (((b >> 6 | b << 26) ^ (b >> 11 | b << 21) ^ (b >> 25 | b << 7)) & mask) + (d ^ (b & (c ^ d))) + kw[i + 3]
+                a = (a + t) & mask
+                e = (t + (((f >> 2 | f << 30) ^ (f >> 13 | f << 19) ^ (f >> 22 | f << 10)) & mask) + ((f & g) | (h & (f | g)))) & mask
+                t = d + (((a >> 6 | a << 26) ^ (a >> 11 | a << 21) ^ (a >> 25 | a << 7)) & mask) + (c ^ (a & (b ^ c))) + kw[i + 4]
+                h = (h + t) & mask
+                d = (t + (((e >> 2 | e << 30) ^ (e >> 13 | e << 19) ^ (e >> 22 | e << 10)) & mask) + ((e & f) | (g & (e | f)))) & mask
+                t = c + (((h >> 6 | h << 26) ^ (h >> 11 | h << 21) ^ (h >> 25 | h << 7)) & mask) + (b ^ (h & (a ^ b))) + kw[i + 5]
+                g = (g + t) & mask
+                c = (t + (((d >> 2 | d << 30) ^ (d >> 13 | d << 19) ^ (d >> 22 | d << 10)) & mask) + ((d & e) | (f & (d | e)))) & mask
+                t = b + (((g >> 6 | g << 26) ^ (g >> 11 | g << 21) ^ (g >> 25 | g << 7)) & mask) + (a ^ (g & (h ^ a))) + kw[i + 6]
+                f = (f + t) & mask
+                b = (t + (((c >> 2 | c << 30) ^ (c >> 13 | c << 19) ^ (c >> 22 | c << 10)) & mask) + ((c & d) | (e & (c | d)))) & mask
+                t = a + (((f >> 6 | f << 26) ^ (f >> 11 | f << 21) ^ (f >> 25 | f << 7)) & mask) + (h ^ (f & (g ^ h))) + kw[i + 7]
+                e = (e + t) & mask
+                a = (t + (((b >> 2 | b << 30) ^ (b >> 13 | b << 19) ^ (b >> 22 | b << 10)) & mask) + ((b & c) | (d & (b | c)))) & mask
+
+            h0, h1, h2, h3 = (h0 + a) & mask, (h1 + b) & mask, (h2 + c) & mask, (h3 + d) & mask
+            h4, h5, h6, h7 = (h4 + e) & mask, (h5 + f) & mask, (h6 + g) & mask, (h7 + h) & mask
+
+        return [h0, h1, h2, h3, h4, h5, h6, h7]
+
+
+length_extension = SHA256.length_extension
+length_extension_batch = SHA256.length_extension_batch
 
 
 if __name__ == "__main__":
@@ -0,0 +1,394 @@
+"""Lattice reduction
+
+The basis is a list of row vectors. The rows are kept as lists of gmpy2.mpz together with their exact
+Gram matrix, and the Gram-Schmidt coefficients are computed in floating point: Python floats when the
+entries are small enough, or gmpy2.mpfr (a double with a wide exponent, as fplll's dpe) otherwise.
+When the floating point reduction fails, the exact integer LLL takes over.
+"""
+from collections.abc import Callable, Sequence
+from fractions import Fraction
+from operator import mul
+from typing import Any
+
+import gmpy2
+
+from ..util.log import get_logger
+
+logger = get_logger()
+
+# the size reduction parameter of the floating point LLL
+LLL_ETA: float = 0.51
+# Python floats are used while the Gram matrix fits in this many bits.
+FLOAT_GRAM_BITS: int = 1000
+BKZ_BLOCK_SIZE: int = 10
+BKZ_MAX_TOURS: int = 8
+
+
+class _PrecisionError(Exception):
+    pass
+
+
+def _lll_exact(b: list[list[int]], delta: Fraction) -> list[list[int]]:
+    """LLL reduction in exact integer arithmetic.
+
+    The Gram-Schmidt coefficients are kept as integers scaled by the Gram determinants d_i
+    (Cohen, Algorithm 2.6.7), so no rational number appears.
+    """
+    p, q = delta.numerator, delta.denominator
+    n = len(b)
+    if n < 2:
+        return b
+
+    # d[i + 1] = prod_{j <= i} |b*_j|^2, lam[i][j] = d[j + 1] * mu_{i,j}
+    d = [gmpy2.mpz(1)] + [gmpy2.mpz(0)] * n
+    lam = [[gmpy2.mpz(0)] * n for _ in range(n)]
+
+    def gram_schmidt(k: int):
+        for j in range(k + 1):
+            u = sum(map(mul, b[k], b[j]))
+            for i in range(j):
+                u = (d[i + 1] * u - lam[k][i] * lam[j][i]) // d[i]
+            if j < k:
+                lam[k][j] = u
+            else:
+                d[k + 1] = u
+        assert d[k + 1] != 0, "The basis must be linearly independent."
+
+    def reduce(k: int, l: int):
+        if 2 * abs(lam[k][l]) > d[l + 1]:
+            r = (2 * lam[k][l] + d[l + 1]) // (2 * d[l + 1])
+            b[k] = [x - r * y for x, y in zip(b[k], b[l])]
+            lam[k][l] -= r * d[l + 1]
+            for i in range(l):
+                lam[k][i] -= r * lam[l][i]
+
+    def swap(k: int, kmax: int):
+        b[k], b[k - 1] = b[k - 1], b[k]
+        for j in range(k - 1):
+            lam[k][j], lam[k - 1][j] = lam[k - 1][j], lam[k][j]
+        mu = lam[k][k - 1]
+        B = (d[k - 1] * d[k + 1] + mu * mu) // d[k]
+        for i in range(k + 1, kmax + 1):
+            t = lam[i][k]
+            lam[i][k] = (d[k + 1] * lam[i][k - 1] - mu * t) // d[k]
+            lam[i][k - 1] = (B * t + mu * lam[i][k]) // d[k + 1]
+        d[k] = B
+
+    gram_schmidt(0)
+    k, kmax = 1, 0
+    while k < n:
+        if k > kmax:
+            kmax = k
+            gram_schmidt(k)
+        reduce(k, k - 1)
+        if q * d[k + 1] * d[k - 1] < p * d[k] * d[k] - q * lam[k][k - 1] ** 2:
+            swap(k, kmax)
+            k = max(1, k - 1)
+        else:
+            for l in reversed(range(k - 1)):
+                reduce(k, l)
+            k += 1
+
+    return b
+
+
+def _gram(b: list[list[Any]]) -> list[list[Any]]:
+    n = len(b)
+    G = [[gmpy2.mpz(0)] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1):
+            G[i][j] = G[j][i] = sum(map(mul, b[i], b[j]), gmpy2.mpz(0))
+    return G
+
+
+def _float_type(G: list[list[Any]]) -> tuple[Callable, int]:
+    """The floating point type for the Gram-Schmidt coefficients and its precision."""
+    bits = max((abs(x).bit_length() for row in G for x in row), default=0)
+    if bits < FLOAT_GRAM_BITS:
+        return float, 53
+    return gmpy2.mpfr, max(53, 2 * len(G))
+
+
+def _gram_schmidt_row(k: int, G: list[list[Any]], mu: list[list[Any]], R: list[list[Any]], F: Callable) -> None:
+    """Compute mu[k] and R[k] (r_kj = <b_k, b*_j>, r_kk = |b*_k|^2) from the rows above."""
+    Gk, Rk, muk = G[k], R[k], mu[k]
+    for j in range(k):
+        Rk[j] = F(Gk[j]) - sum(map(mul, mu[j][:j], Rk[:j]))
+        muk[j] = Rk[j] / R[j][j]
+    Rk[k] = F(Gk[k]) - sum(map(mul, muk[:k], Rk[:k]))
+
+
+def _lll_fp(b: list[list[Any]], delta: float, F: Callable) -> list[list[Any]]:
+    """Schnorr-Euchner floating point LLL on the exact Gram matrix.
+
+    The zero vectors coming from a linearly dependent input are removed.
+    """
+    G = _gram(b)
+    n = len(b)
+    mu = [[F(0)] * n for _ in range(n)]
+    R = [[F(0)] * n for _ in range(n)]
+    if n == 0:
+        return b
+    R[0][0] = F(G[0][0])
+    bits = max(x.bit_length() for row in G for x in row)
+    limit = (1000 + bits) * n * n
+
+    k = 1
+    while k < n:
+        limit -= 1
+        if limit < 0:
+            raise _PrecisionError("Too many iterations.")
+
+        # size reduction, with recomputation as long as the coefficients are not small
+        for _ in range(16 + bits // 16):
+            _gram_schmidt_row(k, G, mu, R, F)
+            if all(abs(x) <= LLL_ETA for x in mu[k][:k]):
+                break
+            bk, Gk = b[k], G[k]
+            for j in reversed(range(k)):
+                x = round(mu[k][j])
+                if not x:
+                    continue
+                x, xf = gmpy2.mpz(x), F(x)
+                bj, Gj = b[j], G[j]
+                Gk[k] += x * x * Gj[j] - 2 * x * Gk[j]
+                for i in range(n):
+                    if i != k:
+                        Gk[i] -= x * Gj[i]
+                        G[i][k] = Gk[i]
+                b[k] = bk = [u - x * v for u, v in zip(bk, bj)]
+                for i in range(j):
+                    mu[k][i] -= xf * mu[j][i]
+                mu[k][j] -= xf
+        else:
+            raise _PrecisionError("The size reduction does not converge.")
+
+        if G[k][k] == 0:
+            # a linear dependency
+            for row in G:
+                del row[k]
+            del b[k], G[k], mu[k], R[k]
+            n -= 1
+            continue
+
+        if R[k][k] < 0:
+            raise _PrecisionError("A negative squared norm.")
+        if delta * R[k - 1][k - 1] > R[k][k] + mu[k][k - 1] ** 2 * R[k - 1][k - 1]:
+            b[k], b[k - 1] = b[k - 1], b[k]
+            G[k], G[k - 1] = G[k - 1], G[k]
+            for row in G:
+                row[k], row[k - 1] = row[k - 1], row[k]
+            if k == 1:
+                R[0][0] = F(G[0][0])
+            k = max(1, k - 1)
+        else:
+            k += 1
+
+    return b
+
+
+def _is_reduced(b: list[list[Any]], delta: float, F: Callable) -> bool:
+    """Check the LLL conditions in floating point with a little slack."""
+    n = len(b)
+    G = _gram(b)
+    mu = [[F(0)] * n for _ in range(n)]
+    R = [[F(0)] * n for _ in range(n)]
+    for k in range(n):
+        _gram_schmidt_row(k, G, mu, R, F)
+        if R[k][k] <= 0 or any(abs(x) > LLL_ETA + 0.01 for x in mu[k][:k]):
+            return False
+        if k and (delta - 0.01) * R[k - 1][k - 1] > R[k][k] + mu[k][k - 1] ** 2 * R[k - 1][k - 1]:
+            return False
+    return True
+
+
+def lll(
+    basis: Sequence[Sequence[int]],
+    delta: float | Fraction = Fraction(99, 100),
+    exact: bool = False,
+    precision: int | None = None,
+) -> list[list[int]]:
+    """LLL reduction.
+
+    The floating point (Schnorr-Euchner) reduction is tried first, and the result is checked.
+    If it fails for lack of precision, the exact integer reduction is done instead.
+    Bases of a wide dynamic range such as Coppersmith's need a precision about the size of the entries,
+    which is still much faster than the exact reduction.
+
+    Args:
+        basis (Sequence[Sequence[int]]): The row vectors.
+        delta (float | Fraction, optional): The Lovasz parameter in (1/4, 1). Defaults to 99/100.
+        exact (bool, optional): Whether to use the exact integer reduction only. Defaults to False.
+        precision (int | None, optional): The precision of gmpy2.mpfr in the floating point reduction. Defaults to the one for the size of the basis.
+    Returns:
+        list[list[int]]: The reduced basis. The zero vectors of a linearly dependent input are removed,
+        except in the exact reduction, which requires linearly independent vectors.
+    """
+    b = [[gmpy2.mpz(x) for x in row] for row in basis]
+    delta = Fraction(delta).limit_denominator(1 << 20)
+
+    if not exact:
+        F, default_precision = _float_type(_gram(b))
+        if precision is None:
+            precision = default_precision
+        else:
+            F = gmpy2.mpfr
+        try:
+            with gmpy2.context(precision=precision):
+                reduced = _lll_fp([list(row) for row in b], float(delta), F)
+                if _is_reduced(reduced, float(delta), F):
+                    return [[int(x) for x in row] for row in reduced]
+            logger.debug("The floating point LLL gave a non-reduced basis.")
+        except (_PrecisionError, ZeroDivisionError, OverflowError) as e:
+            logger.debug(f"The floating point LLL failed: {e}")
+
+    return [[int(x) for x in row] for row in _lll_exact(b, delta)]
+
+
+def _enumerate(mu: list[list[Any]], r: list[Any], bound: Any) -> list[int] | None:
+    """Schnorr-Euchner enumeration of the shortest nonzero vector shorter than the bound.
+
+    Args:
+        mu (list[list[Any]]): The Gram-Schmidt coefficients of the block.
+        r (list[Any]): The squared norms of the Gram-Schmidt vectors of the block.
+        bound (Any): The squared norm bound.
+    Returns:
+        list[int] | None: The coefficients of the shortest vector, or None if there is no vector shorter than the bound.
+    """
+    n = len(r)
+    sigma = [[0.0] * n for _ in range(n + 1)]
+    # the highest index from which sigma[.][k] has to be updated
+    last = list(range(n + 1))
+    rho = [0.0] * (n + 1)
+    v = [0] * n
+    v[0] = 1
+    c = [0.0] * n
+    w = [0] * n
+    last_nonzero = 0
+    best = None
+
+    k = 0
+    while True:
+        diff = v[k] - c[k]
+        rho[k] = rho[k + 1] + diff * diff * r[k]
+        if rho[k] < bound and k > 0:
+            k -= 1
+            last[k] = max(last[k], last[k + 1])
+            for i in range(last[k + 1], k, -1):
+                sigma[i][k] = sigma[i + 1][k] + v[i] * mu[i][k]
+            c[k] = -sigma[k + 1][k]
+            v[k] = round(c[k])
+            w[k] = 1
+            continue
+
+        if rho[k] < bound:
+            # k == 0: a shorter vector is found, so shrink the radius and go on
+            best, bound = list(v), rho[0]
+
+        k += 1
+        if k == n:
+            return best
+        last[k - 1] = k
+        if k >= last_nonzero:
+            last_nonzero = k
+            v[k] += 1
+        else:
+            v[k] += -w[k] if v[k] > c[k] else w[k]
+            w[k] += 1
+
+
+def bkz(
+    basis: Sequence[Sequence[int]],
+    block_size: int = BKZ_BLOCK_SIZE,
+    delta: float | Fraction = Fraction(99, 100),
+    max_tours: int = BKZ_MAX_TOURS,
+) -> list[list[int]]:
+    """BKZ reduction.
+
+    Each block is searched by enumeration for a vector shorter than the first Gram-Schmidt vector,
+    which is inserted in front of the block, and the dependency is removed by LLL.
+    The tours are repeated until no block changes.
+
+    Args:
+        basis (Sequence[Sequence[int]]): The linearly independent row vectors.
+        block_size (int, optional): The block size. Defaults to 10.
+        delta (float | Fraction, optional): The Lovasz parameter. Defaults to 99/100.
+        max_tours (int, optional): The maximum number of tours. Defaults to 8.
+    Returns:
+        list[list[int]]: The reduced basis.
+    """
+    b = [[gmpy2.mpz(x) for x in row] for row in lll(basis, delta)]
+    n = len(b)
+    delta = float(delta)
+
+    for tour in range(max_tours):
+        changed = False
+        for k in range(n - 1):
+            h = min(k + block_size, n)
+            G = _gram(b[:h])
+            F, precision = _float_type(G)
+            with gmpy2.context(precision=precision):
+                mu = [[F(0)] * h for _ in range(h)]
+                R = [[F(0)] * h for _ in range(h)]
+                for i in range(h):
+                    _gram_schmidt_row(i, G, mu, R, F)
+
+                block_mu = [row[k:h] for row in mu[k:h]]
+                block_r = [R[i][i] for i in range(k, h)]
+                x = _enumerate(block_mu, block_r, delta * block_r[0])
+                if x is None:
+                    continue
+
+                v = [sum(xi * row[j] for xi, row in zip(x, b[k:h])) for j in range(len(b[0]))]
+                try:
+                    reduced = _lll_fp(b[:k] + [v] + b[k:h], delta, F)
+                except _PrecisionError:
+                    continue
+            assert len(reduced) == h, "The insertion failed."
+            b[:h] = reduced
+            changed = True
+
+        logger.debug(f"BKZ-{block_size} tour {tour}: |b_0|^2 = {sum(x * x for x in b[0])}")
+        if not changed:
+            break
+
+    return [[int(x) for x in row] for row in b]
+
+
+def babai(basis: Sequence[Sequence[int]], target: Sequence[int], reduced: bool = False) -> list[int]:
+    """Babai's nearest plane algorithm for the closest vector problem.
+
+    Args:
+        basis (Sequence[Sequence[int]]): The row vectors.
+        target (Sequence[int]): The target vector.
+        reduced (bool, optional): Whether the basis is already LLL-reduced. Defaults to False.
+    Returns:
+        list[int]: The lattice vector close to the target.
+    """
+    b = [[gmpy2.mpz(x) for x in row] for row in (basis if reduced else lll(basis))]
+    t = [gmpy2.mpz(x) for x in target]
+    n = len(b)
+
+    G = _gram(b)
+    bits = max(abs(x).bit_length() for x in [*t, *(x for row in G for x in row)])
+    with gmpy2.context(precision=bits + 2 * n + 64):
+        F = gmpy2.mpfr
+        mu = [[F(0)] * n for _ in range(n)]
+        R = [[F(0)] * n for _ in range(n)]
+        for i in range(n):
+            _gram_schmidt_row(i, G, mu, R, F)
+
+        # y[j] = <t, b*_j>
+        y = [F(0)] * n
+        for j in range(n):
+            y[j] = F(sum(map(mul, t, b[j]))) - sum(map(mul, mu[j][:j], y[:j]))
+
+        coefficients = [0] * n
+        for i in reversed(range(n)):
+            c = round(y[i] / R[i][i])
+            coefficients[i] = c
+            # t <- t - c b_i, and <b_i, b*_j> = mu_ij |b*_j|^2
+            for j in range(i):
+                y[j] -= c * mu[i][j] * R[j][j]
+
+    return [int(sum(c * row[j] for c, row in zip(coefficients, b))) for j in range(len(t))]
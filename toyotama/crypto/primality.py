@@ -0,0 +1,116 @@
+"""Primality testing
+"""
+import multiprocessing
+from collections.abc import Iterable
+from math import gcd, prod
+
+import gmpy2
+
+WHEEL_MODULUS: int = 2 * 3 * 5 * 7
+# _WHEEL[r] is 1 iff r is coprime to 210
+_WHEEL: bytes = bytes(gcd(r, WHEEL_MODULUS) == 1 for r in range(WHEEL_MODULUS))
+
+TRIAL_DIVISION_BOUND: int = 1 << 10
+_SMALL_PRIMES: list[int] = [p for p in range(2, TRIAL_DIVISION_BOUND) if all(p % q for q in range(2, int(p**0.5) + 1))]
+_SMALL_PRIMES_SET: frozenset[int] = frozenset(_SMALL_PRIMES)
+_PRIMORIAL: gmpy2.mpz = gmpy2.mpz(prod(p for p in _SMALL_PRIMES if p > 7))
+
+# Miller-Rabin with the first 13 primes as bases is deterministic below this bound.
+MILLER_RABIN_BOUND: int = 3317044064679887385961981
+MILLER_RABIN_BASES: tuple[int, ...] = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+def _trial_division(n: int) -> bool | None:
+    """Trial division by the primes less than 1024.
+
+    The residue mod 210 is looked up in a wheel first, then the other small primes are
+    tested at once by a gcd with their product.
+
+    Args:
+        n (int): The value.
+    Returns:
+        bool | None: True if n is a small prime, False if n has a small factor, None if undecided.
+    """
+    if n < TRIAL_DIVISION_BOUND:
+        return n in _SMALL_PRIMES_SET
+    if not _WHEEL[n % WHEEL_MODULUS]:
+        return False
+    if gmpy2.gcd(n, _PRIMORIAL) != 1:
+        return False
+    if n < TRIAL_DIVISION_BOUND * TRIAL_DIVISION_BOUND:
+        return True
+    return None
+
+
+def miller_rabin(n: int, bases: Iterable[int] = MILLER_RABIN_BASES) -> bool:
+    """Miller-Rabin test.
+
+    Args:
+        n (int): An odd value greater than the bases.
+        bases (Iterable[int], optional): The bases. Defaults to the first 13 primes, which is deterministic for n < 3.3e24.
+    Returns:
+        bool: False if n is composite, True if n is a strong probable prime to all the bases.
+    """
+    return all(gmpy2.is_strong_prp(n, a) for a in bases)
+
+
+def bpsw(n: int) -> bool:
+    """Baillie-PSW test, a Miller-Rabin test to base 2 followed by a strong Lucas test.
+
+    No counterexample is known.
+
+    Args:
+        n (int): An odd value.
+    Returns:
+        bool: Whether n is a probable prime.
+    """
+    return gmpy2.is_strong_bpsw_prp(n)
+
+
+def is_prime(n: int) -> bool:
+    """Primality test.
+
+    Trial division, then deterministic Miller-Rabin for n < 3.3e24 and BPSW above that.
+
+    Args:
+        n (int): The value.
+    Returns:
+        bool: Whether n is prime or not.
+    """
+    result = _trial_division(n)
+    if result is not None:
+        return result
+    if n < MILLER_RABIN_BOUND:
+        return miller_rabin(n)
+    return bpsw(n)
+
+
+def is_prime_many(ns: Iterable[int], workers: int = 1) -> list[bool]:
+    """Primality test for many candidates.
+
+    The cheap filters run over the whole list first so that only the survivors of
+    trial division and a base-2 Miller-Rabin test reach the full test.
+
+    Args:
+        ns (Iterable[int]): The values.
+        workers (int, optional): The number of processes for the full test. Defaults to 1.
+    Returns:
+        list[bool]: Whether each of the values is prime or not.
+    """
+    ns = list(ns)
+    result = [_trial_division(n) for n in ns]
+    candidates = [i for i, r in enumerate(result) if r is None]
+    candidates = [i for i in candidates if gmpy2.is_strong_prp(ns[i], 2)]
+    for i, r in enumerate(result):
+        if r is None:
+            result[i] = False
+
+    if workers > 1 and len(candidates) > workers:
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            primes = pool.map(is_prime, [ns[i] for i in candidates], chunksize=-(-len(candidates) // (4 * workers)))
+    else:
+        primes = [is_prime(ns[i]) for i in candidates]
+
+    for i, p in zip(candidates, primes):
+        result[i] = p
+    return result
@@ -0,0 +1,190 @@
+"""Proof of work
+"""
+import hashlib
+import multiprocessing
+import os
+import re
+import string
+import time
+from itertools import product
+
+from ..util.log import get_logger
+
+logger = get_logger()
+
+POW_ALPHABET: bytes = (string.ascii_letters + string.digits).encode()
+POW_MAX_LENGTH: int = 8
+# The number of leading nonce characters fixed by each task
+POW_HEAD_LENGTH: int = 2
+
+
+def _make_check(size: int, zero_bits: int, hex_prefix: str | None, hex_suffix: str | None, digest: bytes | None):
+    """A predicate on digests, comparing raw bytes instead of hexdigest() where possible."""
+    checks = []
+    if zero_bits:
+        threshold = (1 << (8 * size - zero_bits)).to_bytes(size, "big")
+        checks.append(lambda d: d < threshold)
+    if hex_prefix:
+        # An odd number of hex digits leaves the last nibble free.
+        lo, hi = bytes.fromhex(hex_prefix + "0" * (len(hex_prefix) % 2)), bytes.fromhex(hex_prefix + "f" * (len(hex_prefix) % 2))
+        k = len(lo)
+        checks.append(lambda d: lo <= d[:k] <= hi)
+    if hex_suffix:
+        checks.append(lambda d: d.hex().endswith(hex_suffix))
+    if digest:
+        checks.append(lambda d: d == digest)
+
+    if len(checks) == 1:
+        return checks[0]
+    return lambda d: all(check(d) for check in checks)
+
+
+_search = None
+
+
+def _set_search(hash_name: str, prefix: bytes, suffix: bytes, alphabet: bytes, check_args: tuple):
+    global _search
+    base = hashlib.new(hash_name, prefix)
+    check = _make_check(base.digest_size, *check_args)
+
+    def search(head: bytes, length: int) -> bytes | None:
+        h0 = base.copy()
+        h0.update(head)
+        for tail in product(alphabet, repeat=length):
+            h = h0.copy()
+            h.update(bytes(tail) + suffix)
+            if check(h.digest()):
+                return head + bytes(tail)
+        return None
+
+    _search = search
+
+
+def _search_task(args: tuple[bytes, int]) -> bytes | None:
+    return _search(*args)
+
+
+def solve_pow(
+    prefix: bytes = b"",
+    suffix: bytes = b"",
+    hash_name: str = "sha256",
+    zero_bits: int = 0,
+    hex_prefix: str | None = None,
+    hex_suffix: str | None = None,
+    digest: bytes | str | None = None,
+    alphabet: bytes = POW_ALPHABET,
+    length: int | None = None,
+    workers: int | None = None,
+) -> bytes | None:
+    """Solve a hash-based proof of work.
+
+    Find a nonce such that H(prefix || nonce || suffix) satisfies all of the given conditions.
+    The hash state after the prefix (and the head of the nonce) is computed once and copied
+    for each candidate, and the nonce space is split by its first characters across processes.
+
+    Args:
+        prefix (bytes, optional): The known data before the nonce. Defaults to b"".
+        suffix (bytes, optional): The known data after the nonce. Defaults to b"".
+        hash_name (str, optional): The name of the hash in hashlib. Defaults to "sha256".
+        zero_bits (int, optional): The number of leading zero bits of the digest. Defaults to 0.
+        hex_prefix (str | None, optional): The prefix of the hex digest.
+        hex_suffix (str | None, optional): The suffix of the hex digest.
+        digest (bytes | str | None, optional): The whole digest, as bytes or hex.
+        alphabet (bytes, optional): The characters of the nonce. Defaults to letters and digits.
+        length (int | None, optional): The length of the nonce. Defaults to trying 1, 2, ..., 8.
+        workers (int | None, optional): The number of processes. Defaults to os.cpu_count().
+    Returns:
+        bytes | None: The nonce, or None if it was not found.
+    """
+    if isinstance(digest, str):
+        digest = bytes.fromhex(digest)
+    hex_prefix = hex_prefix and hex_prefix.lower()
+    hex_suffix = hex_suffix and hex_suffix.lower()
+    assert zero_bits or hex_prefix or hex_suffix or digest, "No condition is given."
+
+    workers = workers or os.cpu_count() or 1
+    initargs = (hash_name, prefix, suffix, alphabet, (zero_bits, hex_prefix, hex_suffix, digest))
+    lengths = [length] if length is not None else range(1, POW_MAX_LENGTH + 1)
+
+    start = time.perf_counter()
+    if workers <= 1:
+        _set_search(*initargs)
+        for n in lengths:
+            h = min(n, POW_HEAD_LENGTH)
+            for head in product(alphabet, repeat=h):
+                if (nonce := _search(bytes(head), n - h)) is not None:
+                    logger.info(f"PoW solved in {time.perf_counter() - start:.2f}s: {nonce!r}")
+                    return nonce
+        return None
+
+    with multiprocessing.get_context("fork").Pool(workers, _set_search, initargs) as pool:
+        for n in lengths:
+            h = min(n, POW_HEAD_LENGTH)
+            tasks = ((bytes(head), n - h) for head in product(alphabet, repeat=h))
+            for nonce in pool.imap_unordered(_search_task, tasks):
+                if nonce is not None:
+                    pool.terminate()
+                    logger.info(f"PoW solved in {time.perf_counter() - start:.2f}s: {nonce!r}")
+                    return nonce
+
+    return None
+
+
+_HASH = r"(md5|sha1|sha224|sha256|sha384|sha512|sha3_256)"
+_STR = r"""["']?([^"'\s()+]*)["']?"""
+_UNKNOWN = r"""["']?(X+|x+|\?+|\*+)["']?"""
+_NONCE = r"(?:\w+|\?+|\*+)"
+# sha256(XXXX + abcd) == 0123..., sha256(abcd + XXXX) == 0123...
+_FULL = re.compile(
+    rf"{_HASH}\(\s*(?:{_UNKNOWN}\s*\+\s*{_STR}|{_STR}\s*\+\s*{_UNKNOWN})\s*\)(?:\.hexdigest\(\))?\s*==\s*([0-9a-fA-F]+)", re.I
+)
+# sha256(abcd + ???)[:6] == 000000, sha256("abcd" + S).hexdigest().startswith("000000")
+_PARTIAL = re.compile(
+    rf"{_HASH}\(\s*{_STR}\s*\+\s*{_NONCE}\s*\)(?:\.hexdigest\(\))?\s*(?:\[\s*:\s*\d+\s*\]\s*==|\.startswith\(|starts with)\s*[\"']?([0-9a-fA-F]+)", re.I
+)
+_ZERO_BITS = re.compile(rf"{_HASH}\(\s*{_STR}\s*\+\s*{_NONCE}\s*\).*?(\d+)\s*(?:leading )?zero(?:s| bits)", re.I)
+_HASHCASH = re.compile(r"hashcash\s+-mb\s*(\d+)\s+(\S+)")
+
+
+def _hashcash(bits: int, resource: str, workers: int | None) -> bytes | None:
+    stamp = f"1:{bits}:{time.strftime('%y%m%d')}:{resource}::{os.urandom(8).hex()}:".encode()
+    nonce = solve_pow(stamp, hash_name="sha1", zero_bits=bits, alphabet=b"0123456789abcdef", workers=workers)
+    return nonce and stamp + nonce
+
+
+def solve_pow_challenge(line: bytes | str, workers: int | None = None) -> bytes:
+    """Parse a proof-of-work challenge and solve it.
+
+    The supported forms are:
+        - sha256(XXXX + "suffix") == <hex digest>, and the mirrored prefix form
+        - sha256("prefix" + S)[:6] == "000000" (or .startswith("000000"))
+        - sha256("prefix" + S) has 20 leading zero bits
+        - hashcash -mb20 resource
+
+    Args:
+        line (bytes | str): The challenge.
+        workers (int | None, optional): The number of processes. Defaults to os.cpu_count().
+    Returns:
+        bytes: The answer to send, i.e. the unknown part (XXXX or S) or the whole hashcash stamp.
+    """
+    if isinstance(line, bytes):
+        line = line.decode()
+
+    if m := _HASHCASH.search(line):
+        answer = _hashcash(int(m[1]), m[2], workers)
+    elif m := _FULL.search(line):
+        hash_name, unknown1, suffix, prefix, unknown2, digest = m.groups()
+        unknown = unknown1 or unknown2
+        answer = solve_pow((prefix or "").encode(), (suffix or "").encode(), hash_name.lower(), digest=digest, length=len(unknown), workers=workers)
+    elif m := _PARTIAL.search(line):
+        hash_name, prefix, hex_prefix = m.groups()
+        answer = solve_pow(prefix.encode(), hash_name=hash_name.lower(), hex_prefix=hex_prefix, workers=workers)
+    elif m := _ZERO_BITS.search(line):
+        hash_name, prefix, bits = m.groups()
+        answer = solve_pow(prefix.encode(), hash_name=hash_name.lower(), zero_bits=int(bits), workers=workers)
+    else:
+        raise ValueError(f"Unknown proof of work: {line!r}")
+
+    if answer is None:
+        raise ValueError(f"No solution found: {line!r}")
+    return answer
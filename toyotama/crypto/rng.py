@@ -1,19 +1,128 @@
 import itertools
-from functools import reduce
-from math import gcd
+import random
+from collections.abc import Iterator
+from functools import lru_cache
 
+import gmpy2
 
-def lcg_crack(x, a=None, b=None, m=None):
+from .lattice import lll
+
+LCG_GCD_CHUNK: int = 64
+
+
+def _mat_mul(A: list[list[int]], B: list[list[int]], m: int) -> list[list[int]]:
+    return [[sum(a * b for a, b in zip(row, col)) % m for col in zip(*B)] for row in A]
+
+
+def _mat_pow(A: list[list[int]], n: int, m: int) -> list[list[int]]:
+    R = [[int(i == j) for j in range(len(A))] for i in range(len(A))]
+    while n:
+        if n & 1:
+            R = _mat_mul(R, A, m)
+        A = _mat_mul(A, A, m)
+        n >>= 1
+    return R
+
+
+def lcg_jump(x: int, a: int, b: int, m: int, n: int) -> int:
+    """Jump an LCG x -> ax + b mod m by n steps in O(log n).
+
+    The step is the 2x2 matrix [[a, b], [0, 1]] acting on (x, 1), which is raised to the n-th power.
+    A negative n steps backward, which requires gcd(a, m) = 1.
+
+    Args:
+        x (int): The state.
+        a (int): The multiplier.
+        b (int): The increment.
+        m (int): The modulus.
+        n (int): The number of steps.
+    Returns:
+        int: The state after n steps.
+    """
+    if n < 0:
+        # x = a^-1 (x' - b)
+        a = int(gmpy2.invert(a, m))
+        b, n = -a * b % m, -n
+    (A, B), _ = _mat_pow([[a % m, b % m], [0, 1]], n, m)
+    return (A * x + B) % m
+
+
+class LCG:
+    """Linear congruential generator x_{i+1} = a x_i + b mod m."""
+
+    def __init__(self, a: int, b: int, m: int, seed: int):
+        self.a = a % m
+        self.b = b % m
+        self.m = m
+        self.state = seed % m
+
+    def __iter__(self) -> Iterator[int]:
+        return self
+
+    def __next__(self) -> int:
+        self.state = (self.a * self.state + self.b) % self.m
+        return self.state
+
+    def prev(self) -> int:
+        """Step back and return the previous state."""
+        self.state = lcg_jump(self.state, self.a, self.b, self.m, -1)
+        return self.state
+
+    def jump(self, n: int) -> int:
+        """Jump n steps (backward if negative) and return the state."""
+        self.state = lcg_jump(self.state, self.a, self.b, self.m, n)
+        return self.state
+
+
+def lcg_modulus(x: list[int]) -> int:
+    """Recover the modulus of an LCG from consecutive outputs.
+
+    With y_i = x_{i+1} - x_i, every y_{i+2} y_i - y_{i+1}^2 is a multiple of m.
+    The multiples are reduced by the running gcd and combined in chunks, so that many samples
+    cost little more than a few, and the spurious small factors left by too few samples are removed
+    as long as the modulus stays larger than the outputs. As this can also remove a true factor
+    when the outputs happen to be small, a power of two, the most common modulus, is kept as is.
+
+    Args:
+        x (list[int]): At least 6 consecutive outputs.
+    Returns:
+        int: The modulus.
+    """
+    assert len(x) >= 6, "Can't crack"
+    Y = [v - u for u, v in itertools.pairwise(x)]
+    Z = [abs(u * w - v * v) for u, v, w in zip(Y, Y[1:], Y[2:])]
+
+    m = gmpy2.mpz(0)
+    for i in range(0, len(Z), LCG_GCD_CHUNK):
+        chunk = Z[i : i + LCG_GCD_CHUNK]
+        m = gmpy2.gcd(m, *(z % m if m else z for z in chunk))
+
+    lower = max(x)
+    for p in (3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 2):
+        while m % p == 0 and m // p > lower and m & (m - 1):
+            m //= p
+    return int(m)
+
+
+def lcg_crack(x: list[int], a: int | None = None, b: int | None = None, m: int | None = None) -> tuple[int, int, int]:
+    """Recover the parameters of an LCG from consecutive full outputs.
+
+    Args:
+        x (list[int]): The consecutive outputs.
+        a (int | None, optional): The multiplier if known.
+        b (int | None, optional): The increment if known.
+        m (int | None, optional): The modulus if known.
+    Returns:
+        tuple[int, int, int]: (a, b, m)
+    """
     n = len(x)
     if not m:
         if n >= 6:
-            Y = [x - y for x, y in itertools.pairwise(x)]
-            Z = [x * z - y * y for x, y, z in zip(Y, Y[1:], Y[2:])]
-            m = abs(reduce(gcd, Z))
+            m = lcg_modulus(x)
 
         elif n >= 3:
             assert a and b, "Can't crack"
-            m = gcd(x[2] - a * x[1] - b, x[1] - a * x[0] - b)
+            m = int(gmpy2.gcd(x[2] - a * x[1] - b, x[1] - a * x[0] - b))
         else:
             assert False, "Can't crack"
 
@@ -26,3 +135,386 @@ def lcg_crack(x, a=None, b=None, m=None):
             b = (x[1] - a * x[0]) % m
 
     return a, b, m
+
+
+def lcg_crack_truncated(y: list[int], shift: int, a: int, b: int, m: int) -> int | None:
+    """Recover the state of an LCG whose outputs are truncated to the high bits.
+
+    Given y_i = x_i >> shift for consecutive states x_{i+1} = a x_i + b mod m,
+    (x_0, x_1 - c_1, ..., x_{k-1} - c_{k-1}) with c_i = b (a^i - 1) / (a - 1) lies in the lattice
+    spanned by (1, a, ..., a^{k-1}) and m e_i, and is close to the known high bits.
+    The closest vector is found by LLL on Kannan's embedding.
+    Roughly, k outputs suffice if the leaked bits are more than 1/k of the state.
+
+    Args:
+        y (list[int]): The high bits of consecutive states.
+        shift (int): The number of the truncated low bits.
+        a (int): The multiplier.
+        b (int): The increment.
+        m (int): The modulus.
+    Returns:
+        int | None: The first state x_0, or None if it was not found.
+    """
+    k = len(y)
+    half = 1 << shift >> 1
+    weight = max(half, 1)
+
+    powers, offsets = [1], [0]
+    for _ in range(k - 1):
+        powers.append(powers[-1] * a % m)
+        offsets.append((offsets[-1] * a + b) % m)
+
+    target = [((yi << shift) + half - c) % m for yi, c in zip(y, offsets)]
+    basis = [powers + [0]]
+    basis += [[m * (i == j) for j in range(k)] + [0] for i in range(1, k)]
+    basis += [target + [weight]]
+
+    for row in lll(basis):
+        if abs(row[-1]) != weight:
+            continue
+        sign = 1 if row[-1] > 0 else -1
+        x0 = (target[0] - sign * row[0]) % m
+        x = x0
+        for yi in y:
+            if x >> shift != yi:
+                break
+            x = (a * x + b) % m
+        else:
+            return x0
+    return None
+
+
+MT_N: int = 624
+MT_M: int = 397
+MT_MATRIX_A: int = 0x9908B0DF
+MT_UPPER_MASK: int = 0x80000000
+MT_LOWER_MASK: int = 0x7FFFFFFF
+MT_DEGREE: int = 19937
+MASK32: int = (1 << 32) - 1
+
+
+def temper(y: int) -> int:
+    y ^= y >> 11
+    y ^= y << 7 & 0x9D2C5680
+    y ^= y << 15 & 0xEFC60000
+    y ^= y >> 18
+    return y
+
+
+def _unshift_right(y: int, shift: int) -> int:
+    x = y
+    for _ in range(32 // shift):
+        x = y ^ x >> shift
+    return x
+
+
+def _unshift_left(y: int, shift: int, mask: int) -> int:
+    x = y
+    for _ in range(32 // shift):
+        x = y ^ (x << shift & mask)
+    return x & MASK32
+
+
+def untemper(y: int) -> int:
+    """The inverse of the MT19937 tempering."""
+    y = _unshift_right(y, 18)
+    y = _unshift_left(y, 15, 0xEFC60000)
+    y = _unshift_left(y, 7, 0x9D2C5680)
+    return _unshift_right(y, 11)
+
+
+def _twist(mt: list[int]) -> None:
+    for i in range(MT_N):
+        y = (mt[i] & MT_UPPER_MASK) | (mt[(i + 1) % MT_N] & MT_LOWER_MASK)
+        mt[i] = mt[(i + MT_M) % MT_N] ^ (y >> 1) ^ (MT_MATRIX_A if y & 1 else 0)
+
+
+class MT19937:
+    """Mersenne Twister compatible with Python's random module.
+
+    The state is the 624-word array and the index of the next word, as in random.getstate().
+    """
+
+    def __init__(self, state: list[int], index: int = MT_N):
+        assert len(state) == MT_N, f"The state must have {MT_N} words."
+        self.mt = [x & MASK32 for x in state]
+        self.index = index
+
+    @classmethod
+    def from_seed(cls, seed: int) -> "MT19937":
+        """The same generator as random.seed(seed) for a non-negative integer seed."""
+        mt = [19650218]
+        for i in range(1, MT_N):
+            mt.append((1812433253 * (mt[-1] ^ mt[-1] >> 30) + i) & MASK32)
+
+        key = [seed >> 32 * i & MASK32 for i in range(max(1, (seed.bit_length() + 31) // 32))]
+        i, j = 1, 0
+        for _ in range(max(MT_N, len(key))):
+            mt[i] = ((mt[i] ^ (mt[i - 1] ^ mt[i - 1] >> 30) * 1664525) + key[j] + j) & MASK32
+            i, j = i + 1, (j + 1) % len(key)
+            if i >= MT_N:
+                mt[0], i = mt[MT_N - 1], 1
+        for _ in range(MT_N - 1):
+            mt[i] = ((mt[i] ^ (mt[i - 1] ^ mt[i - 1] >> 30) * 1566083941) - i) & MASK32
+            i += 1
+            if i >= MT_N:
+                mt[0], i = mt[MT_N - 1], 1
+        mt[0] = MT_UPPER_MASK
+        return cls(mt)
+
+    @classmethod
+    def from_random(cls, r: random.Random) -> "MT19937":
+        _, state, _ = r.getstate()
+        return cls(list(state[:-1]), state[-1])
+
+    def to_random(self) -> random.Random:
+        """A random.Random in the same state."""
+        r = random.Random()
+        r.setstate((3, (*self.mt, self.index), None))
+        return r
+
+    def genrand(self) -> int:
+        """The next 32-bit output."""
+        if self.index >= MT_N:
+            _twist(self.mt)
+            self.index = 0
+        y = self.mt[self.index]
+        self.index += 1
+        return temper(y)
+
+    def getrandbits(self, k: int) -> int:
+        if k <= 32:
+            return self.genrand() >> (32 - k)
+        x = 0
+        for i in range(0, k, 32):
+            x |= (self.genrand() >> max(0, i + 32 - k)) << i
+        return x
+
+    def random(self) -> float:
+        a, b = self.genrand() >> 5, self.genrand() >> 6
+        return (a * 67108864.0 + b) * (1.0 / 9007199254740992.0)
+
+    def jump(self, n: int) -> None:
+        """Skip n 32-bit outputs in O(log n) with the characteristic polynomial of the generator."""
+        assert n >= 0, "The generator can't jump backward."
+        if self.index + n < MT_N:
+            self.index += n
+            return
+
+        # the window x_j, ..., x_{j+623} of the sequence, where x_j is the first word of the current array
+        n += self.index
+        window = sum(x << 32 * i for i, x in enumerate(self.mt))
+        # The characteristic polynomial ignores the lower bits of the first word,
+        # so jump to one word before and step once to get all the bits right.
+        g = _jump_polynomial(n - 1)
+        result = 0
+        for i in reversed(range(g.bit_length())):
+            result = _advance(result)
+            if g >> i & 1:
+                result ^= window
+        result = _advance(result)
+        self.mt = [result >> 32 * i & MASK32 for i in range(MT_N)]
+        self.index = 0
+
+
+def _advance(window: int) -> int:
+    """Shift the window of the MT19937 sequence by one word."""
+    y = (window & MT_UPPER_MASK) | (window >> 32 & MT_LOWER_MASK)
+    x = (window >> 32 * MT_M & MASK32) ^ (y >> 1) ^ (MT_MATRIX_A if y & 1 else 0)
+    return window >> 32 | x << 32 * (MT_N - 1)
+
+
+def _berlekamp_massey(bits: list[int]) -> int:
+    """The connection polynomial C(t) over GF(2) (bit i is the coefficient of t^i) of the shortest LFSR."""
+    C, B = 1, 1
+    L, m = 0, 1
+    window = 0
+    for n, s in enumerate(bits):
+        # window has s_{n-i} at bit i
+        window = window << 1 | s
+        if (C & window).bit_count() & 1:
+            T = C
+            C ^= B << m
+            if 2 * L <= n:
+                L, B, m = n + 1 - L, T, 1
+                continue
+        m += 1
+    return C
+
+
+@lru_cache(maxsize=1)
+def mt19937_charpoly() -> int:
+    """The characteristic polynomial of MT19937 over GF(2), as an int with bit i the coefficient of t^i."""
+    mt = MT19937.from_seed(0)
+    bits = [mt.genrand() & 1 for _ in range(2 * MT_DEGREE)]
+    C = _berlekamp_massey(bits)
+    assert C.bit_length() - 1 <= MT_DEGREE
+    # the reciprocal of the connection polynomial
+    return int(f"{C:0{MT_DEGREE + 1}b}"[::-1], 2)
+
+
+_SPREAD: list[int] = [int(f"{i:08b}".replace("", "0")[:-1] or "0", 2) for i in range(256)]
+
+
+def _gf2_square(a: int) -> int:
+    """Square a polynomial over GF(2) by interleaving zeros between the bits."""
+    x = 0
+    for i, byte in enumerate(a.to_bytes((a.bit_length() + 7) // 8, "little")):
+        x |= _SPREAD[byte] << 16 * i
+    return x
+
+
+def _gf2_mul(a: int, b: int) -> int:
+    """Carry-less multiplication with a table of the 256 multiples of a."""
+    table = [0] * 256
+    for i in range(1, 256):
+        table[i] = table[i >> 1] << 1 ^ (a if i & 1 else 0)
+    x = 0
+    for i, byte in enumerate(b.to_bytes((b.bit_length() + 7) // 8, "little")):
+        x ^= table[byte] << 8 * i
+    return x
+
+
+def _gf2_divmod(a: int, b: int) -> tuple[int, int]:
+    q, d = 0, b.bit_length()
+    while a.bit_length() >= d:
+        shift = a.bit_length() - d
+        q ^= 1 << shift
+        a ^= b << shift
+    return q, a
+
+
+@lru_cache(maxsize=1)
+def _barrett() -> tuple[int, int, int]:
+    f = mt19937_charpoly()
+    d = f.bit_length() - 1
+    mu, _ = _gf2_divmod(1 << 2 * d, f)
+    return f, d, mu
+
+
+@lru_cache(maxsize=64)
+def _jump_polynomial(n: int) -> int:
+    """t^n mod the characteristic polynomial, by squaring with Barrett reduction."""
+    f, d, mu = _barrett()
+    r = 1
+    for bit in bin(n)[2:]:
+        r = _gf2_square(r)
+        if r >> d:
+            q = _gf2_mul(r >> d, mu) >> d
+            r ^= _gf2_mul(q, f)
+        if bit == "1":
+            r <<= 1
+            if r >> d:
+                r ^= f
+    return r
+
+
+_TEMPER_MASKS: tuple[int, int] = (0x9D2C5680, 0xEFC60000)
+
+
+def _symbolic_temper(y: list[int]) -> list[int]:
+    y = [y[b] ^ y[b + 11] if b + 11 < 32 else y[b] for b in range(32)]
+    y = [y[b] ^ y[b - 7] if _TEMPER_MASKS[0] >> b & 1 else y[b] for b in range(32)]
+    y = [y[b] ^ y[b - 15] if _TEMPER_MASKS[1] >> b & 1 else y[b] for b in range(32)]
+    return [y[b] ^ y[b + 18] if b + 18 < 32 else y[b] for b in range(32)]
+
+
+def _symbolic_step(mt: list[list[int]], i: int) -> None:
+    """Replace mt[i] by the next word of the sequence, as the twist does one word at a time."""
+    upper, lower = mt[i], mt[(i + 1) % MT_N]
+    y0 = lower[0]
+    shifted = [lower[b + 1] for b in range(30)] + [upper[31], 0]
+    mt[i] = [m ^ s ^ (y0 if MT_MATRIX_A >> b & 1 else 0) for b, (m, s) in enumerate(zip(mt[(i + MT_M) % MT_N], shifted))]
+
+
+def mt19937_solve(outputs: list[int | None], bits: int = 32) -> MT19937:
+    """Recover the state of MT19937 from partial outputs by linear algebra over GF(2).
+
+    Every output bit is a linear function of the 19937 bits of the state, so the state is a solution of
+    a linear system. Some of the equations are dependent, so a little more than 19937 / bits outputs
+    of getrandbits(bits) are needed.
+    The unknowns are the 624 words of the sequence from the first output, so the outputs need not be
+    aligned to the twist. They are tracked symbolically as bitmasks through the recurrence and the tempering,
+    and the equations are reduced incrementally as they come until the rank is full.
+
+    Args:
+        outputs (list[int | None]): The consecutive outputs of getrandbits(bits). None for an unknown output.
+        bits (int, optional): The number of bits of each output. Defaults to 32.
+    Returns:
+        MT19937: The generator positioned right after the outputs.
+    """
+    words = (bits + 31) // 32
+    # Bit b of the i-th word is the variable 32 i + b - 31, except that the lower 31 bits of the first word,
+    # which appear only in the first output, are put at the top so that they are eliminated first.
+    # Bit 0 of a row is the right-hand side.
+    mt = [[1 << (32 * i + b - 31 if i or b == 31 else MT_DEGREE + b) for b in range(32)] for i in range(MT_N)]
+    pivots: dict[int, int] = {}
+    rank = 0
+
+    t = 0
+    for output in outputs:
+        if rank >= MT_DEGREE:
+            break
+        for w in range(words):
+            if t >= MT_N:
+                _symbolic_step(mt, t % MT_N)
+            y = _symbolic_temper(mt[t % MT_N])
+            t += 1
+            if output is None:
+                continue
+
+            kept = min(32, bits - 32 * w)
+            chunk = output >> 32 * w & (1 << kept) - 1
+            for k in range(kept):
+                row = y[32 - kept + k] << 1 | chunk >> k & 1
+                while row > 1 and (pivot := pivots.get(row.bit_length())):
+                    row ^= pivot
+                if row == 1:
+                    raise ValueError("The outputs are inconsistent.")
+                if row:
+                    pivots[row.bit_length()] = row
+                    rank += row.bit_length() <= MT_DEGREE + 1
+
+    if rank < MT_DEGREE:
+        raise ValueError(f"The outputs are not enough: rank {rank} < {MT_DEGREE}")
+
+    solution = 0
+    for position in sorted(pivots):
+        row = pivots[position]
+        if ((row & solution).bit_count() ^ row) & 1:
+            solution |= 1 << position - 1
+    solution >>= 1
+
+    state = [(solution >> MT_DEGREE & MT_LOWER_MASK) | (solution & 1) << 31]
+    state += [solution >> 32 * i - 31 & MASK32 for i in range(1, MT_N)]
+    generator = MT19937(state, 0)
+    for output in outputs:
+        if output is None:
+            generator.getrandbits(bits)
+        elif generator.getrandbits(bits) != output:
+            raise ValueError("The outputs are inconsistent.")
+    return generator
+
+
+def mt19937_recover(outputs: list[int], bits: int = 32) -> MT19937:
+    """Recover the state of MT19937 (Python's random) from consecutive outputs of getrandbits(bits).
+
+    If bits is a multiple of 32, the first 624 words are untempered to get the state directly.
+    Otherwise the state is solved from the partial outputs with mt19937_solve.
+
+    Args:
+        outputs (list[int]): The consecutive outputs.
+        bits (int, optional): The number of bits of each output. Defaults to 32.
+    Returns:
+        MT19937: The generator positioned right after the outputs. Use to_random() to get random.Random.
+    """
+    if bits % 32:
+        return mt19937_solve(outputs, bits)
+
+    words = [output >> 32 * i & MASK32 for output in outputs for i in range(bits // 32)]
+    assert len(words) >= MT_N, f"At least {MT_N} words are required."
+    generator = MT19937([untemper(y) for y in words[:MT_N]], MT_N)
+    for y in words[MT_N:]:
+        if generator.genrand() != y:
+            raise ValueError("The outputs are inconsistent.")
+    return generator
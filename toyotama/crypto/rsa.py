@@ -1,15 +1,34 @@
 """RSA utility
 """
+import hashlib
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import time
 from collections.abc import Callable
 from functools import reduce
-from math import ceil, isqrt
+from math import inf, isqrt
 from operator import mul
+from pathlib import Path
+
+import gmpy2
 
 from ..util.log import get_logger
-from .util import extended_gcd, i2b, inverse, is_square
+from .coppersmith import boneh_durfee_attack, factor_with_known_msb, stereotyped_message_attack
+from .factor import FactorizationPipeline, batch_gcd
+from .util import chinese_remainder, extended_gcd, factorize_from_ed, i2b, inverse, is_square
 
 logger = get_logger()
 
+# The checkers of this cost or more race on processes.
+RSA_POOL_COST: float = 1.0
+# The default directory of the cache of the solved moduli. None disables the cache.
+RSA_CACHE_DIR: str | None = None
+# The default time limit in seconds on all of the expensive checkers of a solve. None waits for every checker.
+RSA_BUDGET: float | None = 30.0
+
 
 def common_modulus_attack(e1: int, e2: int, c1: int, c2: int, n: int) -> int:
     """Common Modulus Attack
@@ -73,6 +92,33 @@ def wieners_attack(e: int, n: int) -> int | None:
     return None
 
 
+def hastad_broadcast_attack(c: list[int], n: list[int], e: int | None = None) -> int | None:
+    """Hastad's broadcast attack
+
+    Recover m from the ciphertexts c_i = m**e mod n_i of the same message.
+    The residues are combined by CRT and the integer e-th root is taken,
+    which works as long as m**e < n_1*n_2*...
+
+    Args:
+        c (list[int]): The ciphertexts.
+        n (list[int]): The moduli.
+        e (int | None, optional): The public exponent. Defaults to len(c).
+    Returns:
+        int | None: The plaintext. None if failed.
+    """
+    e = e or len(c)
+    x, mod = chinese_remainder(c, n)
+    if mod == 0:
+        logger.warning("The ciphertexts are inconsistent.")
+        return None
+
+    m, exact = gmpy2.iroot(x, e)
+    if not exact:
+        logger.warning("m**e is larger than the product of the moduli.")
+        return None
+    return int(m)
+
+
 def lsb_decryption_oracle_attack(n: int, e: int, c: int, oracle: Callable, debug: bool = True) -> int:
     """Perform LSB Decryption oracle attack.
 
@@ -84,43 +130,107 @@ def lsb_decryption_oracle_attack(n: int, e: int, c: int, oracle: Callable, debug
         debug (bool, optional): Show debug log. Defaults to True.
 
     Returns:
-        int: _description_
+        int: The plaintext.
     """
-    """LSB Decryption oracle attack
+
+    c_ = c
+    k = n.bit_length()
+    # m is in [n*a/2**i, n*(a+1)/2**i) after the i-th query.
+    a = 0
+    for i in range(k):
+        if debug:
+            logger.info(f"{(100*i//k):>3}% [{i:>4}/{k}]")
+
+        c_ = c_ * pow(2, e, n) % n
+        a = a << 1 | bool(oracle(c_))
+
+    return -(-n * a >> k)
+
+
+def lsb_decryption_oracle_attack_batch(n: int, e: int, c: int, oracle: Callable[[list[int]], list[bool]], batch_size: int = 0, debug: bool = True) -> int:
+    """Perform LSB Decryption oracle attack with batched queries.
+
+    All of the ciphertexts c*2**(i*e) are known in advance, so they are sent to the
+    oracle `batch_size` at a time. Over a Tube the oracle can pipeline the batch:
+
+    >>> def oracle(cs):
+    ...     r.sendlines(cs)
+    ...     return [r.recvint() & 1 for _ in cs]
 
     Args:
-        N (int): The modulus.
-        e (int): The exponent.
-        c (int): The ciphertext.
-        oracle (Callable): The decryption oracle.  c*2**e = (2*m)**e (mod n) >> oracle >> m&1
+        n (int): A modulus.
+        e (int): A public exponent.
+        c (int): A ciphertext.
+        oracle (Callable[[list[int]], list[bool]]): A decryption oracle which returns m&1 for each of the ciphertexts.
+        batch_size (int, optional): The number of ciphertexts per oracle call. Defaults to 0 (all at once).
+        debug (bool, optional): Show debug log. Defaults to True.
+
     Returns:
-        int: The plaintext
+        int: The plaintext.
     """
 
-    from fractions import Fraction
+    k = n.bit_length()
+    batch_size = batch_size or k
 
-    lb, ub = Fraction(), Fraction(n)
-    c_ = c
-    i = 0
-    nl = n.bit_length()
-    while ub - lb > 1:
+    factor = pow(2, e, n)
+    ciphertexts = []
+    for _ in range(k):
+        c = c * factor % n
+        ciphertexts.append(c)
+
+    a = 0
+    for i in range(0, k, batch_size):
         if debug:
-            logger.info(f"{(100*i//nl):>3}% [{i:>4}/{nl}]")
+            logger.info(f"{(100*i//k):>3}% [{i:>4}/{k}]")
+
+        batch = ciphertexts[i : i + batch_size]
+        bits = oracle(batch)
+        assert len(bits) == len(batch), "The oracle must return one bit per ciphertext."
+        for bit in bits:
+            a = a << 1 | bool(bit)
+
+    return -(-n * a >> k)
 
-        mid = Fraction(lb + ub, 2)
-        c_ = c_ * pow(2, e, n) % n
-        if oracle(c_):
-            lb = mid
-        else:
-            ub = mid
-        i += 1
 
-    return ceil(lb)
+def rsa_checker(requires: tuple[str, ...] = ("n",), cost: float = 0.0, timeout: float | None = None) -> Callable:
+    """Declare the prerequisites and the cost of a checker of RSASolver.
+
+    Args:
+        requires (tuple[str, ...], optional): The attributes of the solver which must be set. Defaults to ("n",).
+        cost (float, optional): The rough running time in seconds. The checkers of RSA_POOL_COST or more race on processes.
+        timeout (float | None, optional): The time limit in seconds on a process. Defaults to RSASolver.timeout.
+    """
+
+    def decorator(f: Callable) -> Callable:
+        f.requires, f.cost, f.timeout = requires, cost, timeout
+        return f
+
+    return decorator
 
 
 class RSASolver:
+    """Solve RSA by scheduling checkers.
+
+    The checkers whose prerequisites are set run from the cheapest. The cheap ones run in this process one by one,
+    and the expensive ones race on up to `workers` processes, each for at most its timeout.
+    The first checker which finds the factors, d or m cancels the rest.
+    If `cache_dir` is set, the factors, phi and d are cached there by the hash of the modulus,
+    so a modulus seen before is solved without running any checker.
+
+    On a key that none of the checkers can break, solve returns after the cheap checkers, which take well under
+    a second, and at most `budget` seconds of the expensive ones. Set `budget` to None to wait for every checker,
+    which takes the sum of their timeouts divided by `workers`: a minute or more with the default checkers.
+    """
+
     def __init__(self):
-        self.checkers = [self._check_wieners_attack, self._check_modulus]
+        self.checkers = [
+            self._check_modulus,
+            self._check_wieners_attack,
+            self._check_partial_p,
+            self._check_stereotyped_message,
+            self._check_boneh_durfee,
+            self._check_factorization,
+        ]
         self.n = None
         self.e = None
         self.d = None
@@ -130,40 +240,257 @@ class RSASolver:
         self.phi = None
         self.kphi = None
         self.factorized = False
+        self.workers = None
+        self.timeout = None
+        self.budget = RSA_BUDGET
+        self.cache_dir = RSA_CACHE_DIR
+        self.factorization_budget = 30.0
+        # p with the unknown lower bits set to 0, and the number of the unknown bits
+        self.p_msb = None
+        self.p_unknown_bits = None
+        # m with the unknown lower bits set to 0, and the number of the unknown bits
+        self.m_msb = None
+        self.m_unknown_bits = None
+        self.boneh_durfee_delta = 0.26
 
     def solve(self, plaintext: bool = True) -> int | bytes | None:
-        for checker in self.checkers:
-            checker()
-
-        if self.factorized and self.e and self.n:
-            self.phi = reduce(mul, (p**k - p ** (k - 1) for p, k in self.factors))
-            self.d = inverse(self.e, self.phi)
+        if not self._solved():
+            self._load_cache()
+        if not self._solved():
+            self._schedule()
+
+        if self.factorized and self.e and self.n and (self.phi is None or self.d is None):
+            # Only a new result is written, not a cache hit.
+            if self.phi is None:
+                self.phi = reduce(mul, (p**k - p ** (k - 1) for p, k in self.factors))
+            if self.d is None:
+                self.d = inverse(self.e, self.phi)
+            self._save_cache()
+        if self.m is None and self.d is not None and self.c is not None:
             self.m = pow(self.c, self.d, self.n)
+
+        if self.m is not None:
             if plaintext:
                 return i2b(self.m)
             return self.m
 
         logger.warning("No solution found.")
 
-    def _check_wieners_attack(self):
-        if self.e is None or self.n is None:
-            logger.warning("Either e or n is not set.")
-        m = wieners_attack(self.e, self.n)
-        if m:
-            logger.info("Wiener's attack succeeded.")
-            m = i2b(m)
-            return m
+    def _solved(self) -> bool:
+        return self.factorized or self.d is not None or self.m is not None
 
-    def _check_modulus(self):
-        if self.n is None:
-            logger.warning("n is not set.")
+    def _ready(self, checker: Callable) -> bool:
+        return all(getattr(self, name, None) is not None for name in getattr(checker, "requires", ()))
+
+    def _schedule(self):
+        checkers = sorted((checker for checker in self.checkers if self._ready(checker)), key=lambda checker: getattr(checker, "cost", 0.0))
+        for checker in self.checkers:
+            if not self._ready(checker):
+                logger.debug(f"Skipped {checker.__name__}: {', '.join(getattr(checker, 'requires', ()))} required.")
+
+        for checker in checkers:
+            if getattr(checker, "cost", 0.0) < RSA_POOL_COST:
+                checker()
+                if self._solved():
+                    return
+        self._race([checker for checker in checkers if getattr(checker, "cost", 0.0) >= RSA_POOL_COST])
+
+    def _run_checker(self, checker: Callable, conn):
+        # A process group of its own, so that cancelling it also kills the pools it starts.
+        os.setpgrp()
+        try:
+            checker()
+        except Exception as e:
+            logger.warning(f"{checker.__name__} failed: {e!r}")
+        conn.send((self.factors, self.factorized, self.d, self.m) if self._solved() else None)
+        conn.close()
+
+    @staticmethod
+    def _kill(process):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            # not in its own process group yet
+            process.kill()
+        process.join()
+
+    def _race(self, checkers: list[Callable]):
+        context = multiprocessing.get_context("fork")
+        workers = self.workers or os.cpu_count() or 1
+        running = {}
+        budget_deadline = time.monotonic() + self.budget if self.budget else inf
+        try:
+            while checkers or running:
+                if time.monotonic() >= budget_deadline:
+                    logger.info(f"Ran out of the budget of {self.budget}s.")
+                    return
+                while checkers and len(running) < workers:
+                    checker = checkers.pop(0)
+                    receiver, sender = context.Pipe(duplex=False)
+                    process = context.Process(target=self._run_checker, args=(checker, sender))
+                    process.start()
+                    sender.close()
+                    timeout = getattr(checker, "timeout", None) or self.timeout
+                    running[receiver] = (checker, process, min(time.monotonic() + timeout if timeout else inf, budget_deadline))
+
+                deadline = min(deadline for _, _, deadline in running.values())
+                ready = multiprocessing.connection.wait(list(running), None if deadline == inf else max(0.0, deadline - time.monotonic()))
+                for conn in ready:
+                    checker, process, _ = running.pop(conn)
+                    try:
+                        result = conn.recv()
+                    except EOFError:
+                        result = None
+                    process.join()
+                    if result is not None:
+                        self.factors, self.factorized, self.d, self.m = result
+                        logger.info(f"{checker.__name__} succeeded.")
+                        return
+
+                now = time.monotonic()
+                for conn, (checker, process, deadline) in list(running.items()):
+                    if deadline <= now:
+                        logger.info(f"{checker.__name__} timed out.")
+                        self._kill(process)
+                        del running[conn]
+        finally:
+            for _, process, _ in running.values():
+                self._kill(process)
+
+    def _cache_path(self) -> Path | None:
+        if self.cache_dir is None or self.n is None:
+            return None
+        return Path(self.cache_dir).expanduser() / f"{hashlib.sha256(i2b(self.n)).hexdigest()}.json"
+
+    def _read_cache(self, path: Path) -> dict:
+        try:
+            entry = json.loads(path.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Broken cache {path}: {e}")
+            return {}
+        return entry if int(entry.get("n", "0"), 16) == self.n else {}
+
+    def _load_cache(self):
+        if (path := self._cache_path()) is None:
             return
+        entry = self._read_cache(path)
+        if "factors" in entry:
+            self.factors = [(int(p, 16), k) for p, k in entry["factors"]]
+            self.phi = int(entry["phi"], 16)
+            self.factorized = True
+            logger.info("Found the factors in the cache.")
+        if self.e is not None and (d := entry.get("d", {}).get(hex(self.e))):
+            self.d = int(d, 16)
+            logger.info("Found d in the cache.")
 
+    def _save_cache(self):
+        if (path := self._cache_path()) is None:
+            return
+        entry = self._read_cache(path) or {"n": hex(self.n)}
+        entry["factors"] = [[hex(p), k] for p, k in self.factors]
+        entry["phi"] = hex(self.phi)
+        entry.setdefault("d", {})[hex(self.e)] = hex(self.d)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write and rename, as other solvers may read it at the same time.
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(entry))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not write the cache {path}: {e}")
+
+    @rsa_checker(requires=("n",), cost=0.001)
+    def _check_modulus(self):
         # Perfect root
         _p = isqrt(self.n)
         if _p**2 == self.n:
             self.add_factor(_p, 2)
             self.factorized = True
 
+    @rsa_checker(requires=("n", "e"), cost=0.01)
+    def _check_wieners_attack(self):
+        d = wieners_attack(self.e, self.n)
+        if d is None:
+            return
+        try:
+            factors = factorize_from_ed(self.n, d, self.e)
+        except ValueError:
+            return
+        logger.info("Wiener's attack succeeded.")
+        self.factors = []
+        for p in factors:
+            self.add_factor(p)
+        self.factorized = True
+
+    @rsa_checker(requires=("n", "p_msb", "p_unknown_bits"), cost=10.0)
+    def _check_partial_p(self):
+        if factors := factor_with_known_msb(self.n, self.p_msb, self.p_unknown_bits):
+            logger.info("Coppersmith's attack with the known bits of p succeeded.")
+            self.factors = []
+            for p in factors:
+                self.add_factor(p)
+            self.factorized = True
+
+    @rsa_checker(requires=("n", "e", "c", "m_msb", "m_unknown_bits"), cost=10.0)
+    def _check_stereotyped_message(self):
+        if (m := stereotyped_message_attack(self.n, self.e, self.c, self.m_msb, self.m_unknown_bits)) is not None:
+            logger.info("Coppersmith's attack with the known bits of m succeeded.")
+            self.m = m
+
+    @rsa_checker(requires=("n", "e"), cost=30.0)
+    def _check_boneh_durfee(self):
+        # A small d makes e about as large as n.
+        if self.e.bit_length() < self.n.bit_length() - 8:
+            return
+        if d := boneh_durfee_attack(self.n, self.e, self.boneh_durfee_delta):
+            logger.info("Boneh-Durfee attack succeeded.")
+            self.factors = []
+            for p in factorize_from_ed(self.n, d, self.e):
+                self.add_factor(p)
+            self.factorized = True
+
+    @rsa_checker(requires=("n",), cost=100.0)
+    def _check_factorization(self):
+        self.factors = []
+        pipeline = FactorizationPipeline(self.add_factor, self.workers, self.factorization_budget)
+        _, composites = pipeline.run(self.n)
+        if composites:
+            logger.warning(f"Could not factorize {len(composites)} composite factors.")
+            return
+
+        logger.info("Factorization succeeded.")
+        self.factorized = True
+
     def add_factor(self, p, k=1):
+        for i, (q, j) in enumerate(self.factors):
+            if q == p:
+                self.factors[i] = (p, j + k)
+                return
         self.factors.append((p, k))
+
+
+def batch_gcd_attack(solvers: list[RSASolver]) -> list[RSASolver]:
+    """Find the factors shared among the moduli of many solvers by batch GCD.
+
+    The factors are added to each solver whose modulus shares a prime with another one.
+
+    Args:
+        solvers (list[RSASolver]): The solvers. `n` must be set.
+    Returns:
+        list[RSASolver]: The solvers which got factorized.
+    """
+    factorized = []
+    for solver, g in zip(solvers, batch_gcd([solver.n for solver in solvers])):
+        if g == 1 or g == solver.n:
+            continue
+        solver.factors = []
+        for p in (g, solver.n // g):
+            solver.add_factor(p)
+        solver.factorized = gmpy2.is_prime(g) and gmpy2.is_prime(solver.n // g)
+        if solver.factorized:
+            factorized.append(solver)
+
+    logger.info(f"Batch GCD factorized {len(factorized)}/{len(solvers)} moduli.")
+    return factorized
@@ -1,42 +1,77 @@
 """Crypto Utility
 """
-from functools import reduce
 from math import gcd, isqrt, lcm
-from operator import mul
-from random import randint
 from typing import Literal
 
 import gmpy2
 
 from ..util.log import get_logger
+from .primality import is_prime
 
 Endian = Literal["big", "little"]
 
+XOR_CHUNK_SIZE: int = 1 << 20
+
 
 logger = get_logger()
 
 
-def xor(*array: bytes, strict: bool = False) -> bytes:
+def xor(*array: bytes, strict: bool = False, cycle: bool = False, out: bytearray | memoryview | None = None) -> bytes:
     """XOR strings
 
-    Calculate `A XOR B`.
+    Calculate `A XOR B XOR ...`.
+    The strings are XORed as big integers chunk by chunk instead of byte by byte.
 
     Args:
-        A (bytes): A first string.
-        B (bytes): A second string.
+        *array (bytes): The strings.
+        strict (bool, optional): Raise ValueError unless all of the strings have the same length. Defaults to False.
+        cycle (bool, optional): Repeat shorter strings (e.g. a repeating-key XOR key) up to the length of the first one.
+            Otherwise the result is as long as the shortest string. Defaults to False.
+        out (bytearray | memoryview, optional): Write the result into this buffer instead of a new one. Defaults to None.
     Returns:
-        bytes: The result of `A XOR B`.
+        bytes: The result of `A XOR B XOR ...`. `out` if it is given.
     """
 
     if len(array) == 0:
         return bytes()
 
-    ret = bytes(len(array[0]))
+    views = [memoryview(block).cast("B") for block in array]
+    lengths = [len(view) for view in views]
+    if strict and len(set(lengths)) > 1:
+        raise ValueError("xor() arguments have different lengths.")
+
+    n = lengths[0] if cycle else min(lengths)
+    if n and 0 in lengths:
+        raise ValueError("Cannot cycle an empty string.")
+
+    if out is not None and len(out) < n:
+        raise ValueError(f"The output buffer is too small ({len(out)} < {n}).")
+
+    # Only one chunk of each repeated key is ever built.
+    step = max(1, min(n, XOR_CHUNK_SIZE))
+    patterns = [bytes(view) * (step // len(view) + 2) if len(view) < n else None for view in views]
+
+    chunks = []
+    for i in range(0, n, step):
+        size = min(step, n - i)
+        acc = 0
+        for view, pattern in zip(views, patterns):
+            if pattern is None:
+                acc ^= int.from_bytes(view[i : i + size], "little")
+            else:
+                offset = i % len(view)
+                acc ^= int.from_bytes(pattern[offset : offset + size], "little")
+
+        chunk = acc.to_bytes(size, "little")
+        if out is None:
+            chunks.append(chunk)
+        else:
+            out[i : i + size] = chunk
 
-    for block in array:
-        ret = bytes(x ^ y for x, y in zip(ret, block, strict=strict))
+    if out is not None:
+        return out
 
-    return ret
+    return b"".join(chunks)
 
 
 def rotl(data: list, shift: int, block_size: int = 16) -> list:
@@ -90,49 +125,45 @@ def extended_gcd(a: int, b: int) -> tuple[int, int, int]:
     Returns:
         tuple[int, int, int]: (x, y, g) s.t. Ax + By = gcd(A, B) = g
     """
-    g, c = a, b
-    x, a_ = 1, 0
-    y, b_ = 0, 1
+    g, x, y = gmpy2.gcdext(a, b)
+    return int(x), int(y), int(g)
 
-    while c != 0:
-        q, m = divmod(g, c)
-        g, c = c, m
-        x, a_ = a_, x - q * a_
-        y, b_ = b_, y - q * b_
-    assert a * x + b * y == gcd(a, b)
-    return x, y, g
 
+def legendre(a: int, p: int) -> int:
+    if p == 2:
+        return a & 1
+    return gmpy2.jacobi(a, p)
 
-def miller_rabin_Test(n: int, k: int = 100) -> bool:
-    """Miller-Rabin primality test.
 
-    Args:
-        n (int): A value.
-        k (int, optional): The number of iteration. Defaults to 100.
+def _tonelli_shanks(a: gmpy2.mpz, p: gmpy2.mpz, s: int, e: int, g: gmpy2.mpz) -> gmpy2.mpz:
+    """Tonelli-Shanks for p - 1 = s * 2**e, given g = n**s for a quadratic non-residue n."""
+    x = gmpy2.powmod(a, (s + 1) // 2, p)
+    b = gmpy2.powmod(a, s, p)
+    r = e
 
-    Returns:
-        bool: Whether n is prime or not.
-    """
-    if n == 2:
-        return True
-    if n < 2 or n % 2 == 0:
-        return False
-
-    s, t = 0, n - 1
-    while t % 2 == 0:
-        s, t = s + 1, t >> 1
-    a = randint(1, n - 1)
-    if pow(a, t, n) == 1:
-        return True
-    for i in range(s):
-        if pow(a, (1 << i) * t, n) == n - 1:
-            return True
-    return False
+    while b != 1:
+        t, m = b, 0
+        while t != 1:
+            t = t * t % p
+            m += 1
 
+        gs = gmpy2.powmod(g, 1 << (r - m - 1), p)
+        g = gs * gs % p
+        x = x * gs % p
+        b = b * g % p
+        r = m
+    return x
 
-def legendre(a: int, p: int) -> int:
-    res = pow(a, (p - 1) // 2, p)
-    return -1 if res == p - 1 else res
+
+def _mod_sqrt_params(p: gmpy2.mpz) -> tuple[int, int, gmpy2.mpz]:
+    s = p - 1
+    e = gmpy2.bit_scan1(s)
+    s >>= e
+
+    n = 2
+    while gmpy2.jacobi(n, p) != -1:
+        n += 1
+    return s, e, gmpy2.powmod(n, s, p)
 
 
 def mod_sqrt(a: int, p: int) -> int:
@@ -146,44 +177,97 @@ def mod_sqrt(a: int, p: int) -> int:
     Returns:
         int: `x` such that x*x == a (mod p).
     """
-    if legendre(a, p) != 1:
-        return 0
-    if a == 0:
-        return 0
+    return batch_mod_sqrt([a], p)[0]
+
+
+def batch_mod_sqrt(a: list[int], p: int) -> list[int]:
+    """Mod Sqrt for many values
+
+    Compute x such that x*x == a_i (mod p) for each a_i.
+    The quadratic non-residue for Tonelli-Shanks is searched only once.
+
+    Args:
+        a (list[int]): The values.
+        p (int): The prime modulus.
+    Returns:
+        list[int]: `x` such that x*x == a_i (mod p), or 0 if a_i is not a quadratic residue.
+    """
     if p == 2:
-        return p
-    if p % 4 == 3:
-        return pow(a, (p + 1) // 4, p)
+        return [v & 1 for v in a]
 
-    s = p - 1
-    e = (s & -s).bit_length() - 1
-    s >>= e
+    p = gmpy2.mpz(p)
+    params = None
+    roots = []
+    for v in a:
+        v = gmpy2.mpz(v) % p
+        if v == 0 or gmpy2.jacobi(v, p) != 1:
+            roots.append(0)
+        elif p % 4 == 3:
+            roots.append(int(gmpy2.powmod(v, (p + 1) // 4, p)))
+        else:
+            params = params or _mod_sqrt_params(p)
+            roots.append(int(_tonelli_shanks(v, p, *params)))
+    return roots
 
-    n = 2
-    while legendre(n, p) != -1:
-        n += 1
 
-    x = pow(a, (s + 1) // 2, p)
-    b = pow(a, s, p)
-    g = pow(n, s, p)
-    r = e
+def product_tree(x: list[int]) -> list[list[gmpy2.mpz]]:
+    """Product tree.
 
-    while True:
-        t = b
-        m = 0
-        for m in range(r):
-            if t == 1:
-                break
-            t = pow(t, 2, p)
+    tree[0] is the list of values and each level above is the list of products of adjacent pairs,
+    so tree[-1][0] is the product of all the values.
 
-        if m == 0:
-            return x
+    Args:
+        x (list[int]): The list of values.
+    Returns:
+        list[list[gmpy2.mpz]]: The levels of the tree from the leaves to the root.
+    """
+    tree = [[gmpy2.mpz(v) for v in x]]
+    while len(tree[-1]) > 1:
+        level = tree[-1]
+        tree.append([level[i] * level[i + 1] for i in range(0, len(level) - 1, 2)])
+        if len(level) % 2:
+            tree[-1].append(level[-1])
+    return tree
 
-        gs = pow(g, 1 << (r - m - 1), p)
-        g = gs * gs % p
-        x = x * gs % p
-        b = b * g % p
-        r = m
+
+def remainder_tree(x: int, tree: list[list[gmpy2.mpz]], square: bool = False) -> list[gmpy2.mpz]:
+    """Remainder tree.
+
+    Reduce x modulo every leaf of a product tree, from the root down.
+
+    Args:
+        x (int): The value.
+        tree (list[list[gmpy2.mpz]]): The product tree made by `product_tree`.
+        square (bool, optional): Reduce modulo the square of each node instead. Defaults to False.
+    Returns:
+        list[gmpy2.mpz]: x mod tree[0][i] (or tree[0][i]**2) for each leaf.
+    """
+    r = [gmpy2.mpz(x)]
+    for level in reversed(tree):
+        r = [r[i // 2] % (m * m if square else m) for i, m in enumerate(level)]
+    return r
+
+
+def _chinese_remainder_tree(a: list[int], m: list[int]) -> tuple[int, int]:
+    """CRT over pairwise coprime moduli with a product tree.
+
+    Raises ZeroDivisionError if the moduli are not pairwise coprime.
+    """
+    tree = product_tree(m)
+    mod = tree[-1][0]
+
+    # (M mod m_i**2) / m_i = (M / m_i) mod m_i
+    rems = remainder_tree(mod, tree, square=True)
+    x = [a_ * gmpy2.invert(r // m_, m_) % m_ for a_, m_, r in zip(a, tree[0], rems)]
+
+    # x_L * M_R + x_R * M_L from the leaves to the root
+    for level in tree[:-1]:
+        combined = [x[i] * level[i + 1] + x[i + 1] * level[i] for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            combined.append(x[-1])
+        x = combined
+
+    return int(x[0] % mod), int(mod)
 
 
 def chinese_remainder(a: list[int], m: list[int]) -> tuple[int, int]:
@@ -196,7 +280,7 @@ def chinese_remainder(a: list[int], m: list[int]) -> tuple[int, int]:
         - x = a2 (mod m2)
         - x = a3 (mod m3)
         - ...
-    by Garner's algorithm.
+    by a subproduct tree if the moduli are pairwise coprime, by Garner's algorithm otherwise.
 
     Args:
         a (list[int]): The list of value.
@@ -207,6 +291,11 @@ def chinese_remainder(a: list[int], m: list[int]) -> tuple[int, int]:
 
     assert len(a) == len(m), "The length of a and m must be same."
 
+    try:
+        return _chinese_remainder_tree(a, m)
+    except ZeroDivisionError:
+        pass
+
     n = len(a)
     a1, m1 = a[0], m[0]
     for i in range(1, n):
@@ -222,39 +311,6 @@ def chinese_remainder(a: list[int], m: list[int]) -> tuple[int, int]:
     return a1, m1
 
 
-def babystep_giantstep(g: int, y: int, p: int, q: int = 0) -> int:
-    if not q:
-        q = p
-
-    m = isqrt(q)
-    table = {}
-
-    b = 1
-    for i in range(m):
-        table[b] = i
-        b = (b * g) % p
-
-    gim = pow(pow(g, -1, p), m, p)
-    gmm = y
-
-    for i in range(m):
-        if gmm in table.keys():
-            return int(i * m + table[gmm])
-
-        gmm *= gim
-        gmm %= p
-
-    return -1
-
-
-def pohlig_hellman(g: int, y: int, factor: list[int]) -> tuple[int, int]:
-    p = reduce(mul, factor) + 1
-    x = [bsgs(pow(g, (p - 1) // q, p), pow(y, (p - 1) // q, p), p, q) for q in factor]
-
-    res = chinese_remainder(x, factor)
-    return res
-
-
 def factorize_from_kphi(n: int, kphi: int) -> tuple[int, int]:
     """
     factorize by Miller-Rabin primality test
@@ -289,18 +345,50 @@ def inverse(a: int, n: int) -> int:
         n (int): A modulus.
 
     Returns:
-        int: _description_
+        int: The inverse of a modulo n. 0 if it does not exist.
     """
-    x, _, g = extended_gcd(a, n)
-    if g != 1:
+    try:
+        return int(gmpy2.invert(a, n))
+    except ZeroDivisionError:
         logger.error("No inverse for the given modulus.")
         return 0
 
-    return x % n
+
+def batch_inverse(a: list[int], n: int) -> list[int]:
+    """Calculate modular inverses of many values by Montgomery's trick.
+
+    Only one modular inversion is done, along with 3(len(a) - 1) multiplications.
+
+    Args:
+        a (list[int]): The values.
+        n (int): A modulus.
+
+    Returns:
+        list[int]: The inverses of the values modulo n. 0 for a value which has no inverse.
+    """
+    if not a:
+        return []
+
+    n = gmpy2.mpz(n)
+    prefix = [gmpy2.mpz(a[0]) % n]
+    for v in a[1:]:
+        prefix.append(prefix[-1] * v % n)
+
+    try:
+        inv = gmpy2.invert(prefix[-1], n)
+    except ZeroDivisionError:
+        return [inverse(v, n) for v in a]
+
+    result = [0] * len(a)
+    for i in range(len(a) - 1, 0, -1):
+        result[i] = int(inv * prefix[i - 1] % n)
+        inv = inv * a[i] % n
+    result[0] = int(inv)
+    return result
 
 
 def is_square(n: int):
-    return isqrt(n) ** 2 == n
+    return n >= 0 and isqrt(n) ** 2 == n
 
 
 def solve_quadratic_equation(a: int, b: int, c: int) -> tuple[int, int]:
@@ -311,8 +399,21 @@ def solve_quadratic_equation(a: int, b: int, c: int) -> tuple[int, int]:
     return x, xx
 
 
+def miller_rabin_Test(n: int, k: int = 100) -> bool:
+    """Primality test, kept for compatibility.
+
+    This is now `is_prime`, which is deterministic Miller-Rabin or BPSW, so `k` is ignored.
+
+    Args:
+        n (int): A value.
+        k (int, optional): Ignored. Defaults to 100.
+
+    Returns:
+        bool: Whether n is prime or not.
+    """
+    return is_prime(n)
+
+
 # Aliases
 int_to_bytes = i2b
 bytes_to_int = b2i
-is_prime = miller_rabin_Test
-bsgs = babystep_giantstep